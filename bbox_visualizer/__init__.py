@@ -3,32 +3,86 @@
 from importlib.metadata import version
 
 from .core import (
+    BoxStyle,
+    BudgetedRenderer,
+    DetectionFilter,
+    FlagStyle,
+    LabelStyle,
+    Mosaic,
+    OverlayLayer,
+    Palette,
+    RenderPool,
+    SharedRenderPool,
+    TrackTrails,
     add_label,
     add_multiple_labels,
+    add_multiple_oriented_labels,
     add_multiple_T_labels,
     add_T_label,
+    annotate_in_place,
+    annotated_crops,
+    decode_display_list,
+    decode_rle,
+    display_list,
     draw_box,
+    draw_density,
+    draw_detections,
     draw_flag_with_label,
     draw_multiple_boxes,
     draw_multiple_flags_with_labels,
+    draw_multiple_keypoints,
+    draw_multiple_masks,
+    draw_multiple_oriented_boxes,
     draw_multiple_rectangles,
     draw_rectangle,
+    draw_rle_masks,
+    encode_display_list,
+    filter_detections,
+    render_to_jpeg,
+    render_to_png,
 )
 
 __version__ = version("bbox_visualizer")
 
 __all__ = [
+    "BoxStyle",
+    "BudgetedRenderer",
+    "DetectionFilter",
+    "FlagStyle",
+    "LabelStyle",
+    "Mosaic",
+    "OverlayLayer",
+    "Palette",
+    "RenderPool",
+    "SharedRenderPool",
+    "TrackTrails",
     "__version__",
     "add_T_label",
     "add_label",
     "add_multiple_T_labels",
     "add_multiple_labels",
+    "add_multiple_oriented_labels",
+    "annotate_in_place",
+    "annotated_crops",
+    "decode_display_list",
+    "decode_rle",
+    "display_list",
     "draw_box",
+    "draw_density",
+    "draw_detections",
     "draw_flag_with_label",
     "draw_multiple_boxes",
     "draw_multiple_flags_with_labels",
+    "draw_multiple_keypoints",
+    "draw_multiple_masks",
+    "draw_multiple_oriented_boxes",
     "draw_multiple_rectangles",
     "draw_rectangle",
+    "draw_rle_masks",
+    "encode_display_list",
+    "filter_detections",
+    "render_to_jpeg",
+    "render_to_png",
 ]
 
 __author__ = """Shoumik Sharar Chowdhury"""
@@ -1,28 +1,71 @@
 """Core functionality for bbox-visualizer."""
 
+from .budget import BudgetedRenderer
+from .crops import annotated_crops
+from .density import draw_density
+from .detections import draw_detections
+from .export import decode_display_list, display_list, encode_display_list
+from .filtering import DetectionFilter, filter_detections
 from .flags import (
     add_multiple_T_labels,
     add_T_label,
     draw_flag_with_label,
     draw_multiple_flags_with_labels,
 )
+from .keypoints import draw_multiple_keypoints
 from .labels import add_label, add_multiple_labels
+from .masks import decode_rle, draw_multiple_masks, draw_rle_masks
+from .mosaic import Mosaic
+from .oriented import add_multiple_oriented_labels, draw_multiple_oriented_boxes
+from .overlay import OverlayLayer
+from .palette import Palette
 from .rectangle import (
     draw_box,
     draw_multiple_boxes,
     draw_multiple_rectangles,
     draw_rectangle,
 )
+from .render import RenderPool, annotate_in_place, render_to_jpeg, render_to_png
+from .shared import SharedRenderPool
+from .styles import BoxStyle, FlagStyle, LabelStyle
+from .tracks import TrackTrails
 
 __all__ = [
+    "BoxStyle",
+    "BudgetedRenderer",
+    "DetectionFilter",
+    "FlagStyle",
+    "LabelStyle",
+    "Mosaic",
+    "OverlayLayer",
+    "Palette",
+    "RenderPool",
+    "SharedRenderPool",
+    "TrackTrails",
     "add_T_label",
     "add_label",
     "add_multiple_T_labels",
     "add_multiple_labels",
+    "add_multiple_oriented_labels",
+    "annotate_in_place",
+    "annotated_crops",
+    "decode_display_list",
+    "decode_rle",
+    "display_list",
     "draw_box",
+    "draw_density",
+    "draw_detections",
     "draw_flag_with_label",
     "draw_multiple_boxes",
     "draw_multiple_flags_with_labels",
+    "draw_multiple_keypoints",
+    "draw_multiple_masks",
+    "draw_multiple_oriented_boxes",
     "draw_multiple_rectangles",
     "draw_rectangle",
+    "draw_rle_masks",
+    "encode_display_list",
+    "filter_detections",
+    "render_to_jpeg",
+    "render_to_png",
 ]
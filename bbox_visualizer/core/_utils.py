@@ -1,17 +1,21 @@
 """Internal utilities for bbox-visualizer."""
 
+import itertools
 import numbers
 from collections.abc import Sequence
 from functools import lru_cache
+from typing import cast
 
 import cv2
 import numpy as np
+from numpy.typing import NDArray
 
 #: Bounding box formats accepted by the public API.
 SUPPORTED_BBOX_FORMATS = ("voc", "coco", "yolo")
 
 
-@lru_cache(maxsize=128)
+# Sized for multi-line labels, whose score and ID lines each take an entry
+@lru_cache(maxsize=1024)
 def _get_ink_metrics(label: str, size: float, thickness: int) -> tuple[int, int, int]:
     """Measure the actual ink extents of rendered text.
 
@@ -87,6 +91,195 @@ def _validate_color(color: Sequence[int]) -> tuple[int, int, int]:
     return (b, g, r)
 
 
+def _frame_color(color: Sequence[int], img: NDArray[np.integer]) -> tuple[int, ...]:
+    """Adapt a validated BGR color to the channels and bit depth of ``img``.
+
+    Grayscale frames take the color's luma (the ``cv2.COLOR_BGR2GRAY``
+    weights), BGRA frames an opaque alpha, and 16-bit frames every value
+    scaled from 0-255 to 0-65535, so colors are given the same way for every
+    frame type and the frame itself is never converted.
+
+    Raises:
+        ValueError: If ``img`` has neither 1, 3 nor 4 channels
+
+    """
+    if img.ndim == 3 and img.shape[2] == 3 and img.dtype == np.uint8:
+        return tuple(color)
+    channels = 1 if img.ndim == 2 else img.shape[2]
+    return _adapt_color(tuple(color), channels, img.dtype == np.uint16)
+
+
+@lru_cache(maxsize=256)
+def _adapt_color(
+    color: tuple[int, ...], channels: int, sixteen_bit: bool
+) -> tuple[int, ...]:
+    """Adapt ``color`` to a frame layout; the cached part of :func:`_frame_color`."""
+    scale = 257 if sixteen_bit else 1  # 255 * 257 == 65535
+    b, g, r = color
+    if channels == 1:
+        return (round(0.114 * b + 0.587 * g + 0.299 * r) * scale,)
+    if channels == 3:
+        return (b * scale, g * scale, r * scale)
+    if channels == 4:
+        return (b * scale, g * scale, r * scale, 255 * scale)
+    raise ValueError(f"Images must have 1, 3 or 4 channels, got {channels}")
+
+
+def _frame_colors(
+    colors: NDArray[np.uint8], img: NDArray[np.integer]
+) -> NDArray[np.integer]:
+    """Vectorized :func:`_frame_color` for a (N, 3) array of BGR colors."""
+    if img.ndim == 3 and img.shape[2] == 3 and img.dtype == np.uint8:
+        return colors
+    channels = 1 if img.ndim == 2 else img.shape[2]
+    scale = 257 if img.dtype == np.uint16 else 1
+    if channels == 1:
+        luma = colors.astype(np.float64) @ np.array([0.114, 0.587, 0.299])
+        adapted = np.rint(luma)[:, np.newaxis]
+    elif channels in (3, 4):
+        adapted = colors
+        if channels == 4:
+            alpha = np.full((len(colors), 1), 255, dtype=np.uint8)
+            adapted = np.hstack([colors, alpha])
+    else:
+        raise ValueError(f"Images must have 1, 3 or 4 channels, got {channels}")
+    adapted = adapted.astype(img.dtype)
+    if scale > 1:
+        adapted *= scale
+    return adapted
+
+
+def _validate_colors(
+    color: tuple[int, int, int] | Sequence[tuple[int, int, int]] | NDArray[np.integer],
+    count: int,
+) -> tuple[NDArray[np.uint8], bool]:
+    """Expand a single color or per-box colors into a (count, 3) color array.
+
+    An integer array of shape (count, 3), e.g. from :meth:`Palette.colors`, is
+    checked with vectorized range tests instead of per-color validation;
+    ``uint8`` arrays need no range check at all.
+
+    Args:
+        color: BGR color tuple applied to every box, a sequence of one color
+            per box, or an integer array of shape (count, 3)
+        count: Number of boxes
+
+    Returns:
+        (colors, per_box_colors): ``uint8`` array of shape (count, 3), and
+        whether the caller passed one color per box
+
+    Raises:
+        ValueError: If the number of colors does not match ``count`` or a
+            color is invalid
+
+    """
+    if isinstance(color, np.ndarray) and color.ndim == 2:
+        if color.shape[1] != 3 or not np.issubdtype(color.dtype, np.integer):
+            raise ValueError("Color array must be integers of shape (N, 3) (BGR)")
+        if (
+            color.dtype != np.uint8
+            and color.size
+            and (color.min() < 0 or color.max() > 255)
+        ):
+            raise ValueError("Color values must be integers between 0 and 255")
+        per_box_colors = True
+        colors = color.astype(np.uint8, copy=False)
+    elif len(color) > 0 and isinstance(color[0], tuple | list | np.ndarray):
+        per_box_colors = True
+        color_seq = cast("Sequence[tuple[int, int, int]]", color)
+        colors = np.array([_validate_color(c) for c in color_seq], dtype=np.uint8)
+    else:
+        single = _validate_color(cast("tuple[int, int, int]", color))
+        return np.broadcast_to(np.array(single, dtype=np.uint8), (count, 3)), False
+    if len(colors) != count:
+        raise ValueError(
+            f"Number of colors ({len(colors)}) must match "
+            f"number of bounding boxes ({count})"
+        )
+    return colors, per_box_colors
+
+
+def _group_by_color(
+    colors: NDArray[np.uint8],
+) -> list[tuple[list[int], NDArray[np.intp]]]:
+    """Split per-item colors into (color, item indices) groups, one per distinct color."""
+    if len(colors) == 0:
+        return []
+    # Fast path for a broadcast single color
+    if colors.strides[0] == 0 or (colors == colors[0]).all():
+        return [(colors[0].tolist(), np.arange(len(colors)))]
+    # Pack BGR into one integer so np.unique runs on a flat array
+    keys = colors.astype(np.int32) @ np.array([1 << 16, 1 << 8, 1], dtype=np.int32)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    splits = np.cumsum(np.bincount(inverse, minlength=len(unique_keys)))[:-1]
+    return [
+        (colors[members[0]].tolist(), members) for members in np.split(order, splits)
+    ]
+
+
+def _color_runs(colors: NDArray[np.uint8]) -> list[tuple[list[int], slice]]:
+    """Split per-item colors into (color, slice) runs of consecutive equal colors.
+
+    Unlike :func:`_group_by_color`, drawing the runs one after another keeps
+    the items in input order, so later items still cover earlier ones.
+    """
+    if len(colors) == 0:
+        return []
+    if colors.strides[0] == 0:  # broadcast single color
+        return [(colors[0].tolist(), slice(0, len(colors)))]
+    starts = np.flatnonzero((colors[1:] != colors[:-1]).any(axis=1)) + 1
+    bounds = [0, *starts.tolist(), len(colors)]
+    return [
+        (colors[start].tolist(), slice(start, stop))
+        for start, stop in itertools.pairwise(bounds)
+    ]
+
+
+def _points_roi(
+    points: NDArray[np.integer], img_size: tuple[int, ...]
+) -> tuple[int, int, int, int] | None:
+    """Return the (x0, y0, x1, y1) slice bounds covering ``points`` in the image.
+
+    Args:
+        points: Integer (x, y) points, shape (M, 2)
+        img_size: Tuple of (height, width, ...)
+
+    Returns:
+        Half-open bounds clipped to the image, or None if no point lies in it
+
+    """
+    x0 = max(int(points[:, 0].min()), 0)
+    y0 = max(int(points[:, 1].min()), 0)
+    x1 = min(int(points[:, 0].max()) + 1, img_size[1])
+    y1 = min(int(points[:, 1].max()) + 1, img_size[0])
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return x0, y0, x1, y1
+
+
+def _validate_bbox_format(bbox_format: str) -> str:
+    """Validate a bbox format name and normalize it to lowercase.
+
+    Args:
+        bbox_format: Format name, one of "voc", "coco", "yolo" (any case)
+
+    Returns:
+        The lowercase format name
+
+    Raises:
+        ValueError: If ``bbox_format`` is unsupported
+
+    """
+    fmt = bbox_format.lower()
+    if fmt not in SUPPORTED_BBOX_FORMATS:
+        raise ValueError(
+            f"Unsupported bbox_format {bbox_format!r}. "
+            f"Expected one of {SUPPORTED_BBOX_FORMATS}."
+        )
+    return fmt
+
+
 def _convert_bbox_to_voc(
     bbox: Sequence[float],
     img_size: tuple[int, ...],
@@ -111,12 +304,12 @@ def _convert_bbox_to_voc(
         ValueError: If ``bbox_format`` is unsupported or ``bbox`` is not 4 values
 
     """
-    fmt = bbox_format.lower()
-    if fmt not in SUPPORTED_BBOX_FORMATS:
-        raise ValueError(
-            f"Unsupported bbox_format {bbox_format!r}. "
-            f"Expected one of {SUPPORTED_BBOX_FORMATS}."
-        )
+    # Styles store the normalized format, so skip lower() when it's already valid
+    fmt = (
+        bbox_format
+        if bbox_format in SUPPORTED_BBOX_FORMATS
+        else _validate_bbox_format(bbox_format)
+    )
     if bbox is None or len(bbox) != 4:
         raise ValueError("Bounding box must have exactly 4 coordinates")
 
@@ -170,3 +363,97 @@ def _check_and_modify_bbox(
     bbox[2] = bbox[2] if bbox[2] < img_size[1] else img_size[1] - margin
     bbox[3] = bbox[3] if bbox[3] < img_size[0] else img_size[0] - margin
     return bbox
+
+
+def _as_array(values: object) -> object:
+    """Return a tensor as a NumPy array sharing its memory; pass others through.
+
+    Objects implementing ``__dlpack__`` (PyTorch, JAX, CuPy or TensorFlow
+    tensors) are wrapped with :func:`np.from_dlpack`, and other objects
+    implementing ``__array__`` with :func:`np.asarray`, so CPU tensors are
+    read in place instead of round-tripping through Python lists. Lists,
+    tuples and arrays are returned unchanged.
+
+    Raises:
+        ValueError: If a tensor cannot be read from host memory, e.g. one on
+            a GPU or one that requires grad
+
+    """
+    if isinstance(values, np.ndarray):
+        return values
+    error: Exception | None = None
+    if hasattr(values, "__dlpack__") and hasattr(np, "from_dlpack"):
+        try:
+            return np.from_dlpack(values)
+        except (BufferError, RuntimeError, TypeError, ValueError) as e:
+            error = e
+    if hasattr(values, "__array__"):
+        try:
+            return np.asarray(values)
+        except (RuntimeError, TypeError, ValueError) as e:
+            error = e
+    if error is not None:
+        raise ValueError(
+            f"Cannot read {type(values).__name__} on the CPU; "
+            "detach it and move it to the CPU first"
+        ) from error
+    return values
+
+
+def _check_and_modify_bboxes(
+    bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+    img_size: tuple[int, ...],
+    bbox_format: str = "voc",
+) -> NDArray[np.int64]:
+    """Vectorized :func:`_check_and_modify_bbox` for a whole batch of boxes.
+
+    Converts, validates and clips all boxes with array operations, for batches
+    too large for a per-box Python loop.
+
+    Args:
+        bboxes: Bounding boxes expressed in ``bbox_format``, shape (N, 4)
+        img_size: Tuple of (height, width, channels)
+        bbox_format: Input format, one of "voc", "coco", "yolo" (default: "voc")
+
+    Returns:
+        Clipped [x_min, y_min, x_max, y_max] integer boxes, shape (N, 4)
+
+    Raises:
+        ValueError: If the format is unsupported or a box is invalid
+
+    """
+    fmt = (
+        bbox_format
+        if bbox_format in SUPPORTED_BBOX_FORMATS
+        else _validate_bbox_format(bbox_format)
+    )
+    bboxes = _as_array(bboxes)
+    try:
+        boxes = np.asarray(bboxes, dtype=np.float64)
+    except (TypeError, ValueError) as e:  # ragged lists or non-numbers
+        raise ValueError("Bounding box must have exactly 4 coordinates") from e
+    if boxes.ndim != 2 or boxes.shape[1] != 4:
+        raise ValueError("Bounding box must have exactly 4 coordinates")
+
+    if fmt != "voc":
+        if (boxes[:, 2:] < 0).any():
+            raise ValueError(
+                f"{fmt.upper()} bounding box width and height must be non-negative"
+            )
+        if fmt == "coco":
+            boxes = np.hstack([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]])
+        else:  # yolo
+            half = boxes[:, 2:] / 2
+            scale = np.array([img_size[1], img_size[0]] * 2)
+            boxes = np.hstack([boxes[:, :2] - half, boxes[:, :2] + half]) * scale
+    # np.rint rounds half to even, like round() in _convert_bbox_to_voc
+    boxes = np.rint(boxes).astype(np.int64)
+
+    if (boxes[:, 0] > boxes[:, 2]).any() or (boxes[:, 1] > boxes[:, 3]).any():
+        raise ValueError(
+            "Invalid bounding box coordinates: x_min > x_max or y_min > y_max"
+        )
+    np.maximum(boxes, 0, out=boxes)
+    np.minimum(boxes[:, 2], img_size[1], out=boxes[:, 2])
+    np.minimum(boxes[:, 3], img_size[0], out=boxes[:, 3])
+    return boxes
@@ -0,0 +1,230 @@
+"""Frame-time budgeted rendering for live pipelines."""
+
+import dataclasses
+import time
+from collections.abc import Sequence
+from typing import cast
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ._utils import _as_array, _check_and_modify_bboxes
+from .labels import _draw_labels
+from .rectangle import _box_colors, _draw_rectangles
+from .styles import BoxStyle, LabelStyle
+
+#: Quality tiers of :class:`BudgetedRenderer`, from best to cheapest.
+RENDER_TIERS = ("full", "top_k", "boxes", "minimal")
+
+
+class BudgetedRenderer:
+    """Draw boxes and labels within a per-frame time budget.
+
+    Each frame is drawn at the best quality tier predicted to fit in the
+    budget:
+
+    - ``"full"``: boxes and every label
+    - ``"top_k"``: boxes, and labels for the ``top_k`` highest scores only
+    - ``"boxes"``: boxes without labels
+    - ``"minimal"``: 1-pixel boxes without labels, drawn whatever the budget
+
+    Predictions use per-primitive costs (seconds per box and per label)
+    learned as moving averages of the time actually spent on earlier frames,
+    so the renderer adapts to the machine, the frame size and the styles.
+    While a tier without labels is used, the label estimate decays by
+    ``smoothing`` per frame, so a label tier is retried once the load drops.
+    Validating the boxes and copying the frame are timed on the current
+    frame before the tier is chosen.
+
+    Example:
+        >>> renderer = BudgetedRenderer(budget_ms=10, top_k=5)
+        >>> for frame, (bboxes, labels, scores) in stream:  # doctest: +SKIP
+        ...     frame, tier = renderer.render(frame, bboxes, labels, scores)
+
+    """
+
+    def __init__(
+        self,
+        budget_ms: float = 33.0,
+        top_k: int = 10,
+        smoothing: float = 0.2,
+        box_style: BoxStyle | None = None,
+        label_style: LabelStyle | None = None,
+    ) -> None:
+        """Set up the renderer.
+
+        Args:
+            budget_ms: Time allowed for drawing one frame, in milliseconds
+                (default: 33.0)
+            top_k: Number of labels kept by the ``"top_k"`` tier (default: 10)
+            smoothing: Weight of the newest frame in the moving-average cost
+                estimates, in (0, 1] (default: 0.2)
+            box_style: Style of the boxes (default: ``BoxStyle()``); its
+                ``bbox_format`` applies to the boxes passed to :meth:`render`
+            label_style: Style of the labels (default: ``LabelStyle()``)
+
+        Raises:
+            ValueError: If ``budget_ms`` is negative, ``top_k`` is less than
+                1 or ``smoothing`` is outside (0, 1]
+
+        """
+        if budget_ms < 0:
+            raise ValueError("budget_ms cannot be negative")
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        self.budget_ms = budget_ms
+        self.top_k = top_k
+        self.smoothing = smoothing
+        self.box_style = box_style if box_style is not None else BoxStyle()
+        self.label_style = label_style if label_style is not None else LabelStyle()
+        self._thin_style = dataclasses.replace(self.box_style, thickness=1)
+        # Learned seconds per primitive; None until first measured
+        self._costs: dict[str, float | None] = {
+            "box": None,
+            "thin_box": None,
+            "label": None,
+        }
+        self.last_tier: str | None = None
+
+    @property
+    def estimates_ms(self) -> dict[str, float | None]:
+        """Current per-primitive cost estimates in milliseconds."""
+        return {
+            name: None if cost is None else cost * 1000
+            for name, cost in self._costs.items()
+        }
+
+    def render(
+        self,
+        img: NDArray[np.uint8],
+        bboxes: Sequence[Sequence[float]],
+        labels: list[str] | None = None,
+        scores: ArrayLike | None = None,
+        bbox_color: tuple[int, int, int]
+        | Sequence[tuple[int, int, int]]
+        | NDArray[np.integer]
+        | None = None,
+    ) -> tuple[NDArray[np.uint8], str]:
+        """Draw one frame at the best tier that fits the budget.
+
+        Args:
+            img: Input image array
+            bboxes: List of bounding boxes in the box style's ``bbox_format``
+            labels: Optional list of text labels, one per box (default: None)
+            scores: Optional confidence per box; the ``"top_k"`` tier labels
+                the highest-scoring boxes, or the first ``top_k`` boxes when
+                no scores are given (default: None)
+            bbox_color: BGR color tuple for all boxes, a sequence of one color
+                per box, or an integer array of shape (N, 3) (default: the box
+                style's color)
+
+        Returns:
+            Tuple of the new image and the tier used (one of
+            :data:`RENDER_TIERS`); the input image is not modified
+
+        Raises:
+            ValueError: If the inputs are invalid
+
+        """
+        start = time.perf_counter()
+        bboxes = _as_array(bboxes)
+        # len() instead of truthiness: numpy arrays raise on ambiguous bool()
+        if bboxes is None or len(bboxes) == 0:
+            raise ValueError("List of bounding boxes cannot be empty")
+        if labels is not None and len(labels) != len(bboxes):
+            raise ValueError("Number of bounding boxes must match number of labels")
+        if scores is not None:
+            scores = np.asarray(_as_array(scores), dtype=np.float64).reshape(-1)
+            if len(scores) != len(bboxes):
+                raise ValueError("Number of scores must match number of bounding boxes")
+
+        count = len(bboxes)
+        colors = _box_colors(
+            bbox_color if bbox_color is not None else self.box_style.color,
+            self.box_style,
+            count,
+        )
+        converted_bboxes = _check_and_modify_bboxes(
+            bboxes, img.shape, self.box_style.bbox_format
+        )
+        output = img.copy()
+
+        remaining = self.budget_ms / 1000 - (time.perf_counter() - start)
+        num_labels = 0 if labels is None else count
+        tier = self._choose_tier(remaining, count, num_labels)
+
+        tic = time.perf_counter()
+        box_style = self._thin_style if tier == "minimal" else self.box_style
+        _draw_rectangles(output, converted_bboxes, colors, box_style)
+        if tier == "minimal":
+            # 1-pixel strokes are cheaper than the style's, so they keep their
+            # own estimate; the box estimate follows its changes, so once the
+            # load drops the renderer tries the better tiers again
+            self._learn("thin_box", tic, count, follow="box")
+        else:
+            self._learn("box", tic, count)
+
+        if labels is not None and tier in ("full", "top_k"):
+            keep: Sequence[int] = range(count)
+            if tier == "top_k":
+                keep = self._top_k(scores, count)
+            tic = time.perf_counter()
+            _draw_labels(
+                output,
+                [labels[i] for i in keep],
+                [converted_bboxes[i] for i in keep],
+                self.label_style,
+            )
+            self._learn("label", tic, len(keep))
+        elif labels is not None and self._costs["label"] is not None:
+            # Skipped labels cannot be timed, so let their estimate decay until
+            # a label tier is tried again and measures the current cost
+            self._costs["label"] *= 1 - self.smoothing
+
+        self.last_tier = tier
+        return output, tier
+
+    def _choose_tier(self, remaining: float, num_boxes: int, num_labels: int) -> str:
+        """Return the best tier predicted to fit in ``remaining`` seconds."""
+        box = self._costs["box"] or 0.0
+        label = self._costs["label"] or 0.0
+        predictions = (
+            ("full", num_boxes * box + num_labels * label),
+            ("top_k", num_boxes * box + min(num_labels, self.top_k) * label),
+            ("boxes", num_boxes * box),
+        )
+        for tier, cost in predictions:
+            if cost <= remaining:
+                return tier
+        return "minimal"
+
+    def _top_k(self, scores: NDArray[np.float64] | None, count: int) -> list[int]:
+        """Return the indices of the boxes labelled by the ``"top_k"`` tier."""
+        if scores is None:
+            return list(range(min(count, self.top_k)))
+        # Stable sort keeps the original order among equal scores
+        order = np.argsort(-scores, kind="stable")[: self.top_k]
+        return cast("list[int]", np.sort(order).tolist())
+
+    def _learn(
+        self, primitive: str, tic: float, count: int, follow: str | None = None
+    ) -> None:
+        """Fold the time since ``tic`` for ``count`` primitives into the estimate.
+
+        With ``follow``, that primitive's estimate is scaled by the same
+        factor, for costs that cannot be measured on this frame.
+        """
+        if count == 0:
+            return
+        measured = (time.perf_counter() - tic) / count
+        previous = self._costs[primitive]
+        if previous is None:
+            self._costs[primitive] = measured
+            return
+        current = previous + self.smoothing * (measured - previous)
+        self._costs[primitive] = current
+        followed = self._costs[follow] if follow is not None else None
+        if followed is not None and previous > 0:
+            self._costs[cast("str", follow)] = followed * current / previous
@@ -0,0 +1,136 @@
+"""Density heatmaps for scenes with too many boxes to outline."""
+
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from ._utils import _as_array, _check_and_modify_bboxes
+
+#: Density modes accepted by :func:`draw_density`.
+SUPPORTED_DENSITY_MODES = ("coverage", "centers")
+
+
+def draw_density(
+    img: NDArray[np.uint8],
+    bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+    mode: str = "coverage",
+    colormap: int = cv2.COLORMAP_JET,
+    alpha: float = 0.5,
+    sigma: float = 8.0,
+    bbox_format: str = "voc",
+) -> NDArray[np.uint8]:
+    """Overlay a heatmap of where boxes are, for frames with thousands of them.
+
+    Boxes are accumulated into a per-pixel count with ``np.bincount`` and no
+    per-box drawing: in ``"coverage"`` mode each box adds its four corners to
+    a difference image whose summed-area table (``cv2.integral``) is the
+    number of boxes covering each pixel; in ``"centers"`` mode each box adds
+    its center point and the counts are smoothed with a Gaussian blur. The
+    counts are scaled to the densest pixel, colored with ``colormap`` and
+    blended once, leaving pixels no box touches unchanged. On grayscale frames
+    the colormap is shown by its luma.
+
+    Args:
+        img: Input image array
+        bboxes: Bounding boxes, each in ``bbox_format`` (default VOC:
+            [x_min, y_min, x_max, y_max]), as a list or an (N, 4) array
+        mode: ``"coverage"`` to count boxes covering each pixel, or
+            ``"centers"`` to show where box centers cluster (default: "coverage")
+        colormap: OpenCV colormap, e.g. ``cv2.COLORMAP_JET`` (default)
+        alpha: Opacity of the heatmap (default: 0.5)
+        sigma: Gaussian blur sigma in pixels for ``"centers"`` mode (default: 8.0)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+
+    Returns:
+        New image with the heatmap blended in; the input image is not modified
+
+    Raises:
+        ValueError: If ``bboxes`` is empty or invalid, or ``mode`` is unsupported
+
+    """
+    if mode not in SUPPORTED_DENSITY_MODES:
+        raise ValueError(
+            f"Unsupported density mode {mode!r}. "
+            f"Expected one of {SUPPORTED_DENSITY_MODES}."
+        )
+    bboxes = _as_array(bboxes)
+    # len() instead of truthiness: numpy arrays raise on ambiguous bool()
+    if bboxes is None or len(bboxes) == 0:
+        raise ValueError("List of bounding boxes cannot be empty")
+    boxes = _check_and_modify_bboxes(bboxes, img.shape, bbox_format)
+    height, width = img.shape[:2]
+
+    if mode == "coverage":
+        density = _coverage(boxes, height, width)
+    else:
+        density = _center_density(boxes, height, width, sigma)
+
+    output = img.copy()
+    peak = float(density.max())
+    if peak <= 0:
+        return output
+    levels = cv2.convertScaleAbs(density, alpha=255 / peak)
+    heat = _match_frame(cv2.applyColorMap(levels, colormap), img)
+    blended = cv2.addWeighted(img, 1 - alpha, heat, alpha, 0)
+    # Only pixels with a non-zero level take the blend
+    return cv2.copyTo(blended, levels, output)
+
+
+def _coverage(boxes: NDArray[np.int64], height: int, width: int) -> NDArray[np.float64]:
+    """Return how many of the clipped VOC ``boxes`` cover each pixel."""
+    # Boxes include their max coordinates, as cv2.rectangle fills them; clipped
+    # maxima may equal the image size, so the +1 edges can land on row/column
+    # height + 1 or width + 1: pad the difference image by two
+    padded_width = width + 2
+    x1, y1, x2, y2 = boxes.T
+    corners = np.concatenate(
+        [
+            y1 * padded_width + x1,
+            y1 * padded_width + x2 + 1,
+            (y2 + 1) * padded_width + x1,
+            (y2 + 1) * padded_width + x2 + 1,
+        ]
+    )
+    signs = np.repeat(np.array([1.0, -1.0, -1.0, 1.0]), len(boxes))
+    # np.bincount accumulates repeated corners like np.add.at, but faster
+    diff = np.bincount(corners, signs, minlength=(height + 2) * padded_width)
+    # The summed-area table of the difference image is the coverage count;
+    # cv2.integral prepends a zero row and column
+    table = cv2.integral(diff.reshape(height + 2, padded_width), sdepth=cv2.CV_64F)
+    return table[1 : height + 1, 1 : width + 1]
+
+
+def _center_density(
+    boxes: NDArray[np.int64], height: int, width: int, sigma: float
+) -> NDArray[np.float32]:
+    """Return the Gaussian-smoothed count of box centers around each pixel."""
+    # Counting centers in cells of about sigma / 2 pixels and blurring the
+    # small grid is several times faster than blurring the full frame, and
+    # looks the same once the result is resized back up
+    cell = max(1, int(sigma / 2))
+    grid_height, grid_width = -(-height // cell), -(-width // cell)
+    centers_x = np.minimum((boxes[:, 0] + boxes[:, 2]) // 2, width - 1) // cell
+    centers_y = np.minimum((boxes[:, 1] + boxes[:, 3]) // 2, height - 1) // cell
+    counts = np.bincount(
+        centers_y * grid_width + centers_x, minlength=grid_height * grid_width
+    )
+    grid = counts.reshape(grid_height, grid_width).astype(np.float32)
+    grid = cv2.GaussianBlur(grid, (0, 0), sigma / cell)
+    return cv2.resize(grid, (width, height), interpolation=cv2.INTER_LINEAR)
+
+
+def _match_frame(heat: NDArray[np.uint8], img: NDArray[np.integer]) -> NDArray:
+    """Convert a BGR heatmap to the channels and bit depth of ``img``."""
+    channels = 1 if img.ndim == 2 else img.shape[2]
+    if channels == 1:
+        heat = cv2.cvtColor(heat, cv2.COLOR_BGR2GRAY).reshape(img.shape)
+    elif channels == 4:
+        heat = cv2.cvtColor(heat, cv2.COLOR_BGR2BGRA)
+    elif channels != 3:
+        raise ValueError(f"Images must have 1, 3 or 4 channels, got {channels}")
+    if img.dtype == np.uint16:
+        heat = heat.astype(np.uint16)
+        heat *= 257  # 255 * 257 == 65535
+    return heat
@@ -0,0 +1,228 @@
+"""Single-pass drawing of boxes and their labels."""
+
+import dataclasses
+from collections.abc import Sequence
+from typing import cast
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ._utils import _as_array, _check_and_modify_bboxes
+from .filtering import DetectionFilter
+from .flags import _draw_flags, _draw_T_labels
+from .labels import _draw_labels
+from .rectangle import _box_colors, _draw_rectangles, _is_per_box_color
+from .styles import BoxStyle, FlagStyle, LabelStyle
+
+#: Label positions accepted by :func:`draw_detections`.
+SUPPORTED_LABEL_POSITIONS = ("top", "inside", "T", "flag")
+
+# Layout kind (see layout._LAYOUTS) of each label position; "top" and
+# "inside" differ only in LabelStyle.top
+_LABEL_KINDS = {"top": "label", "inside": "label", "T": "T", "flag": "flag"}
+
+
+def draw_detections(
+    img: NDArray[np.uint8],
+    bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+    labels: list[str] | None = None,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer] = (255, 255, 255),
+    label_position: str = "top",
+    thickness: int = 3,
+    is_opaque: bool = False,
+    alpha: float = 0.5,
+    label_size: float = 1,
+    label_thickness: int = 2,
+    text_bg_color: tuple[int, int, int] = (255, 255, 255),
+    text_color: tuple[int, int, int] = (0, 0, 0),
+    bbox_format: str = "voc",
+    box_style: BoxStyle | None = None,
+    label_style: LabelStyle | FlagStyle | None = None,
+    detection_filter: DetectionFilter | None = None,
+    scores: ArrayLike | None = None,
+    class_ids: ArrayLike | None = None,
+) -> NDArray[np.uint8]:
+    """Draw boxes and their labels in one pass.
+
+    Same result as :func:`draw_multiple_rectangles` followed by
+    :func:`add_multiple_labels` (or the T and flag variants), but the boxes are
+    converted and clipped once, in one vectorized pass, the frame is copied
+    once, and the labels are placed from the already clipped integer boxes.
+
+    Args:
+        img: Input image array
+        bboxes: Bounding boxes, each in ``bbox_format`` (default VOC:
+            [x_min, y_min, x_max, y_max]), as a list or an (N, 4) array
+        labels: Optional list of text labels, one per box (default: None)
+        bbox_color: BGR color tuple applied to all boxes, a sequence of one
+            color per box, or an integer array of shape (N, 3) (default: white)
+        label_position: ``"top"`` (above the box, inside if it does not fit),
+            ``"inside"``, ``"T"`` (see :func:`add_T_label`) or ``"flag"``
+            (see :func:`draw_flag_with_label`) (default: "top")
+        thickness: Box line thickness in pixels (default: 3)
+        is_opaque: If True, draws filled boxes with transparency (default: False)
+        alpha: Transparency level for filled boxes (default: 0.5)
+        label_size: Font size multiplier for labels (default: 1)
+        label_thickness: Text thickness in pixels (default: 2)
+        text_bg_color: BGR color tuple for text backgrounds, and for the
+            flag poles (default: white)
+        text_color: BGR color tuple for text (default: black)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        box_style: Pre-validated :class:`BoxStyle` replacing the box arguments
+            above (per-box colors in ``bbox_color`` still apply)
+        label_style: Pre-validated :class:`LabelStyle`, or :class:`FlagStyle`
+            for ``"flag"``, replacing the label arguments above; its
+            ``bbox_format`` is ignored in favor of the box style's
+        detection_filter: Optional :class:`DetectionFilter` choosing which
+            detections to draw (default: None, draw all)
+        scores: Confidence per box, for ``detection_filter`` (default: None)
+        class_ids: Integer class per box, for ``detection_filter`` (default: None)
+
+    Returns:
+        New image with the boxes and labels drawn; the input image is not
+        modified
+
+    Raises:
+        ValueError: If the inputs are invalid, ``label_position`` is
+            unsupported or ``label_style`` does not suit it
+
+    """
+    boxes, colors, labels, box_style = _prepare_detections(
+        img.shape,
+        bboxes,
+        labels,
+        bbox_color,
+        label_position,
+        thickness,
+        is_opaque,
+        alpha,
+        bbox_format,
+        box_style,
+        detection_filter,
+        scores,
+        class_ids,
+    )
+
+    output = img.copy()
+    if len(boxes) == 0:
+        return output
+    _draw_rectangles(output, boxes, colors, box_style)
+    if labels is not None:
+        _draw_detection_labels(
+            output,
+            labels,
+            boxes,
+            label_position,
+            _label_style(
+                label_position,
+                label_style,
+                label_size,
+                label_thickness,
+                text_bg_color,
+                text_color,
+            ),
+        )
+    return output
+
+
+def _prepare_detections(
+    img_size: tuple[int, ...],
+    bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+    labels: list[str] | None,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer],
+    label_position: str,
+    thickness: int,
+    is_opaque: bool,
+    alpha: float,
+    bbox_format: str,
+    box_style: BoxStyle | None,
+    detection_filter: DetectionFilter | None,
+    scores: ArrayLike | None,
+    class_ids: ArrayLike | None,
+) -> tuple[NDArray[np.int64], NDArray[np.uint8], list[str] | None, BoxStyle]:
+    """Validate the arguments of :func:`draw_detections`.
+
+    Returns:
+        (boxes, colors, labels, box_style): the clipped VOC boxes, their
+        colors and labels, with filtered-out detections dropped, and the box
+        style to draw them with
+
+    """
+    if label_position not in SUPPORTED_LABEL_POSITIONS:
+        raise ValueError(
+            f"Unsupported label_position {label_position!r}. "
+            f"Expected one of {SUPPORTED_LABEL_POSITIONS}."
+        )
+    bboxes = _as_array(bboxes)
+    # len() instead of truthiness: numpy arrays raise on ambiguous bool()
+    if bboxes is None or len(bboxes) == 0:
+        raise ValueError("List of bounding boxes cannot be empty")
+    if labels is not None and len(labels) != len(bboxes):
+        raise ValueError("Number of bounding boxes must match number of labels")
+
+    if box_style is None:
+        single_color = (
+            (255, 255, 255)
+            if _is_per_box_color(bbox_color)
+            else cast("tuple[int, int, int]", bbox_color)
+        )
+        box_style = BoxStyle(single_color, thickness, is_opaque, alpha, bbox_format)
+    colors = _box_colors(bbox_color, box_style, len(bboxes))
+    boxes = _check_and_modify_bboxes(bboxes, img_size, box_style.bbox_format)
+    if detection_filter is not None:
+        keep = detection_filter.indices(boxes, scores, class_ids)
+        boxes, colors = boxes[keep], colors[keep]
+        if labels is not None:
+            labels = [labels[i] for i in keep]
+    return boxes, colors, labels, box_style
+
+
+def _label_style(
+    label_position: str,
+    label_style: LabelStyle | FlagStyle | None,
+    size: float,
+    thickness: int,
+    text_bg_color: tuple[int, int, int],
+    text_color: tuple[int, int, int],
+) -> LabelStyle | FlagStyle:
+    """Return the style ``label_position`` draws with, built if not passed in."""
+    if label_position == "flag":
+        if label_style is None:
+            return FlagStyle(
+                size,
+                thickness,
+                line_color=text_bg_color,
+                text_bg_color=text_bg_color,
+                text_color=text_color,
+            )
+        if not isinstance(label_style, FlagStyle):
+            raise ValueError('label_position "flag" needs a FlagStyle')
+        return label_style
+    if label_style is None:
+        label_style = LabelStyle(size, thickness, True, text_bg_color, text_color)
+    elif not isinstance(label_style, LabelStyle):
+        raise ValueError(f"label_position {label_position!r} needs a LabelStyle")
+    top = label_position != "inside"
+    if label_style.top != top:
+        label_style = dataclasses.replace(label_style, top=top)
+    return label_style
+
+
+def _draw_detection_labels(
+    output: NDArray[np.uint8],
+    labels: Sequence[str],
+    boxes: NDArray[np.int64],
+    label_position: str,
+    style: LabelStyle | FlagStyle,
+) -> None:
+    """Draw labels at ``label_position`` for clipped VOC boxes, in place."""
+    if label_position in ("top", "inside"):
+        _draw_labels(output, labels, boxes, cast("LabelStyle", style))
+    elif label_position == "T":
+        _draw_T_labels(output, labels, boxes, cast("LabelStyle", style))
+    else:
+        _draw_flags(output, labels, boxes, cast("FlagStyle", style))
@@ -0,0 +1,470 @@
+"""Export of annotations as vector display lists instead of pixels.
+
+A display list holds the primitives :func:`draw_detections` would draw, in
+drawing order: rectangles, polylines and text with their positions, colors
+and measured ink metrics. It can be stored next to the raw video, a few KB
+per frame, and drawn client side, for example by a browser from the JSON or
+SVG encoding.
+"""
+
+import json
+import struct
+from collections.abc import Sequence
+from typing import Any, cast
+from xml.sax.saxutils import escape
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .detections import _LABEL_KINDS, _label_style, _prepare_detections
+from .filtering import DetectionFilter
+from .layout import _layout, _text_block
+from .styles import BoxStyle, FlagStyle, LabelStyle
+
+#: Encodings accepted by :func:`encode_display_list`.
+SUPPORTED_DISPLAY_LIST_FORMATS = ("json", "svg", "binary")
+
+# Packed binary layout, little endian: a header, then one record per
+# primitive starting with its type and RGB color
+_MAGIC = b"BBVD"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBIII")
+_PRIMITIVE = struct.Struct("<B3B")
+_RECT = struct.Struct("<iiiihd")
+_POLYLINE = struct.Struct("<hH")
+_TEXT = struct.Struct("<iidhhhhH")
+_TYPES = ("rect", "polyline", "text")
+
+# Hershey simplex capitals are 22px tall at size 1 and sans-serif capitals
+# about 0.72em, so this font size gives SVG text roughly the drawn height
+_SVG_FONT_SIZE = 22 / 0.72
+
+
+def display_list(
+    img_size: tuple[int, ...],
+    bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+    labels: list[str] | None = None,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer] = (255, 255, 255),
+    label_position: str = "top",
+    thickness: int = 3,
+    is_opaque: bool = False,
+    alpha: float = 0.5,
+    label_size: float = 1,
+    label_thickness: int = 2,
+    text_bg_color: tuple[int, int, int] = (255, 255, 255),
+    text_color: tuple[int, int, int] = (0, 0, 0),
+    bbox_format: str = "voc",
+    box_style: BoxStyle | None = None,
+    label_style: LabelStyle | FlagStyle | None = None,
+    detection_filter: DetectionFilter | None = None,
+    scores: ArrayLike | None = None,
+    class_ids: ArrayLike | None = None,
+) -> dict[str, Any]:
+    """Return the primitives :func:`draw_detections` would draw, without drawing.
+
+    Takes the same arguments as :func:`draw_detections`, with the image
+    replaced by its shape, and places everything the same way. Each
+    primitive is a dict with a ``"type"`` and a ``"color"`` (``"#rrggbb"``):
+
+    - ``"rect"``: ``x1``, ``y1``, ``x2``, ``y2``, ``thickness`` and
+      ``alpha``, as passed to ``cv2.rectangle``: the corners are the stroke's
+      center line, and a ``thickness`` of -1 fills the rectangle, blended
+      with the frame by ``alpha``
+    - ``"polyline"``: ``points`` ([[x, y], ...]) and ``thickness``
+    - ``"text"``: one line of text, its baseline starting at ``x``, ``y``,
+      with the ``size`` and ``thickness`` of the Hershey simplex font and its
+      measured ``width``, ``ascent`` and ``descent`` in pixels
+
+    T and flag labels that do not fit above their box fall back to normal
+    labels, as when drawn, but without logging a warning.
+
+    Args:
+        img_size: Shape of the frame the detections belong to
+        bboxes: Bounding boxes, each in ``bbox_format``, as a list or an
+            (N, 4) array
+        labels: Optional list of text labels, one per box (default: None)
+        bbox_color: BGR color tuple applied to all boxes, or one color per box
+            (default: white)
+        label_position: ``"top"``, ``"inside"``, ``"T"`` or ``"flag"``
+            (default: "top")
+        thickness: Box line thickness in pixels (default: 3)
+        is_opaque: If True, boxes are filled with transparency (default: False)
+        alpha: Transparency level for filled boxes (default: 0.5)
+        label_size: Font size multiplier for labels (default: 1)
+        label_thickness: Text thickness in pixels (default: 2)
+        text_bg_color: BGR color tuple for text backgrounds (default: white)
+        text_color: BGR color tuple for text (default: black)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        box_style: Pre-validated :class:`BoxStyle` replacing the box arguments
+        label_style: Pre-validated :class:`LabelStyle` or :class:`FlagStyle`
+            replacing the label arguments
+        detection_filter: Optional :class:`DetectionFilter` choosing which
+            detections to export (default: None, export all)
+        scores: Confidence per box, for ``detection_filter`` (default: None)
+        class_ids: Integer class per box, for ``detection_filter`` (default: None)
+
+    Returns:
+        Dict with the frame ``"width"`` and ``"height"`` and the list of
+        ``"primitives"`` in drawing order, ready for :func:`json.dumps` or
+        :func:`encode_display_list`
+
+    Raises:
+        ValueError: If the inputs are invalid, as for :func:`draw_detections`
+
+    """
+    boxes, colors, labels, box_style = _prepare_detections(
+        img_size,
+        bboxes,
+        labels,
+        bbox_color,
+        label_position,
+        thickness,
+        is_opaque,
+        alpha,
+        bbox_format,
+        box_style,
+        detection_filter,
+        scores,
+        class_ids,
+    )
+    primitives = [
+        _box_primitive(bbox, color, box_style)
+        for bbox, color in zip(boxes.tolist(), colors.tolist(), strict=True)
+    ]
+    if labels is not None and len(boxes) > 0:
+        style = _label_style(
+            label_position,
+            label_style,
+            label_size,
+            label_thickness,
+            text_bg_color,
+            text_color,
+        )
+        primitives.extend(
+            _label_primitives(labels, boxes, _LABEL_KINDS[label_position], style)
+        )
+    return {"width": img_size[1], "height": img_size[0], "primitives": primitives}
+
+
+def encode_display_list(display: dict[str, Any], fmt: str = "json") -> str | bytes:
+    """Encode a :func:`display_list` for storage or a client-side renderer.
+
+    Args:
+        display: Display list returned by :func:`display_list`
+        fmt: ``"json"`` (compact JSON text), ``"svg"`` (an SVG document the
+            size of the frame, to lay over it) or ``"binary"`` (packed
+            little-endian records, read back by :func:`decode_display_list`)
+            (default: "json")
+
+    Returns:
+        ``str`` for JSON and SVG, ``bytes`` for the binary format
+
+    Raises:
+        ValueError: If ``fmt`` is unsupported
+
+    """
+    if fmt == "json":
+        return json.dumps(display, separators=(",", ":"))
+    if fmt == "svg":
+        return _to_svg(display)
+    if fmt == "binary":
+        return _to_binary(display)
+    raise ValueError(
+        f"Unsupported display list format {fmt!r}. "
+        f"Expected one of {SUPPORTED_DISPLAY_LIST_FORMATS}."
+    )
+
+
+def decode_display_list(data: str | bytes) -> dict[str, Any]:
+    """Decode a display list encoded as JSON or in the binary format.
+
+    Args:
+        data: Output of :func:`encode_display_list` with ``fmt`` ``"json"``
+            or ``"binary"``
+
+    Returns:
+        The display list, equal to the one that was encoded
+
+    Raises:
+        ValueError: If ``data`` is not an encoded display list
+
+    """
+    if isinstance(data, bytes) and data.startswith(_MAGIC):
+        return _from_binary(data)
+    try:
+        display = json.loads(data)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("data is not an encoded display list") from e
+    if not isinstance(display, dict) or "primitives" not in display:
+        raise ValueError("data is not an encoded display list")
+    return display
+
+
+def _hex(color: Sequence[int]) -> str:
+    """Return a BGR color as a CSS ``#rrggbb`` string."""
+    blue, green, red = color
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def _rect(
+    corners: Sequence[int], color: Sequence[int], thickness: int, alpha: float = 1.0
+) -> dict[str, Any]:
+    """Return a rectangle primitive."""
+    x1, y1, x2, y2 = corners
+    return {
+        "type": "rect",
+        "color": _hex(color),
+        "x1": x1,
+        "y1": y1,
+        "x2": x2,
+        "y2": y2,
+        "thickness": thickness,
+        "alpha": alpha,
+    }
+
+
+def _box_primitive(
+    bbox: Sequence[int], color: Sequence[int], style: BoxStyle
+) -> dict[str, Any]:
+    """Return the rectangle :func:`_draw_rectangles` draws for one box."""
+    if style.is_opaque:
+        return _rect(bbox, color, -1, style.alpha)
+    # Same inward stroke shift as the rasterizer
+    shift = style.stroke_shift
+    x1, y1, x2, y2 = bbox
+    return _rect(
+        (x1 + shift, y1 + shift, x2 - shift, y2 - shift), color, style.thickness
+    )
+
+
+def _label_primitives(
+    labels: Sequence[str],
+    boxes: NDArray[np.int64],
+    kind: str,
+    style: LabelStyle | FlagStyle,
+) -> list[dict[str, Any]]:
+    """Return the primitives :func:`_rasterize` draws for a label layout."""
+    layout = _layout(kind, labels, boxes, style)
+    if isinstance(style, FlagStyle):
+        pole_color, draw_bg = style.line_color, True
+    else:
+        pole_color, draw_bg = style.text_bg_color, style.draw_bg
+    primitives = []
+    rows = zip(
+        labels,
+        boxes.tolist(),
+        layout.backgrounds.tolist(),
+        layout.origins.tolist(),
+        layout.poles.tolist(),
+        layout.has_pole.tolist(),
+        layout.has_text.tolist(),
+        layout.fallback.tolist(),
+        strict=True,
+    )
+    for label, bbox, bg, origin, pole, has_pole, has_text, fallback in rows:
+        if has_pole:
+            primitives.append(
+                {
+                    "type": "polyline",
+                    "color": _hex(pole_color),
+                    "points": [pole[:2], pole[2:]],
+                    "thickness": 3,
+                }
+            )
+        if fallback and isinstance(style, FlagStyle):
+            primitives.append(
+                _box_primitive(bbox, style.box_style.color, style.box_style)
+            )
+        if not has_text:
+            continue
+        if draw_bg:
+            primitives.append(_rect(bg, style.text_bg_color, -1))
+        primitives.extend(_text_primitives(label, origin, style))
+    return primitives
+
+
+def _text_primitives(
+    label: str, origin: Sequence[int], style: LabelStyle | FlagStyle
+) -> list[dict[str, Any]]:
+    """Return one text primitive per line of ``label``, as :func:`_put_lines` writes."""
+    _, _, baselines = _text_block(label, style)
+    primitives = []
+    for line, baseline in zip(label.split("\n"), baselines, strict=True):
+        width, ascent, descent = style.metrics(line)
+        primitives.append(
+            {
+                "type": "text",
+                "color": _hex(style.text_color),
+                "text": line,
+                "x": origin[0],
+                "y": origin[1] + baseline - baselines[0],
+                "size": style.size,
+                "thickness": style.thickness,
+                "width": width,
+                "ascent": ascent,
+                "descent": descent,
+            }
+        )
+    return primitives
+
+
+def _to_svg(display: dict[str, Any]) -> str:
+    """Return an SVG document drawing the display list over a frame."""
+    width, height = display["width"], display["height"]
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+        f'height="{height}" viewBox="0 0 {width} {height}">'
+    ]
+    group_alpha = None
+    for primitive in display["primitives"]:
+        # Consecutive translucent fills share one group, so that overlapping
+        # boxes are blended once, as the rasterizer blends them
+        alpha = primitive.get("alpha", 1.0) if primitive["thickness"] < 0 else 1.0
+        if alpha != group_alpha and group_alpha is not None:
+            parts.append("</g>")
+            group_alpha = None
+        if alpha < 1 and group_alpha is None:
+            parts.append(f'<g opacity="{alpha:g}">')
+            group_alpha = alpha
+        parts.append(_svg_element(primitive))
+    if group_alpha is not None:
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def _svg_element(primitive: dict[str, Any]) -> str:
+    """Return the SVG element for one primitive."""
+    color = primitive["color"]
+    if primitive["type"] == "rect":
+        x1, y1 = primitive["x1"], primitive["y1"]
+        x2, y2 = primitive["x2"], primitive["y2"]
+        if primitive["thickness"] < 0:
+            # cv2 fills both corner pixels
+            return (
+                f'<rect x="{x1}" y="{y1}" width="{x2 - x1 + 1}" '
+                f'height="{y2 - y1 + 1}" fill="{color}"/>'
+            )
+        # Pixel centers are half a unit in from the pixel corners
+        return (
+            f'<rect x="{x1 + 0.5:g}" y="{y1 + 0.5:g}" width="{x2 - x1}" '
+            f'height="{y2 - y1}" fill="none" stroke="{color}" '
+            f'stroke-width="{primitive["thickness"]}"/>'
+        )
+    if primitive["type"] == "polyline":
+        points = " ".join(f"{x + 0.5:g},{y + 0.5:g}" for x, y in primitive["points"])
+        return (
+            f'<polyline points="{points}" fill="none" stroke="{color}" '
+            f'stroke-width="{primitive["thickness"]}"/>'
+        )
+    # Stretch the text to the measured width of the drawn text
+    return (
+        f'<text x="{primitive["x"]}" y="{primitive["y"]}" '
+        f'font-family="sans-serif" '
+        f'font-size="{primitive["size"] * _SVG_FONT_SIZE:.1f}" '
+        f'textLength="{primitive["width"]}" lengthAdjust="spacingAndGlyphs" '
+        f'fill="{color}">{escape(primitive["text"])}</text>'
+    )
+
+
+def _rgb(color: str) -> tuple[int, int, int]:
+    """Return the (r, g, b) bytes of a ``#rrggbb`` color."""
+    return cast("tuple[int, int, int]", tuple(bytes.fromhex(color[1:])))
+
+
+def _to_binary(display: dict[str, Any]) -> bytes:
+    """Pack the display list into little-endian records."""
+    primitives = display["primitives"]
+    parts = [
+        _HEADER.pack(
+            _MAGIC, _VERSION, display["width"], display["height"], len(primitives)
+        )
+    ]
+    for primitive in primitives:
+        kind = primitive["type"]
+        parts.append(_PRIMITIVE.pack(_TYPES.index(kind), *_rgb(primitive["color"])))
+        if kind == "rect":
+            parts.append(
+                _RECT.pack(
+                    primitive["x1"],
+                    primitive["y1"],
+                    primitive["x2"],
+                    primitive["y2"],
+                    primitive["thickness"],
+                    primitive["alpha"],
+                )
+            )
+        elif kind == "polyline":
+            points = primitive["points"]
+            parts.append(_POLYLINE.pack(primitive["thickness"], len(points)))
+            parts.append(np.asarray(points, dtype="<i4").tobytes())
+        else:
+            text = primitive["text"].encode()
+            parts.append(
+                _TEXT.pack(
+                    primitive["x"],
+                    primitive["y"],
+                    primitive["size"],
+                    primitive["thickness"],
+                    primitive["width"],
+                    primitive["ascent"],
+                    primitive["descent"],
+                    len(text),
+                )
+            )
+            parts.append(text)
+    return b"".join(parts)
+
+
+def _from_binary(data: bytes) -> dict[str, Any]:
+    """Unpack a display list packed by :func:`_to_binary`."""
+    try:
+        _, version, width, height, count = _HEADER.unpack_from(data)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported display list version {version}")
+        offset = _HEADER.size
+        primitives = []
+        for _ in range(count):
+            kind, red, green, blue = _PRIMITIVE.unpack_from(data, offset)
+            offset += _PRIMITIVE.size
+            primitive: dict[str, Any] = {
+                "type": _TYPES[kind],
+                "color": f"#{red:02x}{green:02x}{blue:02x}",
+            }
+            if primitive["type"] == "rect":
+                x1, y1, x2, y2, thickness, alpha = _RECT.unpack_from(data, offset)
+                offset += _RECT.size
+                primitive.update(
+                    x1=x1, y1=y1, x2=x2, y2=y2, thickness=thickness, alpha=alpha
+                )
+            elif primitive["type"] == "polyline":
+                thickness, num_points = _POLYLINE.unpack_from(data, offset)
+                offset += _POLYLINE.size
+                points = np.frombuffer(data, "<i4", 2 * num_points, offset)
+                offset += points.nbytes
+                primitive.update(
+                    points=points.reshape(-1, 2).tolist(), thickness=thickness
+                )
+            else:
+                x, y, size, thickness, text_width, ascent, descent, length = (
+                    _TEXT.unpack_from(data, offset)
+                )
+                offset += _TEXT.size
+                text = data[offset : offset + length].decode()
+                offset += length
+                primitive.update(
+                    text=text,
+                    x=x,
+                    y=y,
+                    size=size,
+                    thickness=thickness,
+                    width=text_width,
+                    ascent=ascent,
+                    descent=descent,
+                )
+            primitives.append(primitive)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError("data is not an encoded display list") from e
+    return {"width": width, "height": height, "primitives": primitives}
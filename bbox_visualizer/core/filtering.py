@@ -0,0 +1,275 @@
+"""Vectorized filtering of detections before they are drawn."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ._utils import SUPPORTED_BBOX_FORMATS, _as_array, _validate_bbox_format
+
+# Rows of the IoU block computed at once by the NMS sweep
+_SWEEP_CHUNK = 256
+
+
+@dataclass(frozen=True)
+class DetectionFilter:
+    """Reusable filter selecting which detections to draw.
+
+    Steps run in this order: score threshold, class allow list, class deny
+    list, greedy non-maximum suppression, then top-K. Every unset step is
+    skipped. Pass the filter as ``detection_filter=`` to
+    :func:`draw_multiple_rectangles` or :func:`add_multiple_labels`, or call
+    :meth:`indices` directly.
+
+    Attributes:
+        score_threshold: Drop detections scoring below this (default: None)
+        classes: Keep only these class IDs (default: None, keep all)
+        exclude_classes: Drop these class IDs (default: None)
+        top_k: Keep at most this many detections, best scores first
+            (default: None)
+        iou_threshold: Suppress a detection whose IoU with a better one
+            exceeds this (default: None, no suppression)
+        class_agnostic: If True, suppression ignores classes; otherwise only
+            boxes of the same class suppress each other (default: False)
+
+    """
+
+    score_threshold: float | None = None
+    classes: Sequence[int] | None = None
+    exclude_classes: Sequence[int] | None = None
+    top_k: int | None = None
+    iou_threshold: float | None = None
+    class_agnostic: bool = False
+
+    def __post_init__(self) -> None:
+        """Validate the filter and normalize its class lists."""
+        if self.top_k is not None and self.top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        if self.iou_threshold is not None and not 0 <= self.iou_threshold <= 1:
+            raise ValueError("iou_threshold must be between 0 and 1")
+        for name in ("classes", "exclude_classes"):
+            value = getattr(self, name)
+            if value is not None:
+                object.__setattr__(self, name, tuple(int(c) for c in value))
+
+    def indices(
+        self,
+        bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+        scores: ArrayLike | None = None,
+        class_ids: ArrayLike | None = None,
+        bbox_format: str = "voc",
+    ) -> NDArray[np.intp]:
+        """Return the indices of the detections that pass the filter.
+
+        Args:
+            bboxes: Bounding boxes, each in ``bbox_format`` (default VOC:
+                [x_min, y_min, x_max, y_max]), as a list or an (N, 4) array
+            scores: Confidence per box; without scores, earlier boxes rank
+                higher for NMS and top-K (default: None)
+            class_ids: Integer class per box (default: None)
+            bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+
+        Returns:
+            Ascending indices into ``bboxes``, so the kept detections keep
+            their drawing order and index labels and colors directly
+
+        Raises:
+            ValueError: If the inputs do not match in length, or a step needs
+                scores or class IDs that were not given
+
+        """
+        boxes = _to_corners(bboxes, bbox_format)
+        scores = _per_box(scores, len(boxes), "scores", np.float64)
+        class_ids = _per_box(class_ids, len(boxes), "class IDs", np.int64)
+
+        candidates = np.flatnonzero(self._mask(len(boxes), scores, class_ids))
+        if scores is not None:
+            # Best first; the stable sort keeps input order among equal scores
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        if self.iou_threshold is not None and len(candidates) > 1:
+            ranked = boxes[candidates]
+            if class_ids is not None and not self.class_agnostic:
+                # Shift each class to its own region so classes never overlap
+                span = ranked.max() - ranked.min() + 1
+                classes = class_ids[candidates]
+                ranked = ranked + ((classes - classes.min()) * span)[:, np.newaxis]
+            candidates = candidates[_nms(ranked, self.iou_threshold)]
+        if self.top_k is not None:
+            candidates = candidates[: self.top_k]
+        return np.sort(candidates)
+
+    def _mask(
+        self,
+        count: int,
+        scores: NDArray[np.float64] | None,
+        class_ids: NDArray[np.int64] | None,
+    ) -> NDArray[np.bool_]:
+        """Return which of ``count`` detections pass the score and class steps."""
+        keep = np.ones(count, dtype=bool)
+        if self.score_threshold is not None:
+            if scores is None:
+                raise ValueError("score_threshold needs scores")
+            keep &= scores >= self.score_threshold
+        if self.classes is not None or self.exclude_classes is not None:
+            if class_ids is None:
+                raise ValueError("Class filters need class_ids")
+            if self.classes is not None:
+                keep &= np.isin(class_ids, self.classes)
+            if self.exclude_classes is not None:
+                keep &= ~np.isin(class_ids, self.exclude_classes)
+        return keep
+
+
+def filter_detections(
+    bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+    scores: ArrayLike | None = None,
+    class_ids: ArrayLike | None = None,
+    score_threshold: float | None = None,
+    classes: Sequence[int] | None = None,
+    exclude_classes: Sequence[int] | None = None,
+    top_k: int | None = None,
+    iou_threshold: float | None = None,
+    class_agnostic: bool = False,
+    bbox_format: str = "voc",
+) -> NDArray[np.intp]:
+    """Select detections by score, class, non-maximum suppression and top-K.
+
+    Builds a :class:`DetectionFilter` and applies it; see there for the order
+    of the steps. The returned indices select the matching labels, colors and
+    scores as well as the boxes:
+
+    Example:
+        >>> keep = filter_detections(bboxes, scores, iou_threshold=0.5)
+        >>> img = draw_multiple_rectangles(img, np.asarray(bboxes)[keep])
+
+    Args:
+        bboxes: Bounding boxes, each in ``bbox_format`` (default VOC:
+            [x_min, y_min, x_max, y_max]), as a list or an (N, 4) array
+        scores: Confidence per box; without scores, earlier boxes rank
+            higher for NMS and top-K (default: None)
+        class_ids: Integer class per box (default: None)
+        score_threshold: Drop detections scoring below this (default: None)
+        classes: Keep only these class IDs (default: None, keep all)
+        exclude_classes: Drop these class IDs (default: None)
+        top_k: Keep at most this many detections (default: None)
+        iou_threshold: Suppress a detection whose IoU with a better one
+            exceeds this (default: None, no suppression)
+        class_agnostic: If True, suppression ignores classes (default: False)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+
+    Returns:
+        Ascending indices of the kept detections
+
+    Raises:
+        ValueError: If the settings or inputs are invalid
+
+    """
+    detection_filter = DetectionFilter(
+        score_threshold,
+        classes,
+        exclude_classes,
+        top_k,
+        iou_threshold,
+        class_agnostic,
+    )
+    return detection_filter.indices(bboxes, scores, class_ids, bbox_format)
+
+
+def _to_corners(
+    bboxes: Sequence[Sequence[float]] | NDArray[np.number], bbox_format: str
+) -> NDArray[np.float64]:
+    """Return boxes as unclipped float [x_min, y_min, x_max, y_max], shape (N, 4).
+
+    YOLO boxes stay normalized: scaling x and y by the image size scales every
+    area by the same factor, so IoUs do not change.
+    """
+    fmt = (
+        bbox_format
+        if bbox_format in SUPPORTED_BBOX_FORMATS
+        else _validate_bbox_format(bbox_format)
+    )
+    boxes = np.asarray(_as_array(bboxes), dtype=np.float64).reshape(-1, 4)
+    if fmt == "coco":
+        boxes = np.hstack([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]])
+    elif fmt == "yolo":
+        half = boxes[:, 2:] / 2
+        boxes = np.hstack([boxes[:, :2] - half, boxes[:, :2] + half])
+    return boxes
+
+
+def _per_box(
+    values: ArrayLike | None, count: int, name: str, dtype: type
+) -> NDArray | None:
+    """Return ``values`` as a flat array of one value per box, or None."""
+    if values is None:
+        return None
+    array = np.asarray(_as_array(values)).reshape(-1).astype(dtype)
+    if len(array) != count:
+        raise ValueError(f"Number of {name} must match number of bounding boxes")
+    return array
+
+
+def _iou(box: NDArray[np.float64], boxes: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Return the IoU of ``box`` (broadcastable to (..., 4)) with ``boxes``."""
+    width = np.minimum(box[..., 2], boxes[..., 2]) - np.maximum(
+        box[..., 0], boxes[..., 0]
+    )
+    height = np.minimum(box[..., 3], boxes[..., 3]) - np.maximum(
+        box[..., 1], boxes[..., 1]
+    )
+    inter = np.clip(width, 0, None) * np.clip(height, 0, None)
+    area = (box[..., 2] - box[..., 0]) * (box[..., 3] - box[..., 1])
+    areas = (boxes[..., 2] - boxes[..., 0]) * (boxes[..., 3] - boxes[..., 1])
+    union = area + areas - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def _nms(boxes: NDArray[np.float64], iou_threshold: float) -> NDArray[np.intp]:
+    """Greedy NMS over boxes ranked best first; return the kept positions."""
+    better, worse = _overlapping_pairs(boxes, iou_threshold)
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    if better.size:
+        # Group the pairs by the better box, then walk only the boxes that
+        # overlap a worse one, best first, as greedy NMS does
+        order = np.argsort(better, kind="stable")
+        better, worse = better[order], worse[order]
+        suppressors, starts = np.unique(better, return_index=True)
+        ends = np.append(starts[1:], len(better))
+        for box, start, end in zip(
+            suppressors.tolist(), starts.tolist(), ends.tolist(), strict=True
+        ):
+            if not suppressed[box]:
+                suppressed[worse[start:end]] = True
+    return np.flatnonzero(~suppressed)
+
+
+def _overlapping_pairs(
+    boxes: NDArray[np.float64], iou_threshold: float
+) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """Return the (better, worse) position pairs whose IoU exceeds the threshold.
+
+    A sweep over the boxes sorted by x_min only compares each box with the
+    boxes starting before its x_max, one vectorized IoU block at a time, so
+    sparse scenes never build the full pairwise matrix.
+    """
+    order = np.argsort(boxes[:, 0], kind="stable")
+    swept = boxes[order]
+    # Boxes from position `ends[a]` on start right of box a's x_max
+    ends = np.searchsorted(swept[:, 0], swept[:, 2], side="right")
+    firsts, seconds = [], []
+    for start in range(0, len(swept), _SWEEP_CHUNK):
+        stop = min(start + _SWEEP_CHUNK, len(swept))
+        stop_column = max(int(ends[start:stop].max()), stop)
+        block = _iou(
+            swept[start:stop, np.newaxis], swept[np.newaxis, start:stop_column]
+        )
+        rows = np.arange(start, stop)[:, np.newaxis]
+        columns = np.arange(start, stop_column)
+        row, column = np.nonzero((block > iou_threshold) & (columns > rows))
+        firsts.append(order[row + start])
+        seconds.append(order[column + start])
+    first = np.concatenate(firsts)
+    second = np.concatenate(seconds)
+    # Positions are ranks, so the smaller one is the better box
+    return np.minimum(first, second), np.maximum(first, second)
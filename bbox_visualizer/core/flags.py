@@ -3,21 +3,16 @@
 import logging
 from collections.abc import Sequence
 
-import cv2
 import numpy as np
 from numpy.typing import NDArray
 
-from ._utils import _check_and_modify_bbox, _get_ink_metrics, _validate_color
-from .labels import add_label
-from .rectangle import draw_rectangle
+from ._utils import _as_array, _check_and_modify_bbox, _check_and_modify_bboxes
+from .layout import T_LINE_LENGTH as T_LINE_LENGTH  # re-exported, read in layout
+from .layout import _layout, _rasterize
+from .styles import FlagStyle, LabelStyle
 
 logger = logging.getLogger(__name__)
 
-font = cv2.FONT_HERSHEY_SIMPLEX
-
-#: Length in pixels of the vertical line connecting a T label to its box.
-T_LINE_LENGTH = 50
-
 
 def add_T_label(
     img: NDArray[np.uint8],
@@ -29,6 +24,7 @@ def add_T_label(
     text_bg_color: tuple[int, int, int] = (255, 255, 255),
     text_color: tuple[int, int, int] = (0, 0, 0),
     bbox_format: str = "voc",
+    style: LabelStyle | None = None,
 ) -> NDArray[np.uint8]:
     """Add a T-shaped label with a vertical line connecting to the bounding box.
 
@@ -47,70 +43,20 @@ def add_T_label(
         text_bg_color: BGR color tuple for text background (default: white)
         text_color: BGR color tuple for text (default: black)
         bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        style: Pre-validated :class:`LabelStyle`; when given, it replaces all
+            of the styling arguments above and skips their validation
 
     Returns:
         New image with added T-shaped label; the input image is not modified
 
     """
-    text_bg_color = _validate_color(text_bg_color)
-    text_color = _validate_color(text_color)
-    bbox = _check_and_modify_bbox(bbox, img.shape, bbox_format=bbox_format)
-    img = img.copy()
-    label_width, ascent, descent = _get_ink_metrics(label, size, thickness)
-    padding = 5  # Padding around text
-
-    # draw vertical line
-    x_center = (bbox[0] + bbox[2]) // 2
-    line_top = y_top = bbox[1] - T_LINE_LENGTH
-
-    # draw rectangle with label
-    y_bottom = y_top
-    y_top = y_bottom - (ascent + descent + 2 * padding)
-
-    if y_top < 0:
-        logger.warning(
-            "Labelling style 'T' going out of frame. Falling back to normal labeling."
+    if style is None:
+        style = LabelStyle(
+            size, thickness, draw_bg, text_bg_color, text_color, True, bbox_format
         )
-        return add_label(
-            img,
-            label,
-            bbox,
-            size=size,
-            thickness=thickness,
-            draw_bg=draw_bg,
-            text_bg_color=text_bg_color,
-            text_color=text_color,
-        )
-
-    cv2.line(img, (x_center, bbox[1]), (x_center, line_top), text_bg_color, 3)
-
-    # Calculate background rectangle dimensions
-    bg_width = label_width + 2 * padding
-    # Size the bg from measured ink so it hugs the text on all sides
-    bg_height = ascent + descent + 2 * padding
-
-    # Calculate background rectangle position
-    bg_x1 = x_center - (bg_width // 2)
-    bg_y1 = y_top
-    bg_x2 = bg_x1 + bg_width
-    bg_y2 = bg_y1 + bg_height
-
-    if draw_bg:
-        cv2.rectangle(img, (bg_x1, bg_y1), (bg_x2, bg_y2), text_bg_color, -1)
-
-    text_x = bg_x1 + padding
-    text_y = bg_y1 + padding + ascent  # text baseline; descenders fit below
-
-    cv2.putText(
-        img,
-        label,
-        (text_x, text_y),
-        font,
-        size,
-        text_color,
-        thickness,
-    )
-
+    bbox = _check_and_modify_bbox(bbox, img.shape, bbox_format=style.bbox_format)
+    img = img.copy()
+    _draw_T_label(img, label, bbox, style)
     return img
 
 
@@ -125,6 +71,7 @@ def draw_flag_with_label(
     text_bg_color: tuple[int, int, int] = (255, 255, 255),
     text_color: tuple[int, int, int] = (0, 0, 0),
     bbox_format: str = "voc",
+    style: FlagStyle | None = None,
 ) -> NDArray[np.uint8]:
     """Draws a flag-like label with a vertical line and text box.
 
@@ -144,62 +91,26 @@ def draw_flag_with_label(
         text_bg_color: BGR color tuple for text background (default: white)
         text_color: BGR color tuple for text (default: black)
         bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        style: Pre-validated :class:`FlagStyle`; when given, it replaces all
+            of the styling arguments above and skips their validation
 
     Returns:
         New image with added flag label; the input image is not modified
 
     """
-    line_color = _validate_color(line_color)
-    text_bg_color = _validate_color(text_bg_color)
-    text_color = _validate_color(text_color)
-    bbox = _check_and_modify_bbox(bbox, img.shape, bbox_format=bbox_format)
-    img = img.copy()
-    label_width, ascent, descent = _get_ink_metrics(label, size, thickness)
-
-    x_center = (bbox[0] + bbox[2]) // 2
-    y_bottom = int(bbox[1] * 0.75 + bbox[3] * 0.25)
-    # Rise height/4 above the box, but at least T_LINE_LENGTH so the pole
-    # stays visible on small boxes
-    y_top = bbox[1] - max(y_bottom - bbox[1], T_LINE_LENGTH)
-    if y_top < 0:
-        logger.warning(
-            "Labelling style 'Flag' going out of frame. Falling back to normal labeling."
-        )
-        img = draw_rectangle(img, bbox, bbox_color=line_color)
-        return add_label(
-            img,
-            label,
-            bbox,
-            size=size,
-            thickness=thickness,
-            text_bg_color=text_bg_color,
-            text_color=text_color,
-        )
-
-    start_point = (x_center, y_top)
-    end_point = (x_center, y_bottom)
-
-    # Start the pole 2px below the flag top: cv2 caps the 3px stroke ~2px
-    # past the endpoint, which would poke above the flag background
-    cv2.line(img, (x_center, y_top + 2), end_point, line_color, 3)
-
-    # write label
-    if write_label:
-        padding = 5  # Padding around text
-        bg_x2 = start_point[0] + label_width + 2 * padding
-        # Size the bg from measured ink so it hugs the text on all sides
-        bg_y2 = start_point[1] + ascent + descent + 2 * padding
-        cv2.rectangle(img, start_point, (bg_x2, bg_y2), text_bg_color, -1)
-        cv2.putText(
-            img,
-            label,
-            (start_point[0] + padding, start_point[1] + padding + ascent),
-            font,
+    if style is None:
+        style = FlagStyle(
             size,
-            text_color,
             thickness,
+            write_label,
+            line_color,
+            text_bg_color,
+            text_color,
+            bbox_format,
         )
-
+    bbox = _check_and_modify_bbox(bbox, img.shape, bbox_format=style.bbox_format)
+    img = img.copy()
+    _draw_flag(img, label, bbox, style)
     return img
 
 
@@ -211,6 +122,7 @@ def add_multiple_T_labels(
     text_bg_color: tuple[int, int, int] = (255, 255, 255),
     text_color: tuple[int, int, int] = (0, 0, 0),
     bbox_format: str = "voc",
+    style: LabelStyle | None = None,
 ) -> NDArray[np.uint8]:
     """Add multiple T-shaped labels to their corresponding bounding boxes.
 
@@ -223,33 +135,33 @@ def add_multiple_T_labels(
         text_bg_color: BGR color tuple for text backgrounds (default: white)
         text_color: BGR color tuple for text (default: black)
         bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        style: Pre-validated :class:`LabelStyle`; when given, it replaces all
+            of the styling arguments above and skips their validation
 
     Returns:
         New image with all T-shaped labels added; the input image is not modified
 
     """
+    bboxes = _as_array(bboxes)
     # len() instead of truthiness: numpy arrays raise on ambiguous bool()
     if bboxes is None or labels is None or len(bboxes) == 0 or len(labels) == 0:
         raise ValueError("Lists of bounding boxes and labels cannot be empty")
     if len(bboxes) != len(labels):
         raise ValueError("Number of bounding boxes must match number of labels")
 
-    text_bg_color = _validate_color(text_bg_color)
-    text_color = _validate_color(text_color)
-    for label, bbox in zip(labels, bboxes, strict=True):
-        img = add_T_label(
-            img,
-            label,
-            bbox,
-            size=1,
-            thickness=2,
+    if style is None:
+        style = LabelStyle(
             draw_bg=draw_bg,
             text_bg_color=text_bg_color,
             text_color=text_color,
             bbox_format=bbox_format,
         )
+    converted_bboxes = _check_and_modify_bboxes(bboxes, img.shape, style.bbox_format)
 
-    return img
+    # Copy once, then draw every label in place
+    output = img.copy()
+    _draw_T_labels(output, labels, converted_bboxes, style)
+    return output
 
 
 def draw_multiple_flags_with_labels(
@@ -261,6 +173,7 @@ def draw_multiple_flags_with_labels(
     text_bg_color: tuple[int, int, int] = (255, 255, 255),
     text_color: tuple[int, int, int] = (0, 0, 0),
     bbox_format: str = "voc",
+    style: FlagStyle | None = None,
 ) -> NDArray[np.uint8]:
     """Add multiple flag-like labels to their corresponding bounding boxes.
 
@@ -274,32 +187,89 @@ def draw_multiple_flags_with_labels(
         text_bg_color: BGR color tuple for text backgrounds (default: white)
         text_color: BGR color tuple for text (default: black)
         bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        style: Pre-validated :class:`FlagStyle`; when given, it replaces all
+            of the styling arguments above and skips their validation
 
     Returns:
         New image with all flag labels added; the input image is not modified
 
     """
+    bboxes = _as_array(bboxes)
     # len() instead of truthiness: numpy arrays raise on ambiguous bool()
     if bboxes is None or labels is None or len(bboxes) == 0 or len(labels) == 0:
         raise ValueError("Lists of bounding boxes and labels cannot be empty")
     if len(bboxes) != len(labels):
         raise ValueError("Number of bounding boxes must match number of labels")
 
-    line_color = _validate_color(line_color)
-    text_bg_color = _validate_color(text_bg_color)
-    text_color = _validate_color(text_color)
-    for label, bbox in zip(labels, bboxes, strict=True):
-        img = draw_flag_with_label(
-            img,
-            label,
-            bbox,
-            size=1,
-            thickness=2,
+    if style is None:
+        style = FlagStyle(
             write_label=write_label,
             line_color=line_color,
             text_bg_color=text_bg_color,
             text_color=text_color,
             bbox_format=bbox_format,
         )
+    converted_bboxes = _check_and_modify_bboxes(bboxes, img.shape, style.bbox_format)
 
-    return img
+    # Copy once, then draw every flag in place
+    output = img.copy()
+    _draw_flags(output, labels, converted_bboxes, style)
+    return output
+
+
+def _draw_T_labels(
+    img: NDArray[np.uint8],
+    labels: Sequence[str],
+    bboxes: Sequence[Sequence[int]] | NDArray[np.integer],
+    style: LabelStyle,
+) -> None:
+    """Draw T labels for already validated VOC boxes onto ``img`` in place.
+
+    See :func:`add_T_label` for the placement rules.
+
+    """
+    layout = _layout("T", labels, bboxes, style)
+    for _ in range(int(layout.fallback.sum())):
+        logger.warning(
+            "Labelling style 'T' going out of frame. Falling back to normal labeling."
+        )
+    _rasterize(img, labels, bboxes, layout, style)
+
+
+def _draw_T_label(
+    img: NDArray[np.uint8],
+    label: str,
+    bbox: Sequence[int],
+    style: LabelStyle,
+) -> None:
+    """Draw a T label for an already validated VOC box onto ``img`` in place."""
+    _draw_T_labels(img, [label], [bbox], style)
+
+
+def _draw_flags(
+    img: NDArray[np.uint8],
+    labels: Sequence[str],
+    bboxes: Sequence[Sequence[int]] | NDArray[np.integer],
+    style: FlagStyle,
+) -> None:
+    """Draw flags for already validated VOC boxes onto ``img`` in place.
+
+    See :func:`draw_flag_with_label` for the placement rules.
+
+    """
+    layout = _layout("flag", labels, bboxes, style)
+    for _ in range(int(layout.fallback.sum())):
+        logger.warning(
+            "Labelling style 'Flag' going out of frame. Falling back to normal labeling."
+        )
+    _rasterize(img, labels, bboxes, layout, style)
+
+
+def _draw_flag(
+    img: NDArray[np.uint8],
+    label: str,
+    bbox: Sequence[int],
+    style: FlagStyle,
+) -> None:
+    """Draw a flag for an already validated VOC box onto ``img`` in place."""
+    _draw_flags(img, [label], [bbox], style)
@@ -0,0 +1,118 @@
+"""Functions for drawing keypoints and skeletons on images."""
+
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ._utils import (
+    _frame_color,
+    _group_by_color,
+    _validate_color,
+    _validate_colors,
+)
+
+#: COCO person skeleton as pairs of 0-based keypoint indices (17 keypoints).
+COCO_SKELETON = (
+    (15, 13),
+    (13, 11),
+    (16, 14),
+    (14, 12),
+    (11, 12),
+    (5, 11),
+    (6, 12),
+    (5, 6),
+    (5, 7),
+    (6, 8),
+    (7, 9),
+    (8, 10),
+    (1, 2),
+    (0, 1),
+    (0, 2),
+    (1, 3),
+    (2, 4),
+    (3, 5),
+    (4, 6),
+)
+
+
+def draw_multiple_keypoints(
+    img: NDArray[np.uint8],
+    keypoints: ArrayLike,
+    skeleton: Sequence[tuple[int, int]] | None = COCO_SKELETON,
+    point_color: tuple[int, int, int] = (0, 0, 255),
+    limb_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer] = (255, 255, 255),
+    radius: int = 3,
+    thickness: int = 2,
+    min_score: float = 0.5,
+) -> NDArray[np.uint8]:
+    """Draws keypoints and skeleton limbs for many instances using batched operations.
+
+    Invisible keypoints are masked out with array operations, all limbs of one
+    color are drawn in a single ``cv2.polylines`` call, and all points in
+    another, so the number of cv2 calls does not grow with the number of
+    instances.
+
+    Args:
+        img: Input image array
+        keypoints: Array of shape (N, K, 3) holding (x, y, score) per keypoint,
+            or (N, K, 2) when every keypoint is visible
+        skeleton: Pairs of keypoint indices to connect with limbs, or None to
+            draw points only (default: :data:`COCO_SKELETON`)
+        point_color: BGR color tuple for the keypoints (default: red)
+        limb_color: BGR color tuple applied to all limbs, a sequence of one
+            color per skeleton edge, or an integer array of shape (E, 3)
+            (default: white)
+        radius: Keypoint radius in pixels; 0 skips the points (default: 3)
+        thickness: Limb thickness in pixels (default: 2)
+        min_score: Keypoints scoring below this are not drawn, nor are limbs
+            touching them (default: 0.5)
+
+    Returns:
+        New image with keypoints and limbs drawn; the input image is not modified
+
+    Raises:
+        ValueError: If ``keypoints`` is not (N, K, 2|3) or a skeleton index is
+            out of range
+
+    """
+    kps = np.asarray(keypoints, dtype=np.float64)
+    if kps.ndim == 2:
+        kps = kps[np.newaxis]
+    if kps.ndim != 3 or kps.shape[-1] not in (2, 3):
+        raise ValueError("Keypoints must be an array of shape (N, K, 3) or (N, K, 2)")
+    point_color = _validate_color(point_color)
+
+    if kps.shape[-1] == 3:
+        visible = kps[..., 2] >= min_score
+    else:
+        visible = np.ones(kps.shape[:2], dtype=bool)
+    points = np.rint(kps[..., :2]).astype(np.int32)
+
+    output = img.copy()
+    if skeleton is not None and len(skeleton) > 0:
+        edges = np.asarray(skeleton, dtype=np.intp).reshape(-1, 2)
+        if edges.min() < 0 or edges.max() >= kps.shape[1]:
+            raise ValueError(
+                f"Skeleton indices must be between 0 and {kps.shape[1] - 1}"
+            )
+        colors, _ = _validate_colors(limb_color, len(edges))
+        # (N, E, 2, 2): both endpoints of every limb of every instance
+        segments = np.stack([points[:, edges[:, 0]], points[:, edges[:, 1]]], axis=2)
+        limb_visible = visible[:, edges[:, 0]] & visible[:, edges[:, 1]]
+        for color, members in _group_by_color(colors):
+            drawn = segments[:, members][limb_visible[:, members]]
+            if len(drawn):
+                color = _frame_color(color, output)
+                cv2.polylines(output, drawn, False, color, thickness)
+
+    if radius > 0 and visible.any():
+        # A zero-length polyline of thickness 2r renders exactly like a filled
+        # cv2.circle of radius r, so every point goes into one call
+        dots = np.repeat(points[visible][:, np.newaxis], 2, axis=1)
+        color = _frame_color(point_color, output)
+        cv2.polylines(output, dots, False, color, 2 * radius)
+    return output
@@ -2,13 +2,13 @@
 
 from collections.abc import Sequence
 
-import cv2
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 
-from ._utils import _check_and_modify_bbox, _get_ink_metrics, _validate_color
-
-font = cv2.FONT_HERSHEY_SIMPLEX
+from ._utils import _as_array, _check_and_modify_bbox, _check_and_modify_bboxes
+from .filtering import DetectionFilter
+from .layout import _layout, _rasterize
+from .styles import LabelStyle
 
 
 def add_label(
@@ -22,15 +22,18 @@ def add_label(
     text_color: tuple[int, int, int] = (0, 0, 0),
     top: bool = True,
     bbox_format: str = "voc",
+    style: LabelStyle | None = None,
 ) -> NDArray[np.uint8]:
     """Add a label to a bounding box, either above or inside it.
 
     If there isn't enough space above the box, the label is placed inside.
     The label has an optional background rectangle for better visibility.
+    Newlines in ``label`` split it into lines, stacked left aligned on one
+    background.
 
     Args:
         img: Input image array
-        label: Text to display
+        label: Text to display; newlines separate lines
         bbox: Bounding box coordinates in ``bbox_format`` (default VOC:
             [x_min, y_min, x_max, y_max])
         size: Font size multiplier (default: 1)
@@ -40,52 +43,20 @@ def add_label(
         text_color: BGR color tuple for text (default: black)
         top: If True, place label above box; if False, inside (default: True)
         bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        style: Pre-validated :class:`LabelStyle`; when given, it replaces all
+            of the styling arguments above and skips their validation
 
     Returns:
         New image with added label; the input image is not modified
 
     """
-    text_bg_color = _validate_color(text_bg_color)
-    text_color = _validate_color(text_color)
-    bbox = _check_and_modify_bbox(bbox, img.shape, bbox_format=bbox_format)
-    img = img.copy()
-
-    text_width, ascent, descent = _get_ink_metrics(label, size, thickness)
-    padding = 5  # Padding around text
-
-    bg_width = text_width + 2 * padding
-    # Size the bg from measured ink so it hugs the text on all sides
-    bg_height = ascent + descent + 2 * padding
-
-    # Compare against the full background height so the label only goes above
-    # the box when the whole background fits inside the image
-    label_above = top and bbox[1] >= bg_height
-    bg_x1 = bbox[0]
-    bg_y1 = bbox[1] - bg_height if label_above else bbox[1]
-    bg_x2 = bg_x1 + bg_width
-    bg_y2 = bg_y1 + bg_height
-
-    if draw_bg:
-        cv2.rectangle(
-            img,
-            (bg_x1, bg_y1),
-            (bg_x2, bg_y2),
-            text_bg_color,
-            -1,
+    if style is None:
+        style = LabelStyle(
+            size, thickness, draw_bg, text_bg_color, text_color, top, bbox_format
         )
-
-    text_x = bg_x1 + padding
-    text_y = bg_y1 + padding + ascent  # text baseline; descenders fit below
-
-    cv2.putText(
-        img,
-        label,
-        (text_x, text_y),
-        font,
-        size,
-        text_color,
-        thickness,
-    )
+    bbox = _check_and_modify_bbox(bbox, img.shape, bbox_format=style.bbox_format)
+    img = img.copy()
+    _draw_label(img, label, bbox, style)
     return img
 
 
@@ -100,12 +71,16 @@ def add_multiple_labels(
     text_color: tuple[int, int, int] = (0, 0, 0),
     top: bool = True,
     bbox_format: str = "voc",
+    style: LabelStyle | None = None,
+    detection_filter: DetectionFilter | None = None,
+    scores: ArrayLike | None = None,
+    class_ids: ArrayLike | None = None,
 ) -> NDArray[np.uint8]:
     """Add multiple labels to their corresponding bounding boxes using optimized operations.
 
     Args:
         img: Input image array
-        labels: List of text labels
+        labels: List of text labels; newlines separate lines within a label
         bboxes: List of bounding boxes, each in ``bbox_format`` (default VOC:
             [x_min, y_min, x_max, y_max])
         size: Font size multiplier (default: 1)
@@ -115,38 +90,67 @@ def add_multiple_labels(
         text_color: BGR color tuple for text (default: black)
         top: If True, place labels above boxes; if False, inside (default: True)
         bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        style: Pre-validated :class:`LabelStyle`; when given, it replaces all
+            of the styling arguments above and skips their validation
+        detection_filter: Optional :class:`DetectionFilter` choosing which
+            boxes to label (default: None, label every box)
+        scores: Confidence per box, for ``detection_filter`` (default: None)
+        class_ids: Integer class per box, for ``detection_filter`` (default: None)
 
     Returns:
         New image with all labels added; the input image is not modified
 
     """
+    bboxes = _as_array(bboxes)
     # len() instead of truthiness: numpy arrays raise on ambiguous bool()
     if bboxes is None or labels is None or len(bboxes) == 0 or len(labels) == 0:
         raise ValueError("Lists of bounding boxes and labels cannot be empty")
     if len(bboxes) != len(labels):
         raise ValueError("Number of bounding boxes must match number of labels")
 
-    text_bg_color = _validate_color(text_bg_color)
-    text_color = _validate_color(text_color)
-
-    # Validate and convert all bboxes to VOC format up front
-    converted_bboxes = [
-        _check_and_modify_bbox(bbox, img.shape, bbox_format=bbox_format)
-        for bbox in bboxes
-    ]
-
-    # Draw all labels using add_label (which copies, keeping this function pure)
-    output = img
-    for label, bbox in zip(labels, converted_bboxes, strict=True):
-        output = add_label(
-            output,
-            label,
-            bbox,
-            size,
-            thickness,
-            draw_bg,
-            text_bg_color,
-            text_color,
-            top,
+    if style is None:
+        style = LabelStyle(
+            size, thickness, draw_bg, text_bg_color, text_color, top, bbox_format
         )
+    # Validate and convert all bboxes to VOC format up front, once; the filter
+    # works on the result
+    converted_bboxes = _check_and_modify_bboxes(bboxes, img.shape, style.bbox_format)
+    if detection_filter is not None:
+        keep = detection_filter.indices(converted_bboxes, scores, class_ids)
+        labels = [labels[i] for i in keep]
+        converted_bboxes = converted_bboxes[keep]
+
+    # Copy once, then draw every label in place
+    output = img.copy()
+    _draw_labels(output, labels, converted_bboxes, style)
     return output
+
+
+def _draw_labels(
+    img: NDArray[np.uint8],
+    labels: Sequence[str],
+    bboxes: Sequence[Sequence[int]] | NDArray[np.integer],
+    style: LabelStyle,
+) -> None:
+    """Draw labels for already validated VOC boxes onto ``img`` in place.
+
+    The placement of every label comes from the cached layout stage, computed
+    in one vectorized pass, leaving one background and one text call per
+    label.
+
+    """
+    _rasterize(img, labels, bboxes, _layout("label", labels, bboxes, style), style)
+
+
+def _draw_label(
+    img: NDArray[np.uint8],
+    label: str,
+    bbox: Sequence[int],
+    style: LabelStyle,
+) -> None:
+    """Draw a label for an already validated VOC box onto ``img`` in place.
+
+    See :func:`add_label` for the placement rules.
+
+    """
+    _draw_labels(img, [label], [bbox], style)
@@ -0,0 +1,383 @@
+"""Label layout, computed apart from drawing and cached.
+
+Drawing a batch of labels is split into two stages. The layout stage is pure:
+it measures the labels and returns, as arrays, where every background, text
+origin and pole goes. The rasterization stage only draws from those arrays.
+Layouts are cached per thread, so re-drawing the same labels on the same
+boxes, as on every frame of a paused video or on each redraw of an
+interactive viewer, skips measuring and placing them.
+"""
+
+import dataclasses
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from ._utils import _frame_color
+from .rectangle import _draw_rectangle
+from .styles import FlagStyle, LabelStyle
+
+font = cv2.FONT_HERSHEY_SIMPLEX
+
+#: Length in pixels of the vertical line connecting a T label to its box, and
+#: the minimum rise of a flag's pole. Also available as ``flags.T_LINE_LENGTH``;
+#: change it here, since it is read on every call and is part of the layout
+#: cache key.
+T_LINE_LENGTH = 50
+
+#: Number of layouts each thread keeps in the :func:`_layout` cache.
+LAYOUT_CACHE_SIZE = 64
+
+
+class LabelLayout(NamedTuple):
+    """Placement of a batch of labels, one row per label.
+
+    Attributes:
+        backgrounds: (N, 4) background rectangles [x1, y1, x2, y2]
+        origins: (N, 2) baseline origin [x, y] of each label's first line
+        poles: (N, 4) pole segments [x1, y1, x2, y2], for T and flag labels
+        has_pole: (N,) whether the label has a pole
+        has_text: (N,) whether the label's background and text are drawn
+        fallback: (N,) whether a T or flag label did not fit above its box
+            and was placed as a normal label instead
+
+    """
+
+    backgrounds: NDArray[np.int64]
+    origins: NDArray[np.int64]
+    poles: NDArray[np.int64]
+    has_pole: NDArray[np.bool_]
+    has_text: NDArray[np.bool_]
+    fallback: NDArray[np.bool_]
+
+
+# One cache per thread: lookups take no lock, so threads drawing labels at
+# the same time, on free-threaded builds too, never wait on each other
+_local = threading.local()
+
+
+def _layout(
+    kind: str,
+    labels: Sequence[str],
+    bboxes: Sequence[Sequence[int]] | NDArray[np.integer],
+    style: LabelStyle | FlagStyle,
+) -> LabelLayout:
+    """Return the cached layout of labels of ``kind`` on validated VOC boxes.
+
+    ``kind`` is ``"label"``, ``"T"`` or ``"flag"``. The cache is keyed by the
+    kind, the style, :data:`T_LINE_LENGTH`, the labels and the boxes; the
+    boxes are already clipped to the image, so they also stand in for its
+    shape. Cached arrays are
+    read-only, since every later hit shares them.
+
+    """
+    boxes = np.asarray(bboxes, dtype=np.int64).reshape(-1, 4)
+    key = (kind, style, T_LINE_LENGTH, tuple(labels), boxes.tobytes())
+    cache = _layout_cache()
+    layout = cache.get(key)
+    if layout is not None:
+        cache.move_to_end(key)
+        return layout
+    layout = _LAYOUTS[kind](labels, boxes, style)
+    for array in layout:
+        array.setflags(write=False)
+    cache[key] = layout
+    if len(cache) > LAYOUT_CACHE_SIZE:
+        cache.popitem(last=False)
+    return layout
+
+
+def _layout_cache() -> OrderedDict[tuple, LabelLayout]:
+    """Return this thread's layout cache, most recently used last."""
+    cache = getattr(_local, "layouts", None)
+    if cache is None:
+        cache = _local.layouts = OrderedDict()
+    return cache
+
+
+def _block_metrics(
+    labels: Sequence[str], style: LabelStyle | FlagStyle
+) -> tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.int64]]:
+    """Return the width, ink height and first baseline of each label."""
+    blocks = [_text_block(label, style) for label in labels]
+    metrics = np.array(
+        [(width, height, baselines[0]) for width, height, baselines in blocks],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    return metrics[:, 0], metrics[:, 1], metrics[:, 2]
+
+
+def _label_layout(
+    labels: Sequence[str], boxes: NDArray[np.int64], style: LabelStyle
+) -> LabelLayout:
+    """Lay out labels above their boxes, or inside when they do not fit.
+
+    See :func:`add_label` for the placement rules.
+
+    """
+    text_width, text_height, ascent = _block_metrics(labels, style)
+    padding = style.padding
+
+    bg_width = text_width + 2 * padding
+    # Size the bg from measured ink so it hugs the text on all sides
+    bg_height = text_height + 2 * padding
+    # Compare against the full background height so the label only goes above
+    # the box when the whole background fits inside the image
+    label_above = (boxes[:, 1] >= bg_height) & style.top
+    bg_x1 = boxes[:, 0]
+    bg_y1 = np.where(label_above, boxes[:, 1] - bg_height, boxes[:, 1])
+    count = len(boxes)
+    return LabelLayout(
+        np.stack([bg_x1, bg_y1, bg_x1 + bg_width, bg_y1 + bg_height], axis=1),
+        # First baseline; descenders fit below
+        np.stack([bg_x1 + padding, bg_y1 + padding + ascent], axis=1),
+        np.zeros((count, 4), dtype=np.int64),
+        np.zeros(count, dtype=bool),
+        np.ones(count, dtype=bool),
+        np.zeros(count, dtype=bool),
+    )
+
+
+def _T_layout(
+    labels: Sequence[str], boxes: NDArray[np.int64], style: LabelStyle
+) -> LabelLayout:
+    """Lay out T labels, falling back to normal labels above the box.
+
+    See :func:`add_T_label` for the placement rules.
+
+    """
+    text_width, text_height, ascent = _block_metrics(labels, style)
+    padding = style.padding
+
+    bg_width = text_width + 2 * padding
+    bg_height = text_height + 2 * padding
+    x_center = (boxes[:, 0] + boxes[:, 2]) // 2
+    line_top = boxes[:, 1] - T_LINE_LENGTH
+    bg_x1 = x_center - bg_width // 2
+    bg_y1 = line_top - bg_height
+    fallback = bg_y1 < 0
+    layout = LabelLayout(
+        np.stack([bg_x1, bg_y1, bg_x1 + bg_width, line_top], axis=1),
+        np.stack([bg_x1 + padding, bg_y1 + padding + ascent], axis=1),
+        np.stack([x_center, boxes[:, 1], x_center, line_top], axis=1),
+        ~fallback,
+        np.ones(len(boxes), dtype=bool),
+        fallback,
+    )
+    # The fallback always tries above the box first, as add_label does
+    if not style.top:
+        style = dataclasses.replace(style, top=True)
+    return _with_fallback(layout, labels, boxes, style)
+
+
+def _flag_layout(
+    labels: Sequence[str], boxes: NDArray[np.int64], style: FlagStyle
+) -> LabelLayout:
+    """Lay out flags, falling back to normal labels above the box.
+
+    See :func:`draw_flag_with_label` for the placement rules.
+
+    """
+    text_width, text_height, ascent = _block_metrics(labels, style)
+    padding = style.padding
+
+    x_center = (boxes[:, 0] + boxes[:, 2]) // 2
+    y_bottom = (boxes[:, 1] * 0.75 + boxes[:, 3] * 0.25).astype(np.int64)
+    # Rise height/4 above the box, but at least T_LINE_LENGTH so the pole
+    # stays visible on small boxes
+    y_top = boxes[:, 1] - np.maximum(y_bottom - boxes[:, 1], T_LINE_LENGTH)
+    fallback = y_top < 0
+    layout = LabelLayout(
+        np.stack(
+            [
+                x_center,
+                y_top,
+                x_center + text_width + 2 * padding,
+                y_top + text_height + 2 * padding,
+            ],
+            axis=1,
+        ),
+        np.stack([x_center + padding, y_top + padding + ascent], axis=1),
+        # Start the pole 2px below the flag top: cv2 caps the 3px stroke ~2px
+        # past the endpoint, which would poke above the flag background
+        np.stack([x_center, y_top + 2, x_center, y_bottom], axis=1),
+        ~fallback,
+        np.full(len(boxes), style.write_label),
+        fallback,
+    )
+    return _with_fallback(layout, labels, boxes, style.label_style)
+
+
+def _with_fallback(
+    layout: LabelLayout,
+    labels: Sequence[str],
+    boxes: NDArray[np.int64],
+    style: LabelStyle,
+) -> LabelLayout:
+    """Place the labels flagged as fallbacks as normal labels in ``style``."""
+    rows = layout.fallback
+    if not rows.any():
+        return layout
+    fallback = _label_layout(labels, boxes, style)
+    return layout._replace(
+        backgrounds=np.where(rows[:, None], fallback.backgrounds, layout.backgrounds),
+        origins=np.where(rows[:, None], fallback.origins, layout.origins),
+        has_text=layout.has_text | rows,
+    )
+
+
+_LAYOUTS = {"label": _label_layout, "T": _T_layout, "flag": _flag_layout}
+
+
+def _rasterize(
+    img: NDArray[np.uint8],
+    labels: Sequence[str],
+    bboxes: Sequence[Sequence[int]] | NDArray[np.integer],
+    layout: LabelLayout,
+    style: LabelStyle | FlagStyle,
+) -> None:
+    """Draw labels onto ``img`` in place, from a layout of the same boxes.
+
+    Each label is drawn whole, pole first, before the next one, so
+    overlapping labels stack in the same order as when drawn one by one.
+    Flags that fell back are drawn with their box, as
+    :func:`draw_flag_with_label` does.
+
+    """
+    bg_color = _frame_color(style.text_bg_color, img)
+    if isinstance(style, FlagStyle):
+        pole_color = _frame_color(style.line_color, img)
+        draw_bg = True
+    else:
+        pole_color = bg_color
+        draw_bg = style.draw_bg
+    # One int row per label, converted to Python as it is drawn so that no
+    # per-label lists build up for large batches
+    table = np.concatenate(
+        [
+            layout.backgrounds,
+            layout.origins,
+            layout.poles,
+            np.stack([layout.has_pole, layout.has_text, layout.fallback], axis=1),
+        ],
+        axis=1,
+    )
+    for index, label in enumerate(labels):
+        row = table[index].tolist()
+        bg, origin, pole = row[0:4], row[4:6], row[6:10]
+        has_pole, has_text, fallback = row[10:13]
+        if has_pole:
+            cv2.line(img, pole[:2], pole[2:], pole_color, 3)
+        if fallback and isinstance(style, FlagStyle):
+            _draw_rectangle(img, bboxes[index], style.box_style)
+        if not has_text:
+            continue
+        if draw_bg:
+            cv2.rectangle(img, bg[:2], bg[2:], bg_color, -1)
+        _put_lines(img, label, origin[0], origin[1], style)
+
+
+def _text_block(
+    label: str, style: LabelStyle | FlagStyle
+) -> tuple[int, int, tuple[int, ...]]:
+    """Measure a label whose lines are separated by newlines.
+
+    Each line is measured on its own through the cached ink metrics, so a line
+    shared by many labels, such as a class name above a changing score, is
+    only rendered for measuring once. Lines are stacked ``style.padding``
+    pixels apart.
+
+    Returns:
+        (width, height, baselines): width of the widest line, ink height of
+        the whole block, and the offset of each line's baseline from the top
+        of the block
+
+    """
+    if "\n" not in label:
+        width, ascent, descent = style.metrics(label)
+        return width, ascent + descent, (ascent,)
+    width = height = 0
+    baselines = []
+    for line in label.split("\n"):
+        line_width, ascent, descent = style.metrics(line)
+        if baselines:
+            height += style.padding
+        baselines.append(height + ascent)
+        height += ascent + descent
+        width = max(width, line_width)
+    return width, height, tuple(baselines)
+
+
+def _put_lines(
+    img: NDArray[np.uint8],
+    label: str,
+    text_x: int,
+    text_y: int,
+    style: LabelStyle | FlagStyle,
+) -> None:
+    """Write ``label`` line by line, its first baseline at (text_x, text_y)."""
+    text_color = _frame_color(style.text_color, img)
+    if "\n" not in label:
+        _put_text(
+            img,
+            label,
+            (text_x, text_y),
+            style.size,
+            text_color,
+            style.thickness,
+        )
+        return
+    _, _, baselines = _text_block(label, style)
+    for line, baseline in zip(label.split("\n"), baselines, strict=True):
+        _put_text(
+            img,
+            line,
+            (text_x, text_y + baseline - baselines[0]),
+            style.size,
+            text_color,
+            style.thickness,
+        )
+
+
+def _put_text(
+    img: NDArray[np.integer],
+    text: str,
+    origin: tuple[int, int],
+    size: float,
+    color: tuple[int, ...],
+    thickness: int,
+) -> None:
+    """Write one line of text like ``cv2.putText``, on any supported frame.
+
+    ``cv2.putText`` only draws on 8-bit images and blends its antialiased
+    edges into the alpha channel of BGRA frames, so on 16-bit and BGRA frames
+    the text is drawn into an 8-bit coverage mask of its own region and
+    blended into the color channels by that coverage.
+    """
+    if img.dtype == np.uint8 and (img.ndim == 2 or img.shape[2] != 4):
+        cv2.putText(img, text, origin, font, size, color, thickness)
+        return
+    (width, height), baseline = cv2.getTextSize(text, font, size, thickness)
+    x0 = max(origin[0] - thickness, 0)
+    y0 = max(origin[1] - height - thickness, 0)
+    x1 = min(origin[0] + width + thickness, img.shape[1])
+    y1 = min(origin[1] + baseline + thickness, img.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    coverage = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+    cv2.putText(
+        coverage, text, (origin[0] - x0, origin[1] - y0), font, size, 255, thickness
+    )
+    covered = coverage > 0
+    region = img[y0:y1, x0:x1]
+    weight = coverage[covered] / 255
+    if region.ndim == 3:
+        weight = weight[:, np.newaxis]
+    pixels = region[covered]
+    blended = pixels + (np.array(color) - pixels) * weight
+    region[covered] = np.rint(blended).astype(img.dtype)
@@ -0,0 +1,283 @@
+"""Grids of annotated frames, drawn straight into one preallocated buffer."""
+
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from ._utils import _as_array, _frame_color, _validate_color
+from .detections import (
+    SUPPORTED_LABEL_POSITIONS,
+    _draw_detection_labels,
+    _label_style,
+    _prepare_detections,
+)
+from .rectangle import _draw_rectangles
+from .styles import BoxStyle, FlagStyle, LabelStyle
+
+
+class Mosaic:
+    """A grid of frames, each resized into its cell and annotated in place.
+
+    The grid is allocated once. Each source frame is resized straight into
+    its cell, a view of the grid, its boxes are scaled to match, and the
+    annotations are drawn into that view, so building a video wall or a
+    contact sheet copies every pixel once instead of annotating full-size
+    frames and stacking them. Cells are disjoint, so :meth:`build` can fill
+    them on a thread pool, and :meth:`update` refreshes a single cell, e.g.
+    whenever one camera of a live grid delivers a frame.
+
+    Example:
+        >>> with Mosaic(2, 3, (360, 640), max_workers=4) as mosaic:
+        ...     grid = mosaic.build(frames, bboxes, labels)
+        ...     mosaic.update(4, new_frame, new_bboxes, new_labels)
+
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        cell_size: tuple[int, int],
+        channels: int = 3,
+        background: tuple[int, int, int] = (0, 0, 0),
+        keep_aspect: bool = True,
+        label_position: str = "top",
+        box_style: BoxStyle | None = None,
+        label_style: LabelStyle | FlagStyle | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        """Allocate the grid.
+
+        Args:
+            rows: Number of rows of cells
+            cols: Number of columns of cells
+            cell_size: (height, width) of each cell in pixels
+            channels: Channels of the grid and of the frames put in it, 1, 3
+                or 4 (default: 3)
+            background: BGR color of empty cells and of the bars around
+                letterboxed frames (default: black)
+            keep_aspect: If True, frames are scaled to fit their cell and
+                centered; if False, stretched to fill it (default: True)
+            label_position: ``"top"``, ``"inside"``, ``"T"`` or ``"flag"``, as
+                for :func:`draw_detections` (default: "top")
+            box_style: Style of the boxes (default: ``BoxStyle()``); its
+                ``bbox_format`` applies to the boxes passed in, in the
+                coordinates of the source frames
+            label_style: Style of the labels, a :class:`FlagStyle` for
+                ``"flag"`` (default: the :func:`draw_detections` defaults)
+            max_workers: Number of threads :meth:`build` fills cells on
+                (default: None, fill them on the calling thread)
+
+        Raises:
+            ValueError: If the grid or cell size is not positive, ``channels``
+                is unsupported, or a color, position or style is invalid
+
+        """
+        height, width = cell_size
+        if rows < 1 or cols < 1 or height < 1 or width < 1:
+            raise ValueError("Mosaic rows, columns and cell size must be positive")
+        if channels not in (1, 3, 4):
+            raise ValueError(f"Images must have 1, 3 or 4 channels, got {channels}")
+        if label_position not in SUPPORTED_LABEL_POSITIONS:
+            raise ValueError(
+                f"Unsupported label_position {label_position!r}. "
+                f"Expected one of {SUPPORTED_LABEL_POSITIONS}."
+            )
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = (height, width)
+        self.keep_aspect = keep_aspect
+        self.label_position = label_position
+        self.box_style = box_style if box_style is not None else BoxStyle()
+        self.label_style = _label_style(
+            label_position, label_style, 1, 2, (255, 255, 255), (0, 0, 0)
+        )
+        shape = (rows * height, cols * width, channels)
+        self.canvas = np.empty(shape if channels > 1 else shape[:2], dtype=np.uint8)
+        self._background = _frame_color(_validate_color(background), self.canvas)
+        self.canvas[...] = self._background
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bbv-mosaic")
+            if max_workers is not None
+            else None
+        )
+
+    def cell(self, index: int) -> NDArray[np.uint8]:
+        """Return the view of the grid holding cell ``index``, in row-major order.
+
+        Raises:
+            ValueError: If ``index`` is outside the grid
+
+        """
+        if not 0 <= index < self.rows * self.cols:
+            raise ValueError(
+                f"Cell index {index} is outside the {self.rows}x{self.cols} grid"
+            )
+        height, width = self.cell_size
+        row, col = divmod(index, self.cols)
+        return self.canvas[
+            row * height : (row + 1) * height, col * width : (col + 1) * width
+        ]
+
+    def update(
+        self,
+        index: int,
+        img: NDArray[np.uint8],
+        bboxes: Sequence[Sequence[float]] | NDArray[np.number] | None = None,
+        labels: list[str] | None = None,
+        bbox_color: Sequence[tuple[int, int, int]] | NDArray[np.integer] | None = None,
+    ) -> NDArray[np.uint8]:
+        """Resize ``img`` into cell ``index`` and draw its detections there.
+
+        Safe to call from several threads at once for different cells.
+
+        Args:
+            index: Cell to fill, in row-major order
+            img: Source frame, with the grid's number of channels
+            bboxes: Boxes in ``img``'s coordinates, in the box style's
+                format (default: None, no boxes)
+            labels: Optional list of text labels, one per box (default: None)
+            bbox_color: One BGR color per box (default: None, the box
+                style's color)
+
+        Returns:
+            The cell's view of the grid
+
+        Raises:
+            ValueError: If ``index`` is outside the grid, ``img`` does not
+                match the grid, or the detections are invalid
+
+        """
+        cell = self.cell(index)
+        if img.dtype != np.uint8 or img.shape[2:] != self.canvas.shape[2:]:
+            raise ValueError(
+                "Frames must be uint8 with the mosaic's number of channels"
+            )
+        view, scale = self._fit(cell, img)
+        interpolation = cv2.INTER_AREA if min(scale) < 1 else cv2.INTER_LINEAR
+        cv2.resize(img, view.shape[1::-1], dst=view, interpolation=interpolation)
+        if bboxes is not None and len(bboxes) > 0:
+            self._annotate(view, scale, bboxes, labels, bbox_color)
+        return cell
+
+    def build(
+        self,
+        frames: Sequence[NDArray[np.uint8]],
+        bboxes: Sequence[Sequence[Sequence[float]] | NDArray[np.number] | None]
+        | None = None,
+        labels: Sequence[list[str] | None] | None = None,
+        bbox_colors: Sequence[Sequence[tuple[int, int, int]] | None] | None = None,
+    ) -> NDArray[np.uint8]:
+        """Fill the cells with ``frames`` and their detections, in row-major order.
+
+        Cells without a frame are cleared to the background.
+
+        Args:
+            frames: Up to ``rows * cols`` source frames
+            bboxes: Boxes of each frame, or None for a frame without boxes
+                (default: None, no boxes)
+            labels: Labels of each frame's boxes, or None (default: None)
+            bbox_colors: Per-box colors of each frame, or None (default: None)
+
+        Returns:
+            The grid; the same buffer is reused by later calls
+
+        Raises:
+            ValueError: If there are more frames than cells, the per-frame
+                lists differ in length from ``frames``, or an input is invalid
+
+        """
+        count = len(frames)
+        if count > self.rows * self.cols:
+            raise ValueError(
+                f"{count} frames do not fit a {self.rows}x{self.cols} grid"
+            )
+        per_frame = [bboxes, labels, bbox_colors]
+        if any(values is not None and len(values) != count for values in per_frame):
+            raise ValueError("Number of frames must match number of detection lists")
+        bboxes, labels, bbox_colors = (
+            values if values is not None else [None] * count for values in per_frame
+        )
+
+        def fill(index: int) -> None:
+            self.update(
+                index, frames[index], bboxes[index], labels[index], bbox_colors[index]
+            )
+
+        if self._executor is None:
+            for index in range(count):
+                fill(index)
+        else:
+            # list() re-raises the first error from the workers
+            list(self._executor.map(fill, range(count)))
+        for index in range(count, self.rows * self.cols):
+            self.cell(index)[...] = self._background
+        return self.canvas
+
+    def close(self) -> None:
+        """Stop the worker threads, if any."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "Mosaic":
+        """Return the mosaic for use in a ``with`` block."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the mosaic when leaving a ``with`` block."""
+        self.close()
+
+    def _fit(
+        self, cell: NDArray[np.uint8], img: NDArray[np.uint8]
+    ) -> tuple[NDArray[np.uint8], tuple[float, float]]:
+        """Return the part of ``cell`` that ``img`` is resized into, and the scale."""
+        height, width = self.cell_size
+        src_height, src_width = img.shape[:2]
+        if not self.keep_aspect:
+            return cell, (width / src_width, height / src_height)
+        scale = min(width / src_width, height / src_height)
+        fit_width = max(round(src_width * scale), 1)
+        fit_height = max(round(src_height * scale), 1)
+        if (fit_height, fit_width) != (height, width):
+            # Repaint the bars, which a previous frame may have covered
+            cell[...] = self._background
+        top, left = (height - fit_height) // 2, (width - fit_width) // 2
+        view = cell[top : top + fit_height, left : left + fit_width]
+        return view, (fit_width / src_width, fit_height / src_height)
+
+    def _annotate(
+        self,
+        view: NDArray[np.uint8],
+        scale: tuple[float, float],
+        bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+        labels: list[str] | None,
+        bbox_color: Sequence[tuple[int, int, int]] | NDArray[np.integer] | None,
+    ) -> None:
+        """Draw detections given in source coordinates into a resized ``view``."""
+        scaled = np.asarray(_as_array(bboxes), dtype=np.float64)
+        # YOLO boxes are relative to the frame, so they need no scaling
+        if self.box_style.bbox_format != "yolo":
+            scaled = scaled * (scale * 2)
+        boxes, colors, labels, _ = _prepare_detections(
+            view.shape,
+            scaled,
+            labels,
+            self.box_style.color if bbox_color is None else bbox_color,
+            self.label_position,
+            self.box_style.thickness,
+            self.box_style.is_opaque,
+            self.box_style.alpha,
+            self.box_style.bbox_format,
+            self.box_style,
+            None,
+            None,
+            None,
+        )
+        _draw_rectangles(view, boxes, colors, self.box_style)
+        if labels is not None:
+            _draw_detection_labels(
+                view, labels, boxes, self.label_position, self.label_style
+            )
@@ -0,0 +1,208 @@
+"""Functions for drawing oriented (rotated) bounding boxes.
+
+Oriented boxes are given as ``[x_center, y_center, width, height, angle]`` in
+absolute pixels. The angle rotates the box about its center, clockwise on
+screen for positive values (the ``cv2.RotatedRect`` convention), in degrees by
+default.
+"""
+
+from collections.abc import Sequence
+from typing import cast
+
+import cv2
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ._utils import (
+    _as_array,
+    _color_runs,
+    _frame_color,
+    _frame_colors,
+    _points_roi,
+)
+from .labels import _draw_labels
+from .rectangle import _box_colors, _is_per_box_color
+from .styles import BoxStyle, LabelStyle
+
+#: Angle units accepted by the oriented-box functions.
+SUPPORTED_ANGLE_UNITS = ("degrees", "radians")
+
+
+def draw_multiple_oriented_boxes(
+    img: NDArray[np.uint8],
+    obbs: ArrayLike,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer] = (255, 255, 255),
+    thickness: int = 3,
+    is_opaque: bool = False,
+    alpha: float = 0.5,
+    angle_unit: str = "degrees",
+    style: BoxStyle | None = None,
+) -> NDArray[np.uint8]:
+    """Draws multiple oriented boxes using batched operations.
+
+    Corners for all boxes are computed in one NumPy pass. Outlines of one
+    color are drawn with a single ``cv2.polylines`` call, and filled boxes are
+    blended only inside the region the boxes cover.
+
+    Args:
+        img: Input image array
+        obbs: Oriented boxes, shape (N, 5), each
+            [x_center, y_center, width, height, angle]
+        bbox_color: BGR color tuple applied to all boxes, a sequence of one
+            color per box, or an integer array of shape (N, 3) (default: white)
+        thickness: Line thickness in pixels (default: 3)
+        is_opaque: If True, draws filled boxes with transparency (default: False)
+        alpha: Transparency level for filled boxes (default: 0.5)
+        angle_unit: Unit of the angles, "degrees" or "radians" (default: "degrees")
+        style: Pre-validated :class:`BoxStyle`; when given, it replaces the
+            styling arguments above (its ``bbox_format`` is not used). Per-box
+            colors passed in ``bbox_color`` still take precedence over
+            ``style.color``.
+
+    Returns:
+        New image with all boxes drawn; the input image is not modified
+
+    Raises:
+        ValueError: If ``obbs`` is empty or not of shape (N, 5), or
+            ``angle_unit`` is unsupported
+
+    """
+    boxes = _validate_obbs(obbs, angle_unit)
+    if style is None:
+        # Per-box colors are validated by _box_colors; keep the style's default
+        single_color = (
+            (255, 255, 255)
+            if _is_per_box_color(bbox_color)
+            else cast("tuple[int, int, int]", bbox_color)
+        )
+        style = BoxStyle(single_color, thickness, is_opaque, alpha)
+    colors = _box_colors(bbox_color, style, len(boxes))
+
+    output = img.copy()
+    if not style.is_opaque:
+        # Shrink the box by the stroke shift so the outer edge of the stroke
+        # lies on the box, matching draw_rectangle
+        inset = boxes.copy()
+        inset[:, 2:4] = np.maximum(inset[:, 2:4] - 2 * style.stroke_shift, 0)
+        corners = np.rint(_obb_corners(inset)).astype(np.int32)
+        # Runs of consecutive boxes sharing a color keep input order, so
+        # overlapping outlines stack as if drawn one by one
+        for color, run in _color_runs(colors):
+            color = _frame_color(color, output)
+            cv2.polylines(output, corners[run], True, color, style.thickness)
+    else:
+        corners = np.rint(_obb_corners(boxes)).astype(np.int32)
+        roi = _points_roi(corners.reshape(-1, 2), output.shape)
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            region = output[y0:y1, x0:x1]
+            overlay = region.copy()
+            # One call per box: cv2.fillPoly with several polygons XORs overlaps
+            colors = _frame_colors(colors, output)
+            for polygon, color in zip(corners - (x0, y0), colors.tolist(), strict=True):
+                cv2.fillConvexPoly(overlay, polygon, color)
+            cv2.addWeighted(overlay, style.alpha, region, 1 - style.alpha, 0, region)
+    return output
+
+
+def add_multiple_oriented_labels(
+    img: NDArray[np.uint8],
+    labels: list[str],
+    obbs: ArrayLike,
+    size: float = 1,
+    thickness: int = 2,
+    draw_bg: bool = True,
+    text_bg_color: tuple[int, int, int] = (255, 255, 255),
+    text_color: tuple[int, int, int] = (0, 0, 0),
+    top: bool = True,
+    angle_unit: str = "degrees",
+    style: LabelStyle | None = None,
+) -> NDArray[np.uint8]:
+    """Add labels to oriented boxes, anchored at each box's top-most corner.
+
+    Placement follows :func:`add_label`, treating the top-most corner as the
+    box's top-left: the label sits above the corner when it fits and below it
+    otherwise.
+
+    Args:
+        img: Input image array
+        labels: List of text labels
+        obbs: Oriented boxes, shape (N, 5), each
+            [x_center, y_center, width, height, angle]
+        size: Font size multiplier (default: 1)
+        thickness: Text thickness in pixels (default: 2)
+        draw_bg: Whether to draw background rectangles (default: True)
+        text_bg_color: BGR color tuple for text backgrounds (default: white)
+        text_color: BGR color tuple for text (default: black)
+        top: If True, place labels above the corner; if False, below
+            (default: True)
+        angle_unit: Unit of the angles, "degrees" or "radians" (default: "degrees")
+        style: Pre-validated :class:`LabelStyle`; when given, it replaces the
+            styling arguments above (its ``bbox_format`` is not used)
+
+    Returns:
+        New image with all labels added; the input image is not modified
+
+    """
+    boxes = _validate_obbs(obbs, angle_unit)
+    if labels is None or len(labels) != len(boxes):
+        raise ValueError("Number of bounding boxes must match number of labels")
+    if style is None:
+        style = LabelStyle(size, thickness, draw_bg, text_bg_color, text_color, top)
+    anchors = _label_anchors(_obb_corners(boxes), img.shape)
+
+    # Anchors are already clipped integer boxes, so draw them directly
+    output = img.copy()
+    _draw_labels(output, labels, anchors, style)
+    return output
+
+
+def _validate_obbs(obbs: ArrayLike, angle_unit: str) -> NDArray[np.float64]:
+    """Return oriented boxes as an (N, 5) float array with angles in radians."""
+    if angle_unit not in SUPPORTED_ANGLE_UNITS:
+        raise ValueError(
+            f"Unsupported angle_unit {angle_unit!r}. "
+            f"Expected one of {SUPPORTED_ANGLE_UNITS}."
+        )
+    boxes = np.array(_as_array(obbs), dtype=np.float64, ndmin=2)
+    if boxes.size == 0:
+        raise ValueError("List of bounding boxes cannot be empty")
+    if boxes.ndim != 2 or boxes.shape[1] != 5:
+        raise ValueError(
+            "Oriented boxes must have 5 values "
+            "[x_center, y_center, width, height, angle]"
+        )
+    if (boxes[:, 2:4] < 0).any():
+        raise ValueError("Oriented box width and height must be non-negative")
+    if angle_unit == "degrees":
+        boxes[:, 4] = np.deg2rad(boxes[:, 4])
+    return boxes
+
+
+def _obb_corners(boxes: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Return the (N, 4, 2) corners of oriented boxes with angles in radians.
+
+    Corners run clockwise on screen from the box's own top-left corner.
+    """
+    cx, cy, width, height, angle = boxes.T
+    cos, sin = np.cos(angle), np.sin(angle)
+    # Corner offsets from the center before rotation, shape (N, 4)
+    dx = np.stack([-width, width, width, -width], axis=1) / 2
+    dy = np.stack([-height, -height, height, height], axis=1) / 2
+    x = cx[:, None] + dx * cos[:, None] - dy * sin[:, None]
+    y = cy[:, None] + dx * sin[:, None] + dy * cos[:, None]
+    return np.stack([x, y], axis=2)
+
+
+def _label_anchors(
+    corners: NDArray[np.float64], img_size: tuple[int, ...]
+) -> NDArray[np.int64]:
+    """Return a degenerate VOC box at each box's top-most corner, for add_label."""
+    # Top-most corner; the left-most one on ties (e.g. unrotated boxes)
+    order = np.lexsort((corners[..., 0], corners[..., 1]), axis=1)[:, 0]
+    top = corners[np.arange(len(corners)), order]
+    x = np.clip(np.rint(top[:, 0]), 0, img_size[1] - 1).astype(np.int64)
+    y = np.clip(np.rint(top[:, 1]), 0, img_size[0] - 1).astype(np.int64)
+    return np.stack([x, y, x, y], axis=1)
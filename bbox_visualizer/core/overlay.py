@@ -0,0 +1,218 @@
+"""Annotations rasterized once onto a transparent layer, composited many times."""
+
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from .detections import (
+    _LABEL_KINDS,
+    _draw_detection_labels,
+    _label_style,
+    _prepare_detections,
+)
+from .layout import _layout
+from .rectangle import _draw_rectangles
+from .render import _cv2_addressable
+from .styles import BoxStyle, FlagStyle, LabelStyle
+
+# Rows blended at a time by OverlayLayer.composite_in_place
+_STRIP_ROWS = 32
+
+
+class OverlayLayer:
+    """A transparent BGRA layer holding annotations, to blend onto other frames.
+
+    Annotations are drawn once, as :func:`draw_detections` draws them, onto a
+    layer whose pixels store premultiplied color and coverage: an opaque
+    stroke is its color with alpha 255, a box filled at ``alpha`` 0.5 half
+    its color with alpha 128. The layer records the bounding region of
+    everything drawn on it, and compositing blends only that region, so
+    showing the same annotations on several outputs (the full stream, a crop
+    of it, another background) costs one small blend per output instead of
+    one redraw each.
+
+    Example:
+        >>> overlay = OverlayLayer(frame.shape)
+        >>> overlay.draw(bboxes, labels)
+        >>> full = overlay.composite(frame)
+        >>> crop = overlay.composite(frame[100:400, 200:600], offset=(200, 100))
+
+    """
+
+    def __init__(self, img_size: tuple[int, ...]) -> None:
+        """Allocate a transparent layer the size of the annotated frames.
+
+        Args:
+            img_size: Tuple of (height, width, ...), e.g. ``img.shape``
+
+        """
+        self.layer = np.zeros((img_size[0], img_size[1], 4), dtype=np.uint8)
+        #: [x1, y1, x2, y2) region holding all ink, or None if nothing is drawn
+        self.bounds: tuple[int, int, int, int] | None = None
+
+    def draw(
+        self,
+        bboxes: Sequence[Sequence[float]] | NDArray[np.number],
+        labels: list[str] | None = None,
+        bbox_color: tuple[int, int, int]
+        | Sequence[tuple[int, int, int]]
+        | NDArray[np.integer] = (255, 255, 255),
+        label_position: str = "top",
+        box_style: BoxStyle | None = None,
+        label_style: LabelStyle | FlagStyle | None = None,
+    ) -> None:
+        """Draw boxes and their labels onto the layer, over what it holds.
+
+        Args:
+            bboxes: Bounding boxes, each in ``box_style.bbox_format`` (default
+                VOC: [x_min, y_min, x_max, y_max]), as a list or an (N, 4) array
+            labels: Optional list of text labels, one per box (default: None)
+            bbox_color: BGR color tuple applied to all boxes, or one color per
+                box; a single color is ignored when ``box_style`` is given
+                (default: white)
+            label_position: ``"top"``, ``"inside"``, ``"T"`` or ``"flag"``, as
+                for :func:`draw_detections` (default: "top")
+            box_style: :class:`BoxStyle` for the boxes (default: None, the
+                :func:`draw_detections` defaults)
+            label_style: :class:`LabelStyle`, or :class:`FlagStyle` for
+                ``"flag"`` (default: None, the :func:`draw_detections` defaults)
+
+        Raises:
+            ValueError: If the inputs are invalid, as for :func:`draw_detections`
+
+        """
+        boxes, colors, labels, box_style = _prepare_detections(
+            self.layer.shape,
+            bboxes,
+            labels,
+            bbox_color,
+            label_position,
+            3,
+            False,
+            0.5,
+            "voc",
+            box_style,
+            None,
+            None,
+            None,
+        )
+        if len(boxes) == 0:
+            return
+        # Ink stays inside the boxes; cv2 fills include the far corner
+        ink = [boxes + np.array([0, 0, 1, 1])]
+        _draw_rectangles(self.layer, boxes, colors, box_style)
+        if labels is not None:
+            style = _label_style(
+                label_position, label_style, 1, 2, (255,) * 3, (0,) * 3
+            )
+            layout = _layout(_LABEL_KINDS[label_position], labels, boxes, style)
+            ink.append(layout.backgrounds[layout.has_text] + (0, 0, 1, 1))
+            # 3px poles reach 2px past their end points
+            ink.append(layout.poles[layout.has_pole] + (-2, -2, 3, 3))
+            _draw_detection_labels(self.layer, labels, boxes, label_position, style)
+        self._extend_bounds(np.concatenate(ink))
+
+    def clear(self) -> None:
+        """Erase everything drawn, touching only the inked region."""
+        if self.bounds is not None:
+            x1, y1, x2, y2 = self.bounds
+            self.layer[y1:y2, x1:x2] = 0
+            self.bounds = None
+
+    def composite(
+        self, img: NDArray[np.integer], offset: tuple[int, int] = (0, 0)
+    ) -> NDArray[np.integer]:
+        """Return a copy of ``img`` with the layer blended over it.
+
+        Args:
+            img: Frame to blend onto: 8-bit or 16-bit, with 1, 3 or 4 channels
+            offset: (x, y) position of ``img`` in the annotated frame, e.g.
+                ``(x0, y0)`` for a crop ``frame[y0:y1, x0:x1]`` (default: (0, 0))
+
+        Returns:
+            New image with the annotations; the input image is not modified
+
+        Raises:
+            ValueError: If ``img`` is neither 8-bit nor 16-bit or has neither
+                1, 3 nor 4 channels
+
+        """
+        output = img.copy()
+        self.composite_in_place(output, offset)
+        return output
+
+    def composite_in_place(
+        self, img: NDArray[np.integer], offset: tuple[int, int] = (0, 0)
+    ) -> None:
+        """Blend the layer over ``img`` in place; see :meth:`composite`."""
+        if img.dtype not in (np.uint8, np.uint16):
+            raise ValueError(f"Images must be 8-bit or 16-bit, got {img.dtype}")
+        channels = 1 if img.ndim == 2 else img.shape[2]
+        if channels not in (1, 3, 4):
+            raise ValueError(f"Images must have 1, 3 or 4 channels, got {channels}")
+        if self.bounds is None:
+            return
+        if img.ndim == 3 and channels == 1:
+            # Blend (H, W, 1) frames through their (H, W) view
+            img = img[..., 0]
+        x, y = offset
+        x1, y1, x2, y2 = self.bounds
+        x1, y1 = max(x1, x), max(y1, y)
+        x2, y2 = min(x2, x + img.shape[1]), min(y2, y + img.shape[0])
+        if x1 >= x2 or y1 >= y2:
+            return
+        dst = img[y1 - y : y2 - y, x1 - x : x2 - x]
+        src = self.layer[y1:y2, x1:x2]
+        # Blend in strips so the temporaries stay small and in cache
+        for top in range(0, y2 - y1, _STRIP_ROWS):
+            rows = slice(top, top + _STRIP_ROWS)
+            _blend_premultiplied(dst[rows], src[rows])
+
+    def _extend_bounds(self, ink: NDArray[np.int64]) -> None:
+        """Grow :attr:`bounds` to cover the [x1, y1, x2, y2) ``ink`` rectangles."""
+        height, width = self.layer.shape[:2]
+        x1, y1 = np.maximum(ink[:, :2].min(axis=0), 0).tolist()
+        x2 = min(int(ink[:, 2].max()), width)
+        y2 = min(int(ink[:, 3].max()), height)
+        if self.bounds is not None:
+            x1, y1 = min(x1, self.bounds[0]), min(y1, self.bounds[1])
+            x2, y2 = max(x2, self.bounds[2]), max(y2, self.bounds[3])
+        if x1 < x2 and y1 < y2:
+            self.bounds = (x1, y1, x2, y2)
+
+
+def _blend_premultiplied(dst: NDArray[np.integer], src: NDArray[np.uint8]) -> None:
+    """Blend premultiplied BGRA ``src`` over ``dst`` of the same size, in place.
+
+    Each channel becomes ``dst * (1 - alpha) + src``, in integers rounded to
+    nearest. On BGRA frames the alpha channel is blended the same way, which
+    keeps opaque frames opaque.
+    """
+    inverse = 255 - src[..., 3]
+    if dst.ndim == 2:
+        color = cv2.cvtColor(src, cv2.COLOR_BGRA2GRAY)
+    elif dst.shape[2] == 3:
+        color = cv2.cvtColor(src, cv2.COLOR_BGRA2BGR)
+        inverse = cv2.cvtColor(inverse, cv2.COLOR_GRAY2BGR)
+    else:
+        color = src
+        inverse = cv2.merge([inverse] * 4)
+    if dst.dtype == np.uint8 and _cv2_addressable(dst):
+        # dst * inverse / 255 never ends in exactly .5, so cv2's rounding
+        # matches the integer formula below
+        cv2.multiply(dst, inverse, dst, scale=1 / 255)
+        cv2.add(dst, color, dst)
+        return
+    # Premultiplied color never exceeds alpha by more than rounding, so the
+    # sum stays below 2**16 for 8-bit frames
+    if dst.dtype == np.uint8:
+        work, scale = np.uint16, 1
+    else:
+        work, scale = np.uint32, 257
+    blended = dst * inverse.astype(work)
+    blended += color.astype(work) * (255 * scale)
+    blended += 127
+    blended //= 255
+    dst[...] = blended
@@ -0,0 +1,160 @@
+"""Class-ID to color lookup tables."""
+
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ._utils import _as_array, _validate_colors
+
+# Fractional part of the golden ratio: stepping the hue by it spreads any
+# number of consecutive class IDs evenly around the hue wheel
+_GOLDEN_RATIO_CONJUGATE = 0.618033988749895
+
+_NUM_BGR_COLORS = 1 << 24
+
+# Odd, so stepping a packed BGR value by it visits every color before
+# repeating; each step brightens all three channels by about one level
+_NUDGE = 0x010101
+
+
+class Palette:
+    """Map integer class IDs to BGR colors through a precomputed lookup table.
+
+    Colors are validated once when the palette is built and stored as a
+    ``(K, 3)`` ``uint8`` table, so looking up the colors for a whole frame of
+    detections is a single NumPy fancy-index.
+
+    Example:
+        >>> palette = Palette.distinct(80)
+        >>> colors = palette.colors([0, 2, 2, 17])
+        >>> colors.shape
+        (4, 3)
+
+    """
+
+    def __init__(self, colors: Sequence[Sequence[int]] | NDArray[np.integer]) -> None:
+        """Build a palette from explicit colors.
+
+        Args:
+            colors: One BGR color per class ID, as a sequence of 3-integer
+                sequences or an integer array of shape (K, 3)
+
+        Raises:
+            ValueError: If ``colors`` is empty or contains an invalid color
+
+        """
+        # len() instead of truthiness: numpy arrays raise on ambiguous bool()
+        if colors is None or len(colors) == 0:
+            raise ValueError("Palette needs at least one color")
+        lut, _ = _validate_colors(colors, len(colors))
+        self._lut = np.array(lut, dtype=np.uint8)
+        self._lut.flags.writeable = False
+
+    @classmethod
+    def distinct(cls, num_colors: int) -> "Palette":
+        """Generate ``num_colors`` distinct colors.
+
+        Hues follow golden-ratio steps so neighboring class IDs never look
+        alike, while saturation and brightness cycle on different periods to
+        separate colors that land on similar hues in large palettes. Hues are
+        converted at full float precision, which keeps every color unique up
+        to about 1000 classes; beyond that, the rare repeats are nudged to the
+        nearest unused color, so no two class IDs ever share one.
+
+        Args:
+            num_colors: Number of class IDs to cover, at most 2**24
+
+        Returns:
+            A palette with ``num_colors`` entries
+
+        Raises:
+            ValueError: If ``num_colors`` is less than 1 or more than 2**24
+
+        """
+        if num_colors < 1:
+            raise ValueError("Palette needs at least one color")
+        if num_colors > _NUM_BGR_COLORS:
+            raise ValueError(f"A palette holds at most {_NUM_BGR_COLORS} colors")
+        ids = np.arange(num_colors)
+        # Float HSV: hue in degrees, saturation and value in [0, 1]
+        hsv = np.empty((1, num_colors, 3), dtype=np.float32)
+        hsv[0, :, 0] = (ids * _GOLDEN_RATIO_CONJUGATE % 1.0) * 360
+        hsv[0, :, 1] = np.where((ids // 2) % 2 == 0, 1.0, 2 / 3)
+        values = np.array([255, 200, 145], dtype=np.float32) / 255
+        hsv[0, :, 2] = values[(ids // 4) % 3]
+        bgr = np.rint(cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0] * 255)
+        return cls(_unique_colors(bgr.astype(np.uint8)))
+
+    @property
+    def lut(self) -> NDArray[np.uint8]:
+        """Read-only ``(K, 3)`` ``uint8`` lookup table of BGR colors."""
+        return self._lut
+
+    def __len__(self) -> int:
+        """Return the number of class IDs the palette covers."""
+        return len(self._lut)
+
+    def __getitem__(self, class_id: int) -> tuple[int, int, int]:
+        """Return the BGR color of a single class ID."""
+        b, g, r = self._lut[class_id].tolist()
+        return (b, g, r)
+
+    def colors(self, class_ids: ArrayLike, wrap: bool = False) -> NDArray[np.uint8]:
+        """Look up the colors of many class IDs at once.
+
+        The result can be passed directly as ``bbox_color`` to the batch
+        drawing functions, which then skip per-color validation.
+
+        Args:
+            class_ids: Integer class IDs, one per detection; floats are
+                accepted if they hold whole numbers
+            wrap: If True, IDs beyond the palette wrap around modulo its
+                length, e.g. for unbounded track IDs (default: False)
+
+        Returns:
+            ``uint8`` array of shape (N, 3) with one BGR color per ID
+
+        Raises:
+            ValueError: If an ID is not a whole number, or is out of range and
+                ``wrap`` is False
+
+        """
+        ids = np.asarray(_as_array(class_ids))
+        if ids.size and not np.issubdtype(ids.dtype, np.integer):
+            # Float IDs are accepted only when they hold whole numbers, so two
+            # different IDs never truncate to the same color
+            if not np.issubdtype(ids.dtype, np.floating) or not np.all(
+                np.isfinite(ids) & (ids == np.rint(ids))
+            ):
+                raise ValueError("Class IDs must be integers")
+            ids = ids.astype(np.intp)
+        if wrap:
+            ids = ids % len(self._lut)
+        elif ids.size and (ids.min() < 0 or ids.max() >= len(self._lut)):
+            raise ValueError(
+                f"Class IDs must be between 0 and {len(self._lut) - 1} for this palette"
+            )
+        return self._lut[ids.reshape(-1).astype(np.intp, copy=False)]
+
+
+def _unique_colors(colors: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Return ``colors`` with each repeat moved to the nearest unused color.
+
+    The first occurrence of a color keeps it, so palettes that are already
+    unique come back unchanged.
+    """
+    packed = colors.astype(np.int64) @ np.array([1 << 16, 1 << 8, 1])
+    _, first = np.unique(packed, return_index=True)
+    if len(first) == len(packed):
+        return colors
+    used = set(packed[first].tolist())
+    repeats = np.setdiff1d(np.arange(len(packed)), first)
+    for index in repeats.tolist():
+        value = int(packed[index])
+        while value in used:
+            value = (value + _NUDGE) % _NUM_BGR_COLORS
+        used.add(value)
+        packed[index] = value
+    return (packed[:, np.newaxis] >> np.array([16, 8, 0]) & 0xFF).astype(np.uint8)
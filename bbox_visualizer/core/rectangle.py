@@ -5,9 +5,21 @@ from typing import cast
 
 import cv2
 import numpy as np
-from numpy.typing import NDArray
-
-from ._utils import _check_and_modify_bbox, _validate_color
+from numpy.typing import ArrayLike, NDArray
+
+from ._utils import (
+    _as_array,
+    _check_and_modify_bbox,
+    _check_and_modify_bboxes,
+    _color_runs,
+    _frame_color,
+    _frame_colors,
+    _points_roi,
+    _validate_colors,
+)
+from .density import draw_density
+from .filtering import DetectionFilter
+from .styles import BoxStyle
 
 
 def draw_rectangle(
@@ -18,6 +30,7 @@ def draw_rectangle(
     is_opaque: bool = False,
     alpha: float = 0.5,
     bbox_format: str = "voc",
+    style: BoxStyle | None = None,
 ) -> NDArray[np.uint8]:
     """Draws a rectangle around an object in the image.
 
@@ -30,48 +43,37 @@ def draw_rectangle(
         is_opaque: If True, draws filled rectangle with transparency (default: False)
         alpha: Transparency level for filled rectangles (default: 0.5)
         bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        style: Pre-validated :class:`BoxStyle`; when given, it replaces all
+            of the styling arguments above and skips their validation
 
     Returns:
         New image with drawn rectangle; the input image is not modified
 
     """
-    bbox_color = _validate_color(bbox_color)
-    bbox = _check_and_modify_bbox(bbox, img.shape, bbox_format=bbox_format)
+    if style is None:
+        style = BoxStyle(bbox_color, thickness, is_opaque, alpha, bbox_format)
+    bbox = _check_and_modify_bbox(bbox, img.shape, bbox_format=style.bbox_format)
 
     output = img.copy()
-    if not is_opaque:
-        # Shift the stroke inward so its outer edge lies on the bbox coordinates
-        # (cv2 centers the stroke on the coords, spilling outside the box and
-        # misaligning with labels drawn flush at bbox[0]). cv2's measured stroke
-        # half-width is (t+1)//2 for t > 1, not t//2.
-        shift = (thickness + 1) // 2 if thickness > 1 else 0
-        cv2.rectangle(
-            output,
-            (bbox[0] + shift, bbox[1] + shift),
-            (bbox[2] - shift, bbox[3] - shift),
-            bbox_color,
-            thickness,
-        )
-    else:
-        overlay = img.copy()
-        cv2.rectangle(overlay, (bbox[0], bbox[1]), (bbox[2], bbox[3]), bbox_color, -1)
-        cv2.addWeighted(overlay, alpha, output, 1 - alpha, 0, output)
-
+    _draw_rectangle(output, bbox, style)
     return output
 
 
 def draw_multiple_rectangles(
     img: NDArray[np.uint8],
     bboxes: Sequence[Sequence[float]],
-    bbox_color: tuple[int, int, int] | Sequence[tuple[int, int, int]] = (
-        255,
-        255,
-        255,
-    ),
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer] = (255, 255, 255),
     thickness: int = 3,
     is_opaque: bool = False,
     alpha: float = 0.5,
     bbox_format: str = "voc",
+    style: BoxStyle | None = None,
+    density_threshold: int | None = None,
+    detection_filter: DetectionFilter | None = None,
+    scores: ArrayLike | None = None,
+    class_ids: ArrayLike | None = None,
 ) -> NDArray[np.uint8]:
     """Draws multiple rectangles on the image using optimized batched operations.
 
@@ -79,84 +81,167 @@ def draw_multiple_rectangles(
         img: Input image array
         bboxes: List of bounding boxes, each in ``bbox_format`` (default VOC:
             [x_min, y_min, x_max, y_max])
-        bbox_color: BGR color tuple applied to all boxes, or a sequence of
-            one color per box (default: white)
+        bbox_color: BGR color tuple applied to all boxes, a sequence of one
+            color per box, or an integer array of shape (N, 3) such as
+            :meth:`Palette.colors` returns (default: white)
         thickness: Line thickness in pixels (default: 3)
         is_opaque: If True, draws filled rectangles with transparency (default: False)
         alpha: Transparency level for filled rectangles (default: 0.5)
         bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        style: Pre-validated :class:`BoxStyle`; when given, it replaces all
+            of the styling arguments above and skips their validation. Per-box
+            colors passed in ``bbox_color`` still take precedence over
+            ``style.color``.
+        density_threshold: If given and there are more boxes than this, draw
+            a :func:`draw_density` coverage heatmap blended with ``alpha``
+            instead of the boxes (default: None, always draw boxes)
+        detection_filter: Optional :class:`DetectionFilter` choosing which
+            boxes to draw; the density threshold counts the kept boxes only
+            (default: None, draw every box)
+        scores: Confidence per box, for ``detection_filter`` (default: None)
+        class_ids: Integer class per box, for ``detection_filter`` (default: None)
 
     Returns:
         New image with all rectangles drawn; the input image is not modified
 
     """
+    bboxes = _as_array(bboxes)
     # len() instead of truthiness: numpy arrays raise on ambiguous bool()
     if bboxes is None or len(bboxes) == 0:
         raise ValueError("List of bounding boxes cannot be empty")
 
-    per_box_colors = len(bbox_color) > 0 and isinstance(bbox_color[0], tuple | list)
-    colors: list[tuple[int, int, int]]
-    if per_box_colors:
-        if len(bbox_color) != len(bboxes):
-            raise ValueError(
-                f"Number of colors ({len(bbox_color)}) must match "
-                f"number of bounding boxes ({len(bboxes)})"
-            )
-        color_seq = cast("Sequence[tuple[int, int, int]]", bbox_color)
-        colors = [tuple(color) for color in color_seq]
+    if style is None:
+        # Per-box colors are validated by _box_colors; keep the style's default
+        single_color = (
+            (255, 255, 255)
+            if _is_per_box_color(bbox_color)
+            else cast("tuple[int, int, int]", bbox_color)
+        )
+        style = BoxStyle(single_color, thickness, is_opaque, alpha, bbox_format)
+    colors = _box_colors(bbox_color, style, len(bboxes))
+    # Validate and modify all bboxes once; the filter works on the result
+    validated_bboxes = _check_and_modify_bboxes(bboxes, img.shape, style.bbox_format)
+    if detection_filter is not None:
+        keep = detection_filter.indices(validated_bboxes, scores, class_ids)
+        if len(keep) == 0:
+            return img.copy()
+        validated_bboxes = validated_bboxes[keep]
+        colors = colors[keep]
+    if density_threshold is not None and len(validated_bboxes) > density_threshold:
+        return draw_density(img, validated_bboxes, alpha=style.alpha)
+
+    output = img.copy()
+    _draw_rectangles(output, validated_bboxes, colors, style)
+    return output
+
+
+def _draw_rectangle(
+    output: NDArray[np.uint8],
+    bbox: Sequence[int],
+    style: BoxStyle,
+) -> None:
+    """Draw one already validated VOC box onto ``output`` in place."""
+    if not style.is_opaque:
+        # Shift the stroke inward so its outer edge lies on the bbox coordinates
+        # (cv2 centers the stroke on the coords, spilling outside the box and
+        # misaligning with labels drawn flush at bbox[0]).
+        shift = style.stroke_shift
+        cv2.rectangle(
+            output,
+            (bbox[0] + shift, bbox[1] + shift),
+            (bbox[2] - shift, bbox[3] - shift),
+            _frame_color(style.color, output),
+            style.thickness,
+        )
     else:
-        colors = [cast("tuple[int, int, int]", bbox_color)] * len(bboxes)
-    colors = [_validate_color(color) for color in colors]
+        overlay = output.copy()
+        color = _frame_color(style.color, output)
+        cv2.rectangle(overlay, (bbox[0], bbox[1]), (bbox[2], bbox[3]), color, -1)
+        cv2.addWeighted(overlay, style.alpha, output, 1 - style.alpha, 0, output)
 
-    # Validate and modify all bboxes
-    validated_bboxes = [
-        _check_and_modify_bbox(bbox, img.shape, bbox_format=bbox_format)
-        for bbox in bboxes
-    ]
 
-    output = img.copy()
+def _is_per_box_color(
+    color: tuple[int, int, int] | Sequence[tuple[int, int, int]] | NDArray[np.integer],
+) -> bool:
+    """Return True if ``color`` holds one color per box rather than a single color."""
+    if isinstance(color, np.ndarray):
+        return color.ndim == 2
+    return len(color) > 0 and isinstance(color[0], tuple | list | np.ndarray)
+
+
+def _box_colors(
+    color: tuple[int, int, int] | Sequence[tuple[int, int, int]] | NDArray[np.integer],
+    style: BoxStyle,
+    count: int,
+) -> NDArray[np.uint8]:
+    """Return the (count, 3) box colors: per-box ``color`` if given, else the style's."""
+    if _is_per_box_color(color):
+        colors, _ = _validate_colors(color, count)
+        return colors
+    return np.broadcast_to(np.array(style.color, dtype=np.uint8), (count, 3))
+
+
+def _draw_rectangles(
+    output: NDArray[np.uint8],
+    bboxes: Sequence[Sequence[int]] | NDArray[np.integer],
+    colors: NDArray[np.uint8],
+    style: BoxStyle,
+) -> None:
+    """Draw already validated VOC boxes onto ``output`` in place.
+
+    Args:
+        output: Image to draw on; modified in place
+        bboxes: Clipped [x_min, y_min, x_max, y_max] integer boxes
+        colors: ``uint8`` array with one BGR color per box, shape (N, 3)
+        style: Box style; its ``color`` is ignored in favor of ``colors``
 
-    if not is_opaque:
+    """
+    boxes = np.asarray(bboxes, dtype=np.int32).reshape(-1, 4)
+    if not style.is_opaque:
         # Shift the stroke inward so its outer edge lies on the bbox coordinates,
         # matching draw_rectangle
-        shift = (thickness + 1) // 2 if thickness > 1 else 0
-        if per_box_colors:
-            # cv2.polylines batches only a single color, so draw box by box
-            for bbox, color in zip(validated_bboxes, colors, strict=True):
-                cv2.rectangle(
-                    output,
-                    (bbox[0] + shift, bbox[1] + shift),
-                    (bbox[2] - shift, bbox[3] - shift),
-                    color,
-                    thickness,
-                )
-        else:
-            # Convert bboxes to contours for cv2.polylines
-            # (draws all rectangles in one call)
-            contours = [
-                np.array(
-                    [
-                        [bbox[0] + shift, bbox[1] + shift],
-                        [bbox[2] - shift, bbox[1] + shift],
-                        [bbox[2] - shift, bbox[3] - shift],
-                        [bbox[0] + shift, bbox[3] - shift],
-                    ],
-                    dtype=np.int32,
-                )
-                for bbox in validated_bboxes
-            ]
+        shift = style.stroke_shift
+        x1, y1 = boxes[:, 0] + shift, boxes[:, 1] + shift
+        x2, y2 = boxes[:, 2] - shift, boxes[:, 3] - shift
+        # Convert bboxes to (N, 4, 2) contours for cv2.polylines
+        contours = np.stack(
+            [
+                np.stack([x1, y1], axis=1),
+                np.stack([x2, y1], axis=1),
+                np.stack([x2, y2], axis=1),
+                np.stack([x1, y2], axis=1),
+            ],
+            axis=1,
+        )
+        # cv2.polylines batches only a single color, so draw each run of
+        # consecutive boxes sharing a color in one call; runs keep input order,
+        # so overlapping boxes stack as if drawn one by one
+        for color, run in _color_runs(colors):
             cv2.polylines(
-                output, contours, isClosed=True, color=colors[0], thickness=thickness
+                output,
+                contours[run],
+                isClosed=True,
+                color=_frame_color(color, output),
+                thickness=style.thickness,
             )
     else:
         # For opaque rectangles: draw all filled rectangles on one overlay,
-        # then do a single alpha blend
-        overlay = img.copy()
-        for bbox, color in zip(validated_bboxes, colors, strict=True):
+        # then do a single alpha blend. Fills stay per box: cv2.fillPoly with
+        # several polygons XORs their overlaps. Only the region the boxes
+        # cover is blended.
+        roi = _points_roi(boxes.reshape(-1, 2), output.shape)
+        if roi is None:
+            return
+        x0, y0, x1, y1 = roi
+        region = output[y0:y1, x0:x1]
+        overlay = region.copy()
+        for bbox, color in zip(
+            (boxes - (x0, y0, x0, y0)).tolist(),
+            _frame_colors(colors, output).tolist(),
+            strict=True,
+        ):
             cv2.rectangle(overlay, (bbox[0], bbox[1]), (bbox[2], bbox[3]), color, -1)
-        cv2.addWeighted(overlay, alpha, output, 1 - alpha, 0, output)
-
-    return output
+        cv2.addWeighted(overlay, style.alpha, region, 1 - style.alpha, 0, region)
 
 
 # Aliases for preferred naming
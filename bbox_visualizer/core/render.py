@@ -0,0 +1,454 @@
+"""Functions for rendering annotated frames straight to encoded image bytes."""
+
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import cast
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from ._utils import _as_array, _check_and_modify_bboxes
+from .labels import _draw_labels
+from .rectangle import _box_colors, _draw_rectangles, _is_per_box_color
+from .styles import BoxStyle, LabelStyle
+
+# One scratch frame per thread: annotating never touches the caller's image and
+# never allocates a frame once the buffer has been sized for the stream
+_local = threading.local()
+
+
+def _frame_buffer(img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Return this thread's scratch frame, filled with a copy of ``img``."""
+    buffer = getattr(_local, "frame", None)
+    if buffer is None or buffer.shape != img.shape or buffer.dtype != img.dtype:
+        buffer = np.empty_like(img)
+        _local.frame = buffer
+    np.copyto(buffer, img)
+    return buffer
+
+
+def _annotate(
+    frame: NDArray[np.uint8],
+    bboxes: Sequence[Sequence[float]],
+    labels: list[str] | None,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer],
+    box_style: BoxStyle,
+    label_style: LabelStyle,
+) -> None:
+    """Draw boxes and optional labels onto ``frame`` in place."""
+    bboxes = _as_array(bboxes)
+    # len() instead of truthiness: numpy arrays raise on ambiguous bool()
+    if bboxes is None or len(bboxes) == 0:
+        raise ValueError("List of bounding boxes cannot be empty")
+    if labels is not None and len(labels) != len(bboxes):
+        raise ValueError("Number of bounding boxes must match number of labels")
+
+    colors = _box_colors(bbox_color, box_style, len(bboxes))
+    converted_bboxes = _check_and_modify_bboxes(
+        bboxes, frame.shape, box_style.bbox_format
+    )
+
+    _draw_rectangles(frame, converted_bboxes, colors, box_style)
+    if labels is not None:
+        _draw_labels(frame, labels, converted_bboxes, label_style)
+
+
+def _render(
+    img: NDArray[np.uint8],
+    bboxes: Sequence[Sequence[float]],
+    labels: list[str] | None,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer],
+    box_style: BoxStyle,
+    label_style: LabelStyle,
+) -> NDArray[np.uint8]:
+    """Annotate ``img`` into this thread's scratch frame and return the frame."""
+    frame = _frame_buffer(img)
+    _annotate(frame, bboxes, labels, bbox_color, box_style, label_style)
+    return frame
+
+
+def _encode(extension: str, frame: NDArray[np.integer], params: list[int]) -> bytes:
+    """Encode ``frame`` with ``cv2.imencode``, raising if the encoder fails."""
+    ok, encoded = cv2.imencode(extension, frame, params)
+    if not ok:
+        raise ValueError(f"Could not encode the frame as {extension}")
+    # imencode returns a fresh array, which bytes cannot wrap without copying;
+    # the copy is of the compressed data only, a small fraction of the frame
+    return encoded.tobytes()
+
+
+def _styles(
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer],
+    thickness: int,
+    label_size: float,
+    label_thickness: int,
+    text_bg_color: tuple[int, int, int],
+    text_color: tuple[int, int, int],
+    top: bool,
+    bbox_format: str,
+    box_style: BoxStyle | None,
+    label_style: LabelStyle | None,
+) -> tuple[BoxStyle, LabelStyle]:
+    """Build the box and label styles that were not passed in."""
+    if box_style is None:
+        single_color = (
+            (255, 255, 255)
+            if _is_per_box_color(bbox_color)
+            else cast("tuple[int, int, int]", bbox_color)
+        )
+        box_style = BoxStyle(single_color, thickness, bbox_format=bbox_format)
+    if label_style is None:
+        label_style = LabelStyle(
+            label_size,
+            label_thickness,
+            True,
+            text_bg_color,
+            text_color,
+            top,
+            box_style.bbox_format,
+        )
+    return box_style, label_style
+
+
+def annotate_in_place(
+    img: NDArray[np.uint8],
+    bboxes: Sequence[Sequence[float]],
+    labels: list[str] | None = None,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer] = (255, 255, 255),
+    thickness: int = 3,
+    label_size: float = 1,
+    label_thickness: int = 2,
+    text_bg_color: tuple[int, int, int] = (255, 255, 255),
+    text_color: tuple[int, int, int] = (0, 0, 0),
+    top: bool = True,
+    bbox_format: str = "voc",
+    box_style: BoxStyle | None = None,
+    label_style: LabelStyle | None = None,
+    offset: tuple[int, int] = (0, 0),
+) -> None:
+    """Draw boxes (and optional labels) directly onto ``img``.
+
+    Unlike the other drawing functions, this one modifies ``img`` in place
+    and copies nothing, so it can annotate frames held in buffers the caller
+    owns, such as shared memory or a video decoder's output array.
+
+    ``img`` may be a view into a larger buffer, e.g. one camera's window
+    ``panorama[y0:y1, x0:x1]`` of a stitched frame: pass ``offset=(x0, y0)``
+    to give the boxes in the larger frame's coordinates. Boxes outside the
+    view are skipped. Views with strided rows are drawn into directly; views
+    OpenCV cannot address (strided columns or channels, flipped rows) are
+    drawn into a contiguous copy that is then written back through the view.
+
+    Args:
+        img: Image array to draw on; modified in place
+        bboxes: List of bounding boxes, each in ``bbox_format`` (default VOC:
+            [x_min, y_min, x_max, y_max])
+        labels: Optional list of text labels, one per box (default: None)
+        bbox_color: BGR color tuple applied to all boxes, a sequence of one
+            color per box, or an integer array of shape (N, 3) (default: white)
+        thickness: Box line thickness in pixels (default: 3)
+        label_size: Font size multiplier for labels (default: 1)
+        label_thickness: Text thickness in pixels (default: 2)
+        text_bg_color: BGR color tuple for text backgrounds (default: white)
+        text_color: BGR color tuple for text (default: black)
+        top: If True, place labels above boxes; if False, inside (default: True)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        box_style: Pre-validated :class:`BoxStyle` replacing ``thickness`` and
+            ``bbox_format`` (per-box colors in ``bbox_color`` still apply)
+        label_style: Pre-validated :class:`LabelStyle` replacing the label
+            arguments above
+        offset: (x, y) position of ``img`` in the frame the VOC or COCO
+            ``bboxes`` refer to (default: (0, 0))
+
+    Raises:
+        ValueError: If the inputs are invalid, or ``offset`` is combined with
+            normalized YOLO boxes
+
+    """
+    box_style, label_style = _styles(
+        bbox_color,
+        thickness,
+        label_size,
+        label_thickness,
+        text_bg_color,
+        text_color,
+        top,
+        bbox_format,
+        box_style,
+        label_style,
+    )
+    if tuple(offset) != (0, 0):
+        bboxes, labels, bbox_color = _to_view(
+            bboxes, labels, bbox_color, offset, img.shape, box_style
+        )
+        if len(bboxes) == 0:
+            return
+    if _cv2_addressable(img):
+        _annotate(img, bboxes, labels, bbox_color, box_style, label_style)
+        return
+    frame = np.ascontiguousarray(img)
+    _annotate(frame, bboxes, labels, bbox_color, box_style, label_style)
+    img[...] = frame
+
+
+def _cv2_addressable(img: NDArray[np.integer]) -> bool:
+    """Return True if OpenCV can draw into ``img`` without copying it.
+
+    A ``cv::Mat`` may skip bytes between rows but not between pixels or
+    channels, and its rows must run forward.
+    """
+    pixel = img.itemsize * (img.shape[2] if img.ndim == 3 else 1)
+    if img.ndim == 3 and img.strides[2] != img.itemsize:
+        return False
+    return img.strides[1] == pixel and img.strides[0] >= pixel * img.shape[1]
+
+
+def _to_view(
+    bboxes: Sequence[Sequence[float]],
+    labels: list[str] | None,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer],
+    offset: tuple[int, int],
+    img_size: tuple[int, ...],
+    box_style: BoxStyle,
+) -> tuple[
+    NDArray[np.float64],
+    list[str] | None,
+    tuple[int, int, int] | Sequence[tuple[int, int, int]] | NDArray[np.integer],
+]:
+    """Shift boxes from the parent frame into a view and drop those outside it.
+
+    Returns:
+        (bboxes, labels, bbox_color) for the boxes that overlap the view,
+        with the boxes in view coordinates and ``bbox_format`` unchanged
+
+    """
+    if box_style.bbox_format == "yolo":
+        raise ValueError("offset needs pixel coordinates; YOLO boxes are normalized")
+    bboxes = _as_array(bboxes)
+    # len() instead of truthiness: numpy arrays raise on ambiguous bool()
+    if bboxes is None or len(bboxes) == 0:
+        raise ValueError("List of bounding boxes cannot be empty")
+    if labels is not None and len(labels) != len(bboxes):
+        raise ValueError("Number of bounding boxes must match number of labels")
+    boxes = np.array(bboxes, dtype=np.float64).reshape(-1, 4)
+    x, y = offset
+    boxes[:, :2] -= (x, y)
+    if box_style.bbox_format == "voc":
+        boxes[:, 2:] -= (x, y)
+        x2, y2 = boxes[:, 2], boxes[:, 3]
+    else:  # coco
+        x2, y2 = boxes[:, 0] + boxes[:, 2], boxes[:, 1] + boxes[:, 3]
+    inside = (
+        (x2 >= 0)
+        & (y2 >= 0)
+        & (boxes[:, 0] < img_size[1])
+        & (boxes[:, 1] < img_size[0])
+    )
+    keep = np.flatnonzero(inside)
+    if labels is not None:
+        labels = [labels[i] for i in keep]
+    if _is_per_box_color(bbox_color):
+        bbox_color = _box_colors(bbox_color, box_style, len(boxes))[keep]
+    return boxes[keep], labels, bbox_color
+
+
+def render_to_jpeg(
+    img: NDArray[np.uint8],
+    bboxes: Sequence[Sequence[float]],
+    labels: list[str] | None = None,
+    quality: int = 95,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer] = (255, 255, 255),
+    thickness: int = 3,
+    label_size: float = 1,
+    label_thickness: int = 2,
+    text_bg_color: tuple[int, int, int] = (255, 255, 255),
+    text_color: tuple[int, int, int] = (0, 0, 0),
+    top: bool = True,
+    bbox_format: str = "voc",
+    box_style: BoxStyle | None = None,
+    label_style: LabelStyle | None = None,
+) -> bytes:
+    """Draw boxes (and optional labels) and encode the result as JPEG.
+
+    The annotations are drawn into a scratch frame that is reused by every
+    call on the same thread, so serving a stream of equally sized frames only
+    allocates the encoded output.
+
+    Args:
+        img: Input image array; 8-bit, as JPEG has no 16-bit mode (use
+            :func:`render_to_png` for 16-bit frames)
+        bboxes: List of bounding boxes, each in ``bbox_format`` (default VOC:
+            [x_min, y_min, x_max, y_max])
+        labels: Optional list of text labels, one per box (default: None)
+        quality: JPEG quality from 0 to 100 (default: 95)
+        bbox_color: BGR color tuple applied to all boxes, a sequence of one
+            color per box, or an integer array of shape (N, 3) (default: white)
+        thickness: Box line thickness in pixels (default: 3)
+        label_size: Font size multiplier for labels (default: 1)
+        label_thickness: Text thickness in pixels (default: 2)
+        text_bg_color: BGR color tuple for text backgrounds (default: white)
+        text_color: BGR color tuple for text (default: black)
+        top: If True, place labels above boxes; if False, inside (default: True)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        box_style: Pre-validated :class:`BoxStyle` replacing ``thickness`` and
+            ``bbox_format`` (per-box colors in ``bbox_color`` still apply)
+        label_style: Pre-validated :class:`LabelStyle` replacing the label
+            arguments above
+
+    Returns:
+        The encoded JPEG; the input image is not modified
+
+    Raises:
+        ValueError: If ``img`` is not 8-bit, ``quality`` is outside [0, 100],
+            the inputs are invalid or the encoder fails
+
+    """
+    if img.dtype != np.uint8:
+        # cv2.imencode would silently truncate the frame to 8 bits
+        raise ValueError(
+            f"JPEG needs 8-bit frames, got {img.dtype}; use render_to_png instead"
+        )
+    if not 0 <= quality <= 100:
+        raise ValueError("JPEG quality must be between 0 and 100")
+    box_style, label_style = _styles(
+        bbox_color,
+        thickness,
+        label_size,
+        label_thickness,
+        text_bg_color,
+        text_color,
+        top,
+        bbox_format,
+        box_style,
+        label_style,
+    )
+    frame = _render(img, bboxes, labels, bbox_color, box_style, label_style)
+    return _encode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+
+
+def render_to_png(
+    img: NDArray[np.uint8],
+    bboxes: Sequence[Sequence[float]],
+    labels: list[str] | None = None,
+    compression: int = 3,
+    bbox_color: tuple[int, int, int]
+    | Sequence[tuple[int, int, int]]
+    | NDArray[np.integer] = (255, 255, 255),
+    thickness: int = 3,
+    label_size: float = 1,
+    label_thickness: int = 2,
+    text_bg_color: tuple[int, int, int] = (255, 255, 255),
+    text_color: tuple[int, int, int] = (0, 0, 0),
+    top: bool = True,
+    bbox_format: str = "voc",
+    box_style: BoxStyle | None = None,
+    label_style: LabelStyle | None = None,
+) -> bytes:
+    """Draw boxes (and optional labels) and encode the result as PNG.
+
+    Uses the same per-thread scratch frame as :func:`render_to_jpeg`.
+
+    Args:
+        img: Input image array
+        bboxes: List of bounding boxes, each in ``bbox_format`` (default VOC:
+            [x_min, y_min, x_max, y_max])
+        labels: Optional list of text labels, one per box (default: None)
+        compression: PNG compression level from 0 (fastest) to 9 (default: 3)
+        bbox_color: BGR color tuple applied to all boxes, a sequence of one
+            color per box, or an integer array of shape (N, 3) (default: white)
+        thickness: Box line thickness in pixels (default: 3)
+        label_size: Font size multiplier for labels (default: 1)
+        label_thickness: Text thickness in pixels (default: 2)
+        text_bg_color: BGR color tuple for text backgrounds (default: white)
+        text_color: BGR color tuple for text (default: black)
+        top: If True, place labels above boxes; if False, inside (default: True)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        box_style: Pre-validated :class:`BoxStyle` replacing ``thickness`` and
+            ``bbox_format`` (per-box colors in ``bbox_color`` still apply)
+        label_style: Pre-validated :class:`LabelStyle` replacing the label
+            arguments above
+
+    Returns:
+        The encoded PNG; the input image is not modified
+
+    Raises:
+        ValueError: If ``compression`` is outside [0, 9], the inputs are
+            invalid or the encoder fails
+
+    """
+    if not 0 <= compression <= 9:
+        raise ValueError("PNG compression must be between 0 and 9")
+    box_style, label_style = _styles(
+        bbox_color,
+        thickness,
+        label_size,
+        label_thickness,
+        text_bg_color,
+        text_color,
+        top,
+        bbox_format,
+        box_style,
+        label_style,
+    )
+    frame = _render(img, bboxes, labels, bbox_color, box_style, label_style)
+    return _encode(".png", frame, [cv2.IMWRITE_PNG_COMPRESSION, compression])
+
+
+class RenderPool:
+    """Thread pool that renders and encodes frames off the calling thread.
+
+    cv2 releases the GIL while drawing and encoding, so a few workers keep
+    several cores busy. Each worker owns its own scratch frame.
+
+    Example:
+        >>> with RenderPool(max_workers=4) as pool:  # doctest: +SKIP
+        ...     future = pool.render_to_jpeg(frame, bboxes, labels, quality=80)
+        ...     body = future.result()
+
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        """Start the pool.
+
+        Args:
+            max_workers: Number of worker threads (default: chosen by
+                :class:`concurrent.futures.ThreadPoolExecutor`)
+
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bbv-render"
+        )
+
+    def render_to_jpeg(self, *args, **kwargs) -> "Future[bytes]":
+        """Submit a :func:`render_to_jpeg` call and return its future."""
+        return self._executor.submit(render_to_jpeg, *args, **kwargs)
+
+    def render_to_png(self, *args, **kwargs) -> "Future[bytes]":
+        """Submit a :func:`render_to_png` call and return its future."""
+        return self._executor.submit(render_to_png, *args, **kwargs)
+
+    def close(self) -> None:
+        """Wait for pending renders and stop the workers."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "RenderPool":
+        """Return the pool for use in a ``with`` block."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the pool when leaving a ``with`` block."""
+        self.close()
@@ -0,0 +1,211 @@
+"""Process pool that annotates frames held in shared memory."""
+
+import queue
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from .render import annotate_in_place
+
+# Per-worker view of the pool's frame slots, set up once by _attach_worker
+_worker: dict[str, Any] = {}
+
+
+def _attach_worker(name: str, shape: tuple[int, ...], dtype: str) -> None:
+    """Map the pool's shared memory into this worker process."""
+    memory = shared_memory.SharedMemory(name=name)
+    # Keep the SharedMemory object alive for as long as the view is used
+    _worker["memory"] = memory
+    _worker["frames"] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _free_memory(memory: shared_memory.SharedMemory) -> None:
+    """Unlink and unmap a pool's shared memory block."""
+    memory.unlink()
+    try:
+        memory.close()
+    except BufferError:
+        # A caller still holds a frame view; the mapping goes with it
+        pass
+
+
+def _annotate_slot(slot: int, args: tuple, kwargs: dict[str, Any]) -> int:
+    """Annotate frame slot ``slot`` in place and return the slot index."""
+    annotate_in_place(_worker["frames"][slot], *args, **kwargs)
+    return slot
+
+
+class SharedRenderPool:
+    """Process pool that annotates frames in shared memory without copying them.
+
+    Frames live in a ring of slots in one :mod:`multiprocessing.shared_memory`
+    block mapped into every worker. Workers draw with
+    :func:`annotate_in_place` directly into the slot, so only the detections
+    and the slot index are pickled; pixel data never crosses a process
+    boundary. Unlike :class:`RenderPool`, the Python validation and labelling
+    code runs outside the caller's GIL.
+
+    A slot is taken with :meth:`acquire` (or by :meth:`submit`), filled
+    through the array returned by :meth:`frame`, annotated, read back, and
+    handed back with :meth:`release`.
+
+    Example:
+        >>> with SharedRenderPool(frame.shape, num_slots=8) as pool:  # doctest: +SKIP
+        ...     slot = pool.submit(frame, bboxes, labels).result()
+        ...     body = cv2.imencode(".jpg", pool.frame(slot))[1].tobytes()
+        ...     pool.release(slot)
+
+    """
+
+    def __init__(
+        self,
+        frame_shape: tuple[int, ...],
+        num_slots: int = 4,
+        max_workers: int | None = None,
+        dtype: DTypeLike = np.uint8,
+    ) -> None:
+        """Allocate the frame slots and start the workers.
+
+        Args:
+            frame_shape: Shape of every frame, e.g. ``(1080, 1920, 3)``
+            num_slots: Number of frames that can be in flight at once (default: 4)
+            max_workers: Number of worker processes (default: chosen by
+                :class:`concurrent.futures.ProcessPoolExecutor`)
+            dtype: Pixel type of every frame, ``np.uint8`` or ``np.uint16``
+                (default: ``np.uint8``)
+
+        Raises:
+            ValueError: If ``num_slots`` is less than 1, ``frame_shape`` is
+                empty or ``dtype`` is neither 8-bit nor 16-bit
+
+        """
+        if num_slots < 1:
+            raise ValueError("num_slots must be at least 1")
+        dtype = np.dtype(dtype)
+        if dtype not in (np.uint8, np.uint16):
+            raise ValueError(f"Frames must be 8-bit or 16-bit, got {dtype}")
+        shape = (num_slots, *(int(size) for size in frame_shape))
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if nbytes == 0:
+            raise ValueError("Frame shape cannot be empty")
+
+        self._memory = shared_memory.SharedMemory(create=True, size=nbytes)
+        # Unlink the block even if close() is never called
+        self._free_memory = weakref.finalize(self, _free_memory, self._memory)
+        self._frames: NDArray[np.integer] | None = np.ndarray(
+            shape, dtype=dtype, buffer=self._memory.buf
+        )
+        self._free: queue.Queue[int] = queue.Queue()
+        for slot in range(num_slots):
+            self._free.put(slot)
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_attach_worker,
+            initargs=(self._memory.name, shape, dtype.str),
+        )
+
+    @property
+    def num_slots(self) -> int:
+        """Number of frame slots in the ring."""
+        return len(self._frames_or_raise())
+
+    def acquire(self, timeout: float | None = None) -> int:
+        """Take a free slot, waiting until one is released if needed.
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely (default: None)
+
+        Returns:
+            Index of the slot, now owned by the caller
+
+        Raises:
+            TimeoutError: If no slot was released within ``timeout``
+
+        """
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No frame slot was released in time") from None
+
+    def release(self, slot: int) -> None:
+        """Hand a slot back to the pool once its frame has been consumed."""
+        self._free.put(slot)
+
+    def frame(self, slot: int) -> NDArray[np.integer]:
+        """Return the shared-memory array of a slot, for reading or writing.
+
+        The view is only valid until :meth:`close`; drop it before closing.
+        """
+        return self._frames_or_raise()[slot]
+
+    def annotate(self, slot: int, *args, **kwargs) -> "Future[int]":
+        """Annotate the frame already in ``slot`` on a worker process.
+
+        Takes the same arguments as :func:`annotate_in_place`, minus ``img``.
+
+        Returns:
+            Future resolving to ``slot`` once the frame has been annotated
+
+        """
+        return self._executor.submit(_annotate_slot, slot, args, kwargs)
+
+    def submit(self, img: NDArray[np.integer], *args, **kwargs) -> "Future[int]":
+        """Copy ``img`` into a free slot and annotate it on a worker process.
+
+        Blocks until a slot is free. Takes the same arguments as
+        :func:`annotate_in_place`. The caller owns the returned slot and must
+        :meth:`release` it after reading the frame. If annotating fails, the
+        pool takes the slot back itself.
+
+        Returns:
+            Future resolving to the slot holding the annotated frame, or
+            raising the worker's error
+
+        Raises:
+            ValueError: If ``img`` does not have the shape and dtype of the
+                pool's frames
+
+        """
+        frames = self._frames_or_raise()
+        if img.shape != frames.shape[1:] or img.dtype != frames.dtype:
+            raise ValueError(
+                f"Frame of shape {img.shape} and dtype {img.dtype} does not fit "
+                f"slots of shape {frames.shape[1:]} and dtype {frames.dtype}"
+            )
+        slot = self.acquire()
+        np.copyto(self.frame(slot), img)
+        future = self.annotate(slot, *args, **kwargs)
+
+        def reclaim(future: "Future[int]") -> None:
+            # The caller never learns the slot of a failed frame
+            if future.cancelled() or future.exception() is not None:
+                self.release(slot)
+
+        future.add_done_callback(reclaim)
+        return future
+
+    def close(self) -> None:
+        """Wait for pending frames, stop the workers and free the shared memory."""
+        if self._frames is None:
+            return
+        self._executor.shutdown(wait=True)
+        self._frames = None
+        self._free_memory()
+
+    def _frames_or_raise(self) -> NDArray[np.integer]:
+        """Return the slot array, or raise if the pool has been closed."""
+        if self._frames is None:
+            raise ValueError("SharedRenderPool is closed")
+        return self._frames
+
+    def __enter__(self) -> "SharedRenderPool":
+        """Return the pool for use in a ``with`` block."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the pool when leaving a ``with`` block."""
+        self.close()
@@ -0,0 +1,138 @@
+"""Pre-validated drawing styles.
+
+Every drawing function validates its color and format arguments on each call.
+A style object runs that validation once, when it is created, and caches the
+values derived from it; passing ``style=`` to a drawing function skips the
+per-call validation entirely.
+"""
+
+from dataclasses import dataclass, field
+
+from ._utils import _get_ink_metrics, _validate_bbox_format, _validate_color
+
+
+def _stroke_shift(thickness: int) -> int:
+    """Return how far to move a stroke inward so its outer edge lies on the box.
+
+    cv2 centers strokes on the given coordinates, and its measured stroke
+    half-width is (t+1)//2 for t > 1, not t//2.
+    """
+    return (thickness + 1) // 2 if thickness > 1 else 0
+
+
+@dataclass(frozen=True)
+class BoxStyle:
+    """Style for :func:`draw_rectangle` and :func:`draw_multiple_rectangles`.
+
+    Attributes:
+        color: BGR color tuple for the box (default: white)
+        thickness: Line thickness in pixels (default: 3)
+        is_opaque: If True, draws filled rectangles with transparency (default: False)
+        alpha: Transparency level for filled rectangles (default: 0.5)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        stroke_shift: Derived; how far outlines are drawn inside the box
+
+    """
+
+    color: tuple[int, int, int] = (255, 255, 255)
+    thickness: int = 3
+    is_opaque: bool = False
+    alpha: float = 0.5
+    bbox_format: str = "voc"
+    stroke_shift: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Validate the style and cache its derived values."""
+        # Frozen: store normalized and derived values via object.__setattr__
+        object.__setattr__(self, "color", _validate_color(self.color))
+        object.__setattr__(self, "bbox_format", _validate_bbox_format(self.bbox_format))
+        object.__setattr__(self, "stroke_shift", _stroke_shift(self.thickness))
+
+
+@dataclass(frozen=True)
+class LabelStyle:
+    """Style for :func:`add_label`, :func:`add_T_label` and their batch variants.
+
+    Attributes:
+        size: Font size multiplier (default: 1)
+        thickness: Text thickness in pixels (default: 2)
+        draw_bg: Whether to draw background rectangle (default: True)
+        text_bg_color: BGR color tuple for text background (default: white)
+        text_color: BGR color tuple for text (default: black)
+        top: If True, place label above box; if False, inside (default: True).
+            T labels ignore it.
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        padding: Padding around the text in pixels (default: 5)
+
+    """
+
+    size: float = 1
+    thickness: int = 2
+    draw_bg: bool = True
+    text_bg_color: tuple[int, int, int] = (255, 255, 255)
+    text_color: tuple[int, int, int] = (0, 0, 0)
+    top: bool = True
+    bbox_format: str = "voc"
+    padding: int = 5
+
+    def __post_init__(self) -> None:
+        """Validate the style and normalize its colors and format."""
+        object.__setattr__(self, "text_bg_color", _validate_color(self.text_bg_color))
+        object.__setattr__(self, "text_color", _validate_color(self.text_color))
+        object.__setattr__(self, "bbox_format", _validate_bbox_format(self.bbox_format))
+
+    def metrics(self, label: str) -> tuple[int, int, int]:
+        """Return the cached (width, ascent, descent) ink metrics of ``label``."""
+        return _get_ink_metrics(label, self.size, self.thickness)
+
+
+@dataclass(frozen=True)
+class FlagStyle:
+    """Style for :func:`draw_flag_with_label` and its batch variant.
+
+    Attributes:
+        size: Font size multiplier (default: 1)
+        thickness: Text thickness in pixels (default: 2)
+        write_label: Whether to draw the text label (default: True)
+        line_color: BGR color tuple for the vertical line (default: white)
+        text_bg_color: BGR color tuple for text background (default: white)
+        text_color: BGR color tuple for text (default: black)
+        bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+        padding: Padding around the text in pixels (default: 5)
+        box_style: Derived; box drawn when the flag falls back to a normal label
+        label_style: Derived; label drawn when the flag falls back
+
+    """
+
+    size: float = 1
+    thickness: int = 2
+    write_label: bool = True
+    line_color: tuple[int, int, int] = (255, 255, 255)
+    text_bg_color: tuple[int, int, int] = (255, 255, 255)
+    text_color: tuple[int, int, int] = (0, 0, 0)
+    bbox_format: str = "voc"
+    padding: int = 5
+    box_style: BoxStyle = field(init=False, repr=False, compare=False)
+    label_style: LabelStyle = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Validate the style and cache the styles used by the fallback."""
+        label_style = LabelStyle(
+            size=self.size,
+            thickness=self.thickness,
+            text_bg_color=self.text_bg_color,
+            text_color=self.text_color,
+            bbox_format=self.bbox_format,
+            padding=self.padding,
+        )
+        box_style = BoxStyle(color=self.line_color, bbox_format=self.bbox_format)
+        object.__setattr__(self, "line_color", box_style.color)
+        object.__setattr__(self, "text_bg_color", label_style.text_bg_color)
+        object.__setattr__(self, "text_color", label_style.text_color)
+        object.__setattr__(self, "bbox_format", label_style.bbox_format)
+        object.__setattr__(self, "box_style", box_style)
+        object.__setattr__(self, "label_style", label_style)
+
+    def metrics(self, label: str) -> tuple[int, int, int]:
+        """Return the cached (width, ascent, descent) ink metrics of ``label``."""
+        return _get_ink_metrics(label, self.size, self.thickness)
@@ -0,0 +1,232 @@
+"""Fading motion trails for tracked objects."""
+
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from ._utils import (
+    _as_array,
+    _check_and_modify_bboxes,
+    _frame_color,
+    _group_by_color,
+    _points_roi,
+    _validate_color,
+)
+from .palette import Palette
+
+# last_seen value of a free slot; sorts before every real frame number
+_FREE = np.iinfo(np.int64).min
+
+
+class TrackTrails:
+    """Draw each track's recent box centers as a polyline that fades with age.
+
+    Centers are stored in one preallocated ``(max_tracks, history, 2)`` ring
+    buffer, so memory stays fixed however many track IDs a video produces.
+    Tracks not updated for ``max_age`` frames are evicted, and when every slot
+    is taken a new track replaces the least recently seen one.
+
+    Drawing groups the trail segments of all tracks by fade level (and by
+    color, when coloring by track ID), issuing one ``cv2.polylines`` call per
+    group followed by a single blend.
+
+    Example:
+        >>> trails = TrackTrails(history=20)
+        >>> for frame, (ids, boxes) in zip(frames, tracks):
+        ...     trails.update(ids, boxes, frame.shape)
+        ...     frame = trails.draw(frame)
+
+    """
+
+    def __init__(
+        self,
+        history: int = 30,
+        max_tracks: int = 256,
+        max_age: int = 30,
+        color: tuple[int, int, int] | Palette = (0, 255, 255),
+        thickness: int = 2,
+        fade_levels: int = 4,
+    ) -> None:
+        """Preallocate the trail buffers.
+
+        Args:
+            history: Number of recent centers kept per track (default: 30)
+            max_tracks: Number of tracks kept at once (default: 256)
+            max_age: Frames a track may go without updates before it is
+                evicted (default: 30)
+            color: BGR color tuple for all trails, or a :class:`Palette` to
+                color each trail by its track ID, wrapping around (default: yellow)
+            thickness: Trail thickness in pixels (default: 2)
+            fade_levels: Number of opacity steps from the newest to the oldest
+                segment (default: 4)
+
+        Raises:
+            ValueError: If ``history`` is less than 2, ``max_tracks`` or
+                ``fade_levels`` is less than 1, or ``color`` is invalid
+
+        """
+        if history < 2:
+            raise ValueError("Trail history must hold at least 2 centers")
+        if max_tracks < 1:
+            raise ValueError("max_tracks must be at least 1")
+        if fade_levels < 1:
+            raise ValueError("fade_levels must be at least 1")
+        self.history = history
+        self.max_tracks = max_tracks
+        self.max_age = max_age
+        self.color = color if isinstance(color, Palette) else _validate_color(color)
+        self.thickness = thickness
+        self.fade_levels = fade_levels
+
+        self._points = np.zeros((max_tracks, history, 2), dtype=np.int32)
+        self._track_ids = np.zeros(max_tracks, dtype=np.int64)
+        self._heads = np.zeros(max_tracks, dtype=np.intp)  # next write position
+        self._counts = np.zeros(max_tracks, dtype=np.intp)
+        self._last_seen = np.full(max_tracks, _FREE, dtype=np.int64)
+        self._slots: dict[int, int] = {}
+        self._frame = 0
+
+    def __len__(self) -> int:
+        """Return the number of live tracks."""
+        return len(self._slots)
+
+    def reset(self) -> None:
+        """Forget all tracks, e.g. on a scene cut."""
+        self._counts[:] = 0
+        self._last_seen[:] = _FREE
+        self._slots.clear()
+
+    def update(
+        self,
+        track_ids: Sequence[int] | NDArray[np.integer],
+        bboxes: Sequence[Sequence[float]],
+        img_size: tuple[int, ...],
+        bbox_format: str = "voc",
+    ) -> None:
+        """Append the centers of this frame's boxes to their tracks.
+
+        Call once per frame, even with no boxes, so stale tracks age out.
+
+        Args:
+            track_ids: Integer track ID of each box
+            bboxes: List of bounding boxes, each in ``bbox_format`` (default
+                VOC: [x_min, y_min, x_max, y_max])
+            img_size: Tuple of (height, width, ...), e.g. ``img.shape``
+            bbox_format: Input bbox format, one of "voc", "coco", "yolo" (default: "voc")
+
+        Raises:
+            ValueError: If the IDs and boxes differ in number, an ID repeats,
+                or the frame has more tracks than ``max_tracks``
+
+        """
+        ids = np.asarray(_as_array(track_ids), dtype=np.int64).reshape(-1)
+        bboxes = _as_array(bboxes)
+        if len(ids) != len(bboxes):
+            raise ValueError("Number of track IDs must match number of bounding boxes")
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("Track IDs must be unique within a frame")
+        if len(ids) > self.max_tracks:
+            raise ValueError(
+                f"Frame has {len(ids)} tracks but max_tracks is {self.max_tracks}"
+            )
+        self._frame += 1
+        self._evict_stale()
+
+        slots = np.array(
+            [self._slots.get(track_id, -1) for track_id in ids.tolist()], dtype=np.intp
+        )
+        known = slots >= 0
+        self._last_seen[slots[known]] = self._frame
+        new = np.flatnonzero(~known)
+        if new.size:
+            # Free slots sort first, then the least recently seen tracks;
+            # tracks seen this frame are never taken
+            taken = np.argsort(self._last_seen, kind="stable")[: new.size]
+            for slot in taken[self._last_seen[taken] != _FREE].tolist():
+                del self._slots[int(self._track_ids[slot])]
+            slots[new] = taken
+            self._track_ids[taken] = ids[new]
+            self._heads[taken] = 0
+            self._counts[taken] = 0
+            self._last_seen[taken] = self._frame
+            self._slots.update(zip(ids[new].tolist(), taken.tolist(), strict=True))
+        if not len(ids):
+            return
+
+        boxes = _check_and_modify_bboxes(bboxes, img_size, bbox_format)
+        self._points[slots, self._heads[slots]] = (boxes[:, :2] + boxes[:, 2:]) // 2
+        self._heads[slots] = (self._heads[slots] + 1) % self.history
+        self._counts[slots] = np.minimum(self._counts[slots] + 1, self.history)
+
+    def draw(self, img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        """Draw the trails of all live tracks.
+
+        Args:
+            img: Input image array
+
+        Returns:
+            New image with the trails drawn; the input image is not modified
+
+        """
+        output = img.copy()
+        slots = np.flatnonzero(self._counts >= 2)
+        if not slots.size:
+            return output
+
+        # Newest center first: age k of every track sits at column k
+        ages = np.arange(self.history)
+        order = (self._heads[slots, None] - 1 - ages) % self.history
+        points = self._points[slots[:, None], order]  # (T, history, 2)
+        stored = ages < self._counts[slots, None]
+        segments = np.stack([points[:, :-1], points[:, 1:]], axis=2)
+        valid = stored[:, 1:]  # segment k joins the centers aged k and k + 1
+        levels = ages[:-1] * self.fade_levels // (self.history - 1)
+
+        roi = _points_roi(points[stored], output.shape)
+        if roi is None:
+            return output
+        # Pad by the stroke width so strokes are not cut at the region edge
+        pad = self.thickness
+        x0, y0 = max(roi[0] - pad, 0), max(roi[1] - pad, 0)
+        x1, y1 = min(roi[2] + pad, output.shape[1]), min(roi[3] + pad, output.shape[0])
+        segments -= np.array([x0, y0], dtype=np.int32)
+        region = output[y0:y1, x0:x1]
+        layer = np.zeros_like(region)
+        opacity = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+
+        if isinstance(self.color, Palette):
+            colors = self.color.colors(self._track_ids[slots], wrap=True)
+        else:
+            colors = np.broadcast_to(
+                np.array(self.color, dtype=np.uint8), (len(slots), 3)
+            )
+        groups = _group_by_color(colors)
+        # Oldest level first, so newer segments cover older ones where they meet
+        for level in range(self.fade_levels - 1, -1, -1):
+            level_valid = valid & (levels == level)
+            value = round(255 * (self.fade_levels - level) / self.fade_levels)
+            for color, members in groups:
+                drawn = segments[members][level_valid[members]]
+                if len(drawn):
+                    frame_color = _frame_color(color, output)
+                    cv2.polylines(layer, drawn, False, frame_color, self.thickness)
+                    cv2.polylines(opacity, drawn, False, value, self.thickness)
+
+        covered = opacity > 0
+        alpha = opacity[covered] / 255
+        if region.ndim == 3:
+            alpha = alpha[:, np.newaxis]
+        blended = region[covered] * (1 - alpha) + layer[covered] * alpha
+        region[covered] = np.rint(blended).astype(region.dtype)
+        return output
+
+    def _evict_stale(self) -> None:
+        """Free the slots of tracks not updated for more than ``max_age`` frames."""
+        live = self._last_seen != _FREE
+        stale = np.flatnonzero(live & (self._last_seen < self._frame - self.max_age))
+        for slot in stale.tolist():
+            del self._slots[int(self._track_ids[slot])]
+        self._counts[stale] = 0
+        self._last_seen[stale] = _FREE
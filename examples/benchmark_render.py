@@ -0,0 +1,92 @@
+"""Encode throughput benchmark for bbox-visualizer.
+
+Compares the usual draw -> label -> ``cv2.imencode`` chain against
+``render_to_jpeg`` (per-thread scratch frame) and a ``RenderPool``, reporting
+requests per second at 720p and 1080p.
+
+Run from the repo root:
+    python examples/benchmark_render.py
+"""
+
+import time
+from collections.abc import Callable
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+import bbox_visualizer as bbv
+
+RESOLUTIONS = {"720p": (720, 1280), "1080p": (1080, 1920)}
+NUM_BOXES = 20
+DURATION = 2.0  # seconds per measurement
+WORKERS = 4
+
+
+def detections(height: int, width: int) -> tuple[list[list[int]], list[str]]:
+    """Return a fixed set of boxes spread over the frame."""
+    rng = np.random.default_rng(0)
+    x1 = rng.integers(0, width - 200, NUM_BOXES)
+    y1 = rng.integers(60, height - 200, NUM_BOXES)
+    bboxes = [
+        [int(x), int(y), int(x) + 150, int(y) + 120]
+        for x, y in zip(x1, y1, strict=True)
+    ]
+    return bboxes, [f"person {i}" for i in range(NUM_BOXES)]
+
+
+def rate(fn: Callable[[], object]) -> float:
+    """Call ``fn`` repeatedly for DURATION seconds and return calls per second."""
+    fn()  # warm up caches and scratch buffers
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def pooled_rate(
+    pool: bbv.RenderPool, frame: NDArray[np.uint8], bboxes, labels
+) -> float:
+    """Keep the pool saturated for DURATION seconds and return renders per second."""
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        futures = [
+            pool.render_to_jpeg(frame, bboxes, labels, quality=80)
+            for _ in range(WORKERS * 2)
+        ]
+        for future in futures:
+            future.result()
+        count += len(futures)
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    with bbv.RenderPool(max_workers=WORKERS) as pool:
+        for name, (height, width) in RESOLUTIONS.items():
+            frame = np.random.default_rng(1).integers(
+                0, 256, (height, width, 3), dtype=np.uint8
+            )
+            bboxes, labels = detections(height, width)
+
+            def naive(frame=frame, bboxes=bboxes, labels=labels) -> bytes:
+                img = bbv.draw_multiple_rectangles(frame, bboxes)
+                img = bbv.add_multiple_labels(img, labels, bboxes)
+                return cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 80])[
+                    1
+                ].tobytes()
+
+            def fast(frame=frame, bboxes=bboxes, labels=labels) -> bytes:
+                return bbv.render_to_jpeg(frame, bboxes, labels, quality=80)
+
+            print(f"{name}:")
+            print(f"  draw + imencode     {rate(naive):8.1f} req/s")
+            print(f"  render_to_jpeg      {rate(fast):8.1f} req/s")
+            print(
+                f"  RenderPool({WORKERS})       "
+                f"{pooled_rate(pool, frame, bboxes, labels):8.1f} req/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Multi-process annotation benchmark for bbox-visualizer.
+
+Compares a ``ProcessPoolExecutor`` that pickles every frame to the worker and
+the annotated frame back against ``SharedRenderPool``, whose workers draw into
+shared-memory frame slots so only detections and slot indices are pickled.
+Reports frames per second at 720p and 1080p.
+
+Run from the repo root:
+    python examples/benchmark_shared.py
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.typing import NDArray
+
+import bbox_visualizer as bbv
+
+RESOLUTIONS = {"720p": (720, 1280), "1080p": (1080, 1920)}
+NUM_BOXES = 50
+DURATION = 3.0  # seconds per measurement
+WORKERS = os.cpu_count() or 1
+
+
+def detections(height: int, width: int) -> tuple[list[list[int]], list[str]]:
+    """Return a fixed set of boxes spread over the frame."""
+    rng = np.random.default_rng(0)
+    x1 = rng.integers(0, width - 200, NUM_BOXES)
+    y1 = rng.integers(60, height - 200, NUM_BOXES)
+    bboxes = [
+        [int(x), int(y), int(x) + 150, int(y) + 120]
+        for x, y in zip(x1, y1, strict=True)
+    ]
+    return bboxes, [f"person {i}" for i in range(NUM_BOXES)]
+
+
+def annotate_copy(frame: NDArray[np.uint8], bboxes, labels) -> NDArray[np.uint8]:
+    """Annotate a pickled frame and send it back pickled."""
+    bbv.annotate_in_place(frame, bboxes, labels)
+    return frame
+
+
+def pickling_rate(
+    executor: ProcessPoolExecutor, frame: NDArray[np.uint8], bboxes, labels
+) -> float:
+    """Keep the executor saturated for DURATION seconds and return frames per second."""
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        futures = [
+            executor.submit(annotate_copy, frame, bboxes, labels)
+            for _ in range(WORKERS * 2)
+        ]
+        for future in futures:
+            future.result()
+        count += len(futures)
+    return count / (time.perf_counter() - start)
+
+
+def shared_rate(
+    pool: bbv.SharedRenderPool, frame: NDArray[np.uint8], bboxes, labels
+) -> float:
+    """Keep the pool saturated for DURATION seconds and return frames per second."""
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        futures = [pool.submit(frame, bboxes, labels) for _ in range(pool.num_slots)]
+        for future in futures:
+            pool.release(future.result())
+        count += len(futures)
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    print(f"{WORKERS} worker processes")
+    with ProcessPoolExecutor(max_workers=WORKERS) as executor:
+        for name, (height, width) in RESOLUTIONS.items():
+            frame = np.random.default_rng(1).integers(
+                0, 256, (height, width, 3), dtype=np.uint8
+            )
+            bboxes, labels = detections(height, width)
+            # Warm up the workers before timing
+            executor.submit(annotate_copy, frame, bboxes, labels).result()
+
+            with bbv.SharedRenderPool(
+                frame.shape, num_slots=WORKERS * 2, max_workers=WORKERS
+            ) as pool:
+                pool.release(pool.submit(frame, bboxes, labels).result())
+                shared = shared_rate(pool, frame, bboxes, labels)
+
+            print(f"{name}:")
+            print(
+                f"  pickling ProcessPoolExecutor "
+                f"{pickling_rate(executor, frame, bboxes, labels):8.1f} frames/s"
+            )
+            print(f"  SharedRenderPool             {shared:8.1f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Thread scaling benchmark for bbox-visualizer.
+
+Runs ``add_multiple_labels`` on 1, 2, 4 and 8 threads at once and reports
+frames per second and the speedup over one thread. cv2 releases the GIL
+while drawing, so threads scale partly on regular builds; on a free-threaded
+build (e.g. ``python3.13t``) the Python code between cv2 calls runs in
+parallel too.
+
+Run from the repo root:
+    python examples/benchmark_threads.py
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import bbox_visualizer as bbv
+
+HEIGHT, WIDTH = 720, 1280
+NUM_LABELS = 50
+DURATION = 2.0  # seconds per measurement
+THREAD_COUNTS = (1, 2, 4, 8)
+
+
+def detections() -> tuple[list[list[int]], list[str]]:
+    """Return a fixed set of boxes spread over the frame."""
+    rng = np.random.default_rng(0)
+    x1 = rng.integers(0, WIDTH - 200, NUM_LABELS)
+    y1 = rng.integers(60, HEIGHT - 200, NUM_LABELS)
+    bboxes = [
+        [int(x), int(y), int(x) + 150, int(y) + 120]
+        for x, y in zip(x1, y1, strict=True)
+    ]
+    return bboxes, [f"person {i}\n0.{i:02d}" for i in range(NUM_LABELS)]
+
+
+def throughput(threads: int, frame: np.ndarray, bboxes, labels) -> float:
+    """Draw on ``threads`` threads for DURATION seconds; return frames per second."""
+    counts = [0] * threads
+    start = threading.Barrier(threads + 1)
+    stop = threading.Event()
+
+    def work(index: int) -> None:
+        bbv.add_multiple_labels(frame, labels, bboxes)  # warm this thread's caches
+        start.wait()
+        while not stop.is_set():
+            bbv.add_multiple_labels(frame, labels, bboxes)
+            counts[index] += 1
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(work, index) for index in range(threads)]
+        start.wait()
+        began = time.perf_counter()
+        time.sleep(DURATION)
+        stop.set()
+        for future in futures:
+            future.result()
+        return sum(counts) / (time.perf_counter() - began)
+
+
+def main() -> None:
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    frame = np.random.default_rng(1).integers(
+        0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8
+    )
+    bboxes, labels = detections()
+    base = None
+    for threads in THREAD_COUNTS:
+        rate = throughput(threads, frame, bboxes, labels)
+        base = base or rate
+        print(f"  {threads} threads  {rate:8.1f} frames/s  {rate / base:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
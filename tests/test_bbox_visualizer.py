@@ -1,10 +1,41 @@
+import gc
 import logging
+import multiprocessing.shared_memory
 
+import cv2
 import numpy as np
 import pytest
 
-from bbox_visualizer.core import flags, labels, rectangle
-from bbox_visualizer.core._utils import _convert_bbox_to_voc, _get_ink_metrics
+from bbox_visualizer.core import (
+    budget,
+    crops,
+    density,
+    detections,
+    export,
+    filtering,
+    flags,
+    keypoints,
+    labels,
+    layout,
+    masks,
+    mosaic,
+    oriented,
+    overlay,
+    palette,
+    rectangle,
+    render,
+    shared,
+    styles,
+    tracks,
+)
+from bbox_visualizer.core._utils import (
+    _as_array,
+    _check_and_modify_bbox,
+    _check_and_modify_bboxes,
+    _convert_bbox_to_voc,
+    _frame_color,
+    _get_ink_metrics,
+)
 
 
 @pytest.fixture
@@ -307,6 +338,20 @@ def test_draw_multiple_boxes_per_box_colors(sample_image):
         assert (result == color).all(axis=2).any()
 
 
+def test_draw_multiple_boxes_keep_input_order(sample_image):
+    """Overlapping boxes stack in input order, whatever their colors."""
+    bboxes = [[10, 10, 60, 60], [20, 20, 70, 70], [30, 30, 80, 80], [15, 25, 75, 65]]
+    colors = [(255, 0, 0), (0, 255, 0), (255, 0, 0), (255, 0, 0)]
+    result = rectangle.draw_multiple_rectangles(sample_image, bboxes, colors)
+    expected = sample_image.copy()
+    shift = styles.BoxStyle().stroke_shift
+    for (x1, y1, x2, y2), color in zip(bboxes, colors, strict=True):
+        cv2.rectangle(
+            expected, (x1 + shift, y1 + shift), (x2 - shift, y2 - shift), color, 3
+        )
+    assert np.array_equal(result, expected)
+
+
 def test_draw_multiple_boxes_color_length_mismatch(sample_image):
     """Color list length must match the number of boxes."""
     bboxes = [[10, 10, 30, 30], [50, 50, 70, 70]]
@@ -591,3 +636,1346 @@ def test_label_falls_back_inside_when_bg_does_not_fit_above(sample_image):
         sample_image, "test", [10, y_min, 90, 90], size=0.3, thickness=1
     )
     assert not result[:y_min].any()
+
+
+def test_render_to_jpeg_matches_drawing_functions(sample_image):
+    """render_to_jpeg encodes exactly what the batch functions would draw."""
+    bboxes = [[10, 30, 50, 70], [55, 40, 90, 90]]
+    names = ["a", "b"]
+    expected = rectangle.draw_multiple_rectangles(sample_image, bboxes)
+    expected = labels.add_multiple_labels(expected, names, bboxes)
+
+    png = render.render_to_png(sample_image, bboxes, names)
+    decoded = cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_COLOR)
+    assert np.array_equal(decoded, expected)
+    assert not sample_image.any()
+
+    jpeg = render.render_to_jpeg(sample_image, bboxes, names, quality=80)
+    assert jpeg[:2] == b"\xff\xd8"
+
+
+def test_render_encoder_failure(sample_image, sample_bbox, monkeypatch):
+    """A failed encode raises instead of returning the encoder's buffer."""
+    monkeypatch.setattr(
+        render.cv2, "imencode", lambda *args: (False, np.zeros(8, np.uint8))
+    )
+    with pytest.raises(ValueError, match=r"encode the frame as \.jpg"):
+        render.render_to_jpeg(sample_image, [sample_bbox])
+    with pytest.raises(ValueError, match=r"encode the frame as \.png"):
+        render.render_to_png(sample_image, [sample_bbox])
+
+
+def test_render_reuses_thread_frame_buffer(sample_image, sample_bbox):
+    """Repeated renders on one thread draw into the same scratch frame."""
+    render.render_to_jpeg(sample_image, [sample_bbox])
+    buffer = render._local.frame
+    render.render_to_jpeg(sample_image, [sample_bbox])
+    assert render._local.frame is buffer
+
+
+def test_render_invalid_quality(sample_image, sample_bbox):
+    """Out-of-range encoder settings are rejected."""
+    with pytest.raises(ValueError, match="quality"):
+        render.render_to_jpeg(sample_image, [sample_bbox], quality=101)
+    with pytest.raises(ValueError, match="compression"):
+        render.render_to_png(sample_image, [sample_bbox], compression=10)
+
+
+def test_render_16_bit_frames(sample_image, sample_bbox):
+    """JPEG refuses 16-bit frames instead of truncating them; PNG keeps them."""
+    deep = sample_image.astype(np.uint16) * 257
+    with pytest.raises(ValueError, match="8-bit"):
+        render.render_to_jpeg(deep, [sample_bbox])
+    png = render.render_to_png(deep, [sample_bbox])
+    decoded = cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_UNCHANGED)
+    assert np.array_equal(decoded, rectangle.draw_rectangle(deep, sample_bbox))
+
+
+def test_render_pool(sample_image, sample_bbox):
+    """RenderPool returns futures that resolve to the same bytes."""
+    expected = render.render_to_png(sample_image, [sample_bbox], ["a"])
+    with render.RenderPool(max_workers=2) as pool:
+        futures = [
+            pool.render_to_png(sample_image, [sample_bbox], ["a"]) for _ in range(4)
+        ]
+        assert all(f.result() == expected for f in futures)
+
+
+def test_palette_distinct_colors():
+    """Generated palettes cover K classes with distinct colors."""
+    pal = palette.Palette.distinct(1000)
+    assert len(pal) == 1000
+    assert pal.lut.dtype == np.uint8 and pal.lut.shape == (1000, 3)
+    assert len(np.unique(pal.lut, axis=0)) == 1000
+    assert not pal.lut.flags.writeable
+    # Past 1000 classes, repeated hues are nudged apart instead of shared
+    assert len(np.unique(palette.Palette.distinct(5000).lut, axis=0)) == 5000
+
+
+def test_palette_colors_lookup():
+    """Class IDs map to LUT rows with one fancy-index."""
+    pal = palette.Palette([(255, 0, 0), (0, 255, 0), (0, 0, 255)])
+    colors = pal.colors(np.array([2, 0, 2]))
+    assert colors.tolist() == [[0, 0, 255], [255, 0, 0], [0, 0, 255]]
+    assert pal[1] == (0, 255, 0)
+    assert pal.colors([3, 4], wrap=True).tolist() == [[255, 0, 0], [0, 255, 0]]
+    with pytest.raises(ValueError, match="between 0 and 2"):
+        pal.colors([3])
+    # Whole float IDs are looked up; fractional or non-finite ones are refused
+    assert pal.colors([2.0, 0.0]).tolist() == [[0, 0, 255], [255, 0, 0]]
+    for ids in ([1.5], [np.nan], [np.inf]):
+        with pytest.raises(ValueError, match="integers"):
+            pal.colors(ids)
+    with pytest.raises(ValueError):
+        palette.Palette([(256, 0, 0)])
+    with pytest.raises(ValueError):
+        palette.Palette.distinct(0)
+
+
+def test_draw_multiple_boxes_palette_colors(sample_image):
+    """A (N, 3) color array draws each box in its class color."""
+    bboxes = [[10, 10, 30, 30], [50, 50, 70, 70], [10, 50, 30, 70]]
+    pal = palette.Palette([(255, 0, 0), (0, 255, 0)])
+    colors = pal.colors([0, 1, 0])
+    result = rectangle.draw_multiple_rectangles(sample_image, bboxes, colors)
+    expected = rectangle.draw_multiple_rectangles(
+        sample_image, bboxes, [(255, 0, 0), (0, 255, 0), (255, 0, 0)]
+    )
+    assert np.array_equal(result, expected)
+    assert (result[52, 52] == (0, 255, 0)).all()
+    assert (result[52, 12] == (255, 0, 0)).all()
+
+    with pytest.raises(ValueError, match="must match"):
+        rectangle.draw_multiple_rectangles(sample_image, bboxes, colors[:2])
+    with pytest.raises(ValueError):
+        rectangle.draw_multiple_rectangles(
+            sample_image, bboxes, np.array([[0, 0, 300]] * 3)
+        )
+
+
+def test_styles_validate_once_and_are_hashable():
+    """Styles normalize their fields at construction and can key a dict."""
+    style = styles.LabelStyle(text_color=[0, np.uint8(255), 0], bbox_format="COCO")
+    assert style.text_color == (0, 255, 0)
+    assert style.bbox_format == "coco"
+    assert {style: 1}[styles.LabelStyle(text_color=(0, 255, 0), bbox_format="coco")]
+    assert styles.BoxStyle(thickness=3).stroke_shift == 2
+    assert styles.FlagStyle(line_color=(0, 0, 255)).box_style.color == (0, 0, 255)
+    with pytest.raises(ValueError):
+        styles.BoxStyle(color=(0, 0, 256))
+    with pytest.raises(ValueError):
+        styles.LabelStyle(bbox_format="albumentations")
+    with pytest.raises(AttributeError):
+        style.size = 2
+
+
+def test_style_matches_keyword_arguments(sample_image, sample_label):
+    """Passing a style renders exactly like the equivalent keyword arguments."""
+    bboxes = [[10, 30, 20, 20], [50, 60, 30, 30]]
+    voc_bboxes = [[10, 30, 30, 50], [50, 60, 80, 90]]
+    names = [sample_label, "b"]
+    red = (0, 0, 255)
+    box = styles.BoxStyle(color=red, thickness=2, bbox_format="coco")
+    label = styles.LabelStyle(size=0.5, thickness=1, text_bg_color=red, top=False)
+    flag = styles.FlagStyle(line_color=red, bbox_format="coco")
+
+    assert np.array_equal(
+        rectangle.draw_multiple_rectangles(sample_image, bboxes, style=box),
+        rectangle.draw_multiple_rectangles(
+            sample_image, bboxes, red, thickness=2, bbox_format="coco"
+        ),
+    )
+    assert np.array_equal(
+        labels.add_multiple_labels(sample_image, names, voc_bboxes, style=label),
+        labels.add_multiple_labels(
+            sample_image,
+            names,
+            voc_bboxes,
+            size=0.5,
+            thickness=1,
+            text_bg_color=red,
+            top=False,
+        ),
+    )
+    assert np.array_equal(
+        flags.draw_multiple_flags_with_labels(sample_image, names, bboxes, style=flag),
+        flags.draw_multiple_flags_with_labels(
+            sample_image, names, bboxes, line_color=red, bbox_format="coco"
+        ),
+    )
+
+
+def test_style_skips_color_validation(sample_image, monkeypatch):
+    """No color validation runs per call once a style is passed."""
+    label_style = styles.LabelStyle()
+    flag_style = styles.FlagStyle()
+    box_style = styles.BoxStyle()
+    calls = []
+    monkeypatch.setattr(styles, "_validate_color", lambda c: calls.append(c) or c)
+
+    bboxes = [[10, 30, 50, 70], [20, 40, 60, 80]]
+    names = ["a", "b"]
+    rectangle.draw_multiple_rectangles(sample_image, bboxes, style=box_style)
+    labels.add_multiple_labels(sample_image, names, bboxes, style=label_style)
+    flags.add_multiple_T_labels(sample_image, names, bboxes, style=label_style)
+    flags.draw_multiple_flags_with_labels(sample_image, names, bboxes, style=flag_style)
+    render.render_to_png(
+        sample_image, bboxes, names, box_style=box_style, label_style=label_style
+    )
+    assert calls == []
+
+
+def test_draw_multiple_masks_blends_union_once(sample_image):
+    """Each masked pixel is blended once with its (last) instance color."""
+    stack = np.zeros((2, 100, 100), dtype=bool)
+    stack[0, 10:40, 10:40] = True
+    stack[1, 30:60, 30:60] = True
+    colors = [(200, 0, 0), (0, 200, 0)]
+    result = masks.draw_multiple_masks(sample_image, stack, colors, alpha=0.5)
+
+    assert (result[20, 20] == (100, 0, 0)).all()
+    assert (result[35, 35] == (0, 100, 0)).all()  # overlap: later mask wins
+    assert (result[50, 50] == (0, 100, 0)).all()
+    assert not result[70:, 70:].any()
+    assert not sample_image.any()
+
+    # A label map gives the same result as the equivalent stack
+    label_map = np.zeros((100, 100), dtype=np.int32)
+    label_map[stack[0]] = 1
+    label_map[stack[1]] = 2
+    assert np.array_equal(
+        masks.draw_multiple_masks(sample_image, label_map, colors, alpha=0.5), result
+    )
+    # A single (H, W) boolean mask is one instance
+    assert np.array_equal(
+        masks.draw_multiple_masks(sample_image, stack[0], colors[0], alpha=0.5),
+        masks.draw_multiple_masks(sample_image, stack[:1], colors[0], alpha=0.5),
+    )
+
+
+def test_draw_multiple_masks_with_boxes_and_labels(sample_image):
+    """Masks, boxes and labels share one palette lookup."""
+    stack = np.zeros((2, 100, 100), dtype=bool)
+    stack[0, 40:60, 10:40] = True
+    stack[1, 40:90, 50:90] = True
+    bboxes = [[10, 40, 40, 60], [50, 40, 90, 90]]
+    colors = palette.Palette.distinct(2).colors([0, 1])
+
+    result = masks.draw_multiple_masks(sample_image, stack, colors)
+    result = rectangle.draw_multiple_rectangles(result, bboxes, colors)
+    result = labels.add_multiple_labels(result, ["a", "b"], bboxes)
+    assert (result[50, 12] == colors[0]).all()  # box outline over the mask
+    assert result[50, 20].any()  # mask tint inside the box
+
+
+def test_draw_multiple_masks_invalid(sample_image):
+    """Mismatched shapes and colors are rejected."""
+    with pytest.raises(ValueError, match="shape"):
+        masks.draw_multiple_masks(sample_image, np.zeros((1, 50, 50), dtype=bool))
+    with pytest.raises(ValueError, match="cannot be empty"):
+        masks.draw_multiple_masks(sample_image, np.zeros((0, 100, 100), dtype=bool))
+    with pytest.raises(ValueError, match=r"\(N, H, W\)"):
+        masks.draw_multiple_masks(sample_image, np.ones((100, 100)))
+    with pytest.raises(ValueError, match="must match"):
+        masks.draw_multiple_masks(
+            sample_image, np.ones((2, 100, 100), dtype=bool), [(255, 0, 0)]
+        )
+
+
+def _encode_rle(mask, compress=False):
+    """Encode a mask as COCO RLE (a port of pycocotools' rleEncode/rleToString)."""
+    flat = mask.reshape(-1, order="F").astype(np.int8)
+    changes = np.flatnonzero(np.diff(np.concatenate([[0], flat, [1 - flat[-1]]])))
+    counts = np.diff(np.concatenate([[0], changes])).tolist()
+    if not compress:
+        return {"size": list(mask.shape), "counts": counts}
+    chars = []
+    for i, x in enumerate(counts):
+        if i > 2:
+            x -= counts[i - 2]
+        more = True
+        while more:
+            c = x & 0x1F
+            x >>= 5
+            more = x != -1 if c & 0x10 else x != 0
+            chars.append(chr((c | 0x20 if more else c) + 48))
+    return {"size": list(mask.shape), "counts": "".join(chars)}
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_decode_rle_round_trip(compress):
+    """Both uncompressed and compressed COCO counts decode to the mask."""
+    rng = np.random.default_rng(0)
+    mask = np.zeros((60, 80), dtype=bool)
+    mask[5:50, 10:70] = rng.random((45, 60)) > 0.3
+    mask[0, 0] = True  # foreground in the very first pixel: empty first run
+    decoded = masks.decode_rle(_encode_rle(mask, compress))
+    assert decoded.shape == mask.shape
+    assert np.array_equal(decoded, mask)
+
+
+def test_draw_rle_masks_matches_dense_masks(sample_image):
+    """The RLE overlay equals draw_multiple_masks on the decoded masks."""
+    rng = np.random.default_rng(1)
+    img = rng.integers(0, 256, (100, 100, 3), dtype=np.uint8)
+    stack = np.zeros((3, 100, 100), dtype=bool)
+    stack[0, 10:60, 10:60] = True
+    stack[1, 40:90, 30:80] = True
+    stack[2] = rng.random((100, 100)) > 0.9
+    rles = [_encode_rle(m, compress=i % 2 == 1) for i, m in enumerate(stack)]
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+
+    expected = masks.draw_multiple_masks(img, stack, colors, alpha=0.4)
+    assert np.array_equal(masks.draw_rle_masks(img, rles, colors, alpha=0.4), expected)
+
+
+def test_draw_rle_masks_invalid(sample_image):
+    """Size mismatches and bad run lengths are rejected."""
+    mask = np.ones((50, 50), dtype=bool)
+    with pytest.raises(ValueError, match="does not match"):
+        masks.draw_rle_masks(sample_image, [_encode_rle(mask)])
+    with pytest.raises(ValueError, match="add up"):
+        masks.decode_rle({"size": [10, 10], "counts": [5, 5]})
+    with pytest.raises(ValueError, match="cannot be empty"):
+        masks.draw_rle_masks(sample_image, [])
+
+
+def test_draw_multiple_keypoints_matches_per_point_drawing(sample_image):
+    """Batched drawing equals per-limb cv2.line and per-point cv2.circle calls."""
+    kps = np.array(
+        [
+            [[20, 20, 0.9], [40, 30, 0.9], [30, 60, 0.1]],
+            [[70, 20, 0.8], [80, 50, 0.7], [60, 80, 0.9]],
+        ]
+    )
+    skeleton = [(0, 1), (1, 2)]
+    limb_colors = [(0, 255, 0), (255, 0, 0)]
+    result = keypoints.draw_multiple_keypoints(
+        sample_image, kps, skeleton, limb_color=limb_colors, radius=2
+    )
+
+    expected = sample_image.copy()
+    for person in kps:
+        for (a, b), color in zip(skeleton, limb_colors, strict=True):
+            if person[a, 2] >= 0.5 and person[b, 2] >= 0.5:
+                pa, pb = person[a, :2].astype(int), person[b, :2].astype(int)
+                cv2.line(expected, tuple(pa.tolist()), tuple(pb.tolist()), color, 2)
+    for person in kps:
+        for x, y, score in person:
+            if score >= 0.5:
+                cv2.circle(expected, (int(x), int(y)), 2, (0, 0, 255), -1)
+    assert np.array_equal(result, expected)
+    assert not result[60, 30].any()  # the low-score keypoint is hidden
+
+
+def test_draw_multiple_keypoints_invalid(sample_image):
+    """Bad shapes and skeleton indices are rejected."""
+    with pytest.raises(ValueError, match="shape"):
+        keypoints.draw_multiple_keypoints(sample_image, np.zeros((2, 17, 4)))
+    with pytest.raises(ValueError, match="between 0 and 2"):
+        keypoints.draw_multiple_keypoints(sample_image, np.zeros((1, 3, 3)), [(0, 3)])
+
+
+def test_oriented_box_corners_match_cv2():
+    """Vectorized corners equal cv2.boxPoints for every box."""
+    obbs = np.array([[50, 40, 30, 10, 0], [20, 70, 12, 24, 33.5], [60, 60, 40, 8, -75]])
+    corners = oriented._obb_corners(oriented._validate_obbs(obbs, "degrees"))
+    for box, points in zip(obbs, corners, strict=True):
+        expected = cv2.boxPoints(((box[0], box[1]), (box[2], box[3]), box[4]))
+        assert np.allclose(
+            np.sort(points, axis=0), np.sort(expected, axis=0), atol=1e-4
+        )
+
+    radians = oriented._validate_obbs(
+        np.c_[obbs[:, :4], np.deg2rad(obbs[:, 4])], "radians"
+    )
+    assert np.allclose(oriented._obb_corners(radians), corners)
+
+
+def test_draw_multiple_oriented_boxes(sample_image):
+    """Unrotated outlines match draw_rectangle; fills equal a full-frame blend."""
+    obbs = [[30, 30, 40, 40, 0], [70, 60, 20, 30, 0]]
+    result = oriented.draw_multiple_oriented_boxes(
+        sample_image, obbs, bbox_color=[(0, 255, 0), (0, 0, 255)], thickness=2
+    )
+    expected = rectangle.draw_rectangle(sample_image, [10, 10, 50, 50], (0, 255, 0), 2)
+    expected = rectangle.draw_rectangle(expected, [60, 45, 80, 75], (0, 0, 255), 2)
+    assert np.array_equal(result, expected)
+
+    img = np.full((100, 100, 3), 40, dtype=np.uint8)
+    rotated = [[50, 50, 40, 20, 30], [30, 30, 30, 30, 45]]
+    result = oriented.draw_multiple_oriented_boxes(
+        img, rotated, bbox_color=(200, 100, 0), is_opaque=True, alpha=0.3
+    )
+    overlay = img.copy()
+    corners = oriented._obb_corners(oriented._validate_obbs(rotated, "degrees"))
+    for polygon in np.rint(corners).astype(np.int32):
+        cv2.fillConvexPoly(overlay, polygon, (200, 100, 0))
+    assert np.array_equal(result, cv2.addWeighted(overlay, 0.3, img, 0.7, 0))
+
+
+def test_draw_multiple_oriented_boxes_keep_input_order(sample_image):
+    """Overlapping rotated outlines stack in input order, whatever their colors."""
+    obbs = [[40, 40, 50, 30, 20], [50, 45, 50, 30, -30], [45, 50, 40, 40, 45]]
+    colors = [(255, 0, 0), (0, 255, 0), (255, 0, 0)]
+    result = oriented.draw_multiple_oriented_boxes(sample_image, obbs, colors)
+    expected = sample_image
+    for obb, color in zip(obbs, colors, strict=True):
+        expected = oriented.draw_multiple_oriented_boxes(expected, [obb], color)
+    assert np.array_equal(result, expected)
+
+
+def test_add_multiple_oriented_labels(sample_image):
+    """Labels anchor at the top-most corner of each rotated box."""
+    obbs = [
+        [50, 60, 40, 20, 90]
+    ]  # rotated upright: top-most corners at y=40, left one wins
+    result = oriented.add_multiple_oriented_labels(sample_image, ["a"], obbs)
+    expected = labels.add_label(sample_image, "a", [40, 40, 40, 40])
+    assert np.array_equal(result, expected)
+
+
+def test_oriented_invalid_input(sample_image):
+    """Bad shapes, sizes, angle units and label counts are rejected."""
+    with pytest.raises(ValueError, match="5 values"):
+        oriented.draw_multiple_oriented_boxes(sample_image, [[10, 10, 5, 5]])
+    with pytest.raises(ValueError, match="non-negative"):
+        oriented.draw_multiple_oriented_boxes(sample_image, [[10, 10, -5, 5, 0]])
+    with pytest.raises(ValueError, match="angle_unit"):
+        oriented.draw_multiple_oriented_boxes(
+            sample_image, [[10, 10, 5, 5, 0]], angle_unit="grad"
+        )
+    with pytest.raises(ValueError, match="match number of labels"):
+        oriented.add_multiple_oriented_labels(
+            sample_image, ["a", "b"], [[10, 10, 5, 5, 0]]
+        )
+
+
+def test_track_trails_fade_and_ring_buffer(sample_image):
+    """Only the last ``history`` centers are kept; older segments are fainter."""
+    trails = tracks.TrackTrails(history=4, thickness=1, color=(0, 255, 255))
+    for step in range(6):
+        x = 10 * step + 10
+        trails.update([7], [[x, 10, x + 10, 20]], sample_image.shape)
+    result = trails.draw(sample_image)
+
+    # Centers 35..65 remain; the segment ending at the newest one is opaque
+    assert result[15, 60].tolist() == [0, 255, 255]
+    assert result[15, 50].tolist() == [0, 191, 191]
+    assert result[15, 40].tolist() == [0, 128, 128]
+    assert not result[15, 30].any()
+    assert not sample_image.any()
+
+
+def test_track_trails_memory_is_bounded(sample_image):
+    """Stale tracks are evicted and new IDs recycle the oldest slots."""
+    trails = tracks.TrackTrails(max_tracks=2, max_age=1)
+    trails.update([1, 2], [[0, 0, 10, 10], [20, 20, 30, 30]], sample_image.shape)
+    trails.update([3], [[40, 40, 50, 50]], sample_image.shape)
+    assert len(trails) == 2
+    assert 3 in trails._slots
+
+    for track_id in range(100, 200):
+        trails.update([track_id], [[0, 0, 10, 10]], sample_image.shape)
+    assert len(trails) == 2
+    assert trails._points.shape == (2, 30, 2)
+
+    trails.update([], [], sample_image.shape)
+    trails.update([], [], sample_image.shape)
+    assert len(trails) == 0
+
+
+def test_track_trails_invalid(sample_image):
+    """Mismatched, repeated or too many track IDs are rejected."""
+    trails = tracks.TrackTrails(max_tracks=1)
+    with pytest.raises(ValueError, match="must match"):
+        trails.update([1, 2], [[0, 0, 10, 10]], sample_image.shape)
+    with pytest.raises(ValueError, match="unique"):
+        trails.update([1, 1], [[0, 0, 10, 10]] * 2, sample_image.shape)
+    with pytest.raises(ValueError, match="max_tracks"):
+        trails.update([1, 2], [[0, 0, 10, 10]] * 2, sample_image.shape)
+    with pytest.raises(ValueError, match="at least 2"):
+        tracks.TrackTrails(history=1)
+
+
+def test_annotate_in_place_matches_copying_functions():
+    """Drawing in place equals the rectangle and label functions on a copy."""
+    img = np.zeros((120, 160, 3), dtype=np.uint8)
+    bboxes = [[10, 40, 60, 90], [80, 30, 150, 100]]
+    expected = rectangle.draw_multiple_rectangles(img, bboxes)
+    expected = labels.add_multiple_labels(expected, ["a", "b"], bboxes)
+
+    frame = img.copy()
+    assert render.annotate_in_place(frame, bboxes, ["a", "b"]) is None
+    assert np.array_equal(frame, expected)
+
+
+def test_shared_render_pool():
+    """Workers annotate shared-memory slots in place; errors reach the future."""
+    img = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    bboxes = [[10, 40, 60, 90]]
+    expected = img.copy()
+    render.annotate_in_place(expected, bboxes, ["a"])
+
+    with shared.SharedRenderPool(img.shape, num_slots=2, max_workers=1) as pool:
+        slot = pool.submit(img, bboxes, ["a"]).result()
+        assert np.array_equal(pool.frame(slot), expected)
+        pool.release(slot)
+
+        with pytest.raises(ValueError, match="4 coordinates"):
+            pool.annotate(pool.acquire(), [[1, 2]]).result()
+        pool.acquire()
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+    with pytest.raises(ValueError, match="closed"):
+        pool.frame(0)
+
+
+def test_shared_render_pool_reclaims_failed_slots():
+    """Failing submits give their slot back, so later frames still get one."""
+    img = np.zeros((60, 80, 3), dtype=np.uint8)
+    with shared.SharedRenderPool(img.shape, num_slots=2, max_workers=1) as pool:
+        for _ in range(3):
+            with pytest.raises(ValueError, match="4 coordinates"):
+                pool.submit(img, [[1, 2]]).result()
+        slot = pool.submit(img, [[10, 20, 50, 50]], ["a"]).result(timeout=10)
+        assert pool.frame(slot).any()
+        pool.release(slot)
+        assert sorted(pool.acquire(timeout=1) for _ in range(2)) == [0, 1]
+
+
+def test_shared_render_pool_unlinks_memory_without_close():
+    """Dropping an unclosed pool still unlinks its shared memory block."""
+    pool = shared.SharedRenderPool((8, 8, 3), num_slots=1, max_workers=1)
+    name = pool._memory.name
+    pool._executor.shutdown(wait=True)
+    del pool
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        multiprocessing.shared_memory.SharedMemory(name=name)
+
+
+def test_shared_render_pool_16_bit_and_mismatched_frames():
+    """16-bit pools keep full depth; frames not matching the slots are refused."""
+    img = np.random.default_rng(0).integers(0, 65536, (60, 80, 3), dtype=np.uint16)
+    bboxes = [[10, 20, 50, 50]]
+    expected = img.copy()
+    render.annotate_in_place(expected, bboxes, ["a"])
+
+    with shared.SharedRenderPool(
+        img.shape, num_slots=1, max_workers=1, dtype=np.uint16
+    ) as pool:
+        slot = pool.submit(img, bboxes, ["a"]).result()
+        assert np.array_equal(pool.frame(slot), expected)
+        pool.release(slot)
+
+        with pytest.raises(ValueError, match="does not fit"):
+            pool.submit(img.astype(np.uint8), bboxes)
+        with pytest.raises(ValueError, match="does not fit"):
+            pool.submit(img[:1], bboxes)
+        # The rejected frames did not take the only slot
+        assert pool.acquire(timeout=0.01) == 0
+    with pytest.raises(ValueError, match="16-bit"):
+        shared.SharedRenderPool(img.shape, dtype=np.float32)
+
+
+def test_add_multiple_labels_matches_add_label():
+    """Batched placement draws exactly what add_label draws, overlaps included."""
+    img = np.zeros((200, 200, 3), dtype=np.uint8)
+    bboxes = [[10, 60, 50, 100], [30, 70, 80, 120], [120, 5, 180, 60], [0, 0, 40, 20]]
+    names = ["cat", "dog", "bird", "fish"]
+    expected = img
+    for name, bbox in zip(names, bboxes, strict=True):
+        expected = labels.add_label(expected, name, bbox)
+    result = labels.add_multiple_labels(img, names, bboxes)
+    assert np.array_equal(result, expected)
+
+
+@pytest.mark.parametrize("bbox_format", ["voc", "coco", "yolo"])
+def test_check_and_modify_bboxes_matches_per_box(bbox_format):
+    """Vectorized conversion and clipping equal the per-box helper."""
+    rng = np.random.default_rng(0)
+    if bbox_format == "yolo":
+        bboxes = np.hstack([rng.random((50, 2)) * 1.2 - 0.1, rng.random((50, 2)) / 3])
+    else:
+        corners = rng.integers(-20, 120, (50, 2)) + 0.5
+        bboxes = np.hstack([corners, rng.integers(0, 60, (50, 2))])
+        if bbox_format == "voc":
+            bboxes[:, 2:] += bboxes[:, :2]
+    expected = [
+        _check_and_modify_bbox(bbox, (100, 120, 3), bbox_format=bbox_format)
+        for bbox in bboxes.tolist()
+    ]
+    result = _check_and_modify_bboxes(bboxes, (100, 120, 3), bbox_format)
+    assert result.tolist() == expected
+
+
+def test_draw_density_coverage(sample_image):
+    """Coverage counts overlapping boxes; uncovered pixels are left alone."""
+    bboxes = [[10, 10, 40, 40], [30, 30, 60, 60]]
+    result = density.draw_density(sample_image, bboxes, alpha=1.0)
+    heat = cv2.applyColorMap(
+        np.array([[0, 128, 255]], dtype=np.uint8), cv2.COLORMAP_JET
+    )
+    assert result[35, 35].tolist() == heat[0, 2].tolist()  # both boxes
+    assert result[15, 15].tolist() == heat[0, 1].tolist()  # one box
+    assert not result[80, 80].any()
+
+    result = density.draw_density(sample_image, bboxes, mode="centers")
+    assert result[25, 25].any() and not result[90, 5].any()
+    with pytest.raises(ValueError, match="Unsupported density mode"):
+        density.draw_density(sample_image, bboxes, mode="points")
+
+
+def test_draw_multiple_rectangles_density_threshold(sample_image):
+    """Above the threshold, the rectangles give way to a coverage heatmap."""
+    bboxes = [[10, 10, 40, 40], [30, 30, 60, 60]]
+    result = rectangle.draw_multiple_rectangles(
+        sample_image, bboxes, density_threshold=1
+    )
+    assert np.array_equal(result, density.draw_density(sample_image, bboxes))
+    result = rectangle.draw_multiple_rectangles(
+        sample_image, bboxes, density_threshold=2
+    )
+    assert np.array_equal(
+        result, rectangle.draw_multiple_rectangles(sample_image, bboxes)
+    )
+
+
+def test_budgeted_renderer_tiers():
+    """Each tier draws what it promises; learned costs pick the tier."""
+    img = np.zeros((120, 160, 3), dtype=np.uint8)
+    bboxes = [[10, 40, 50, 80], [60, 40, 100, 80], [110, 40, 150, 80]]
+    names = ["a", "b", "c"]
+    scores = [0.2, 0.9, 0.5]
+    boxes_only = rectangle.draw_multiple_rectangles(img, bboxes)
+
+    renderer = budget.BudgetedRenderer(budget_ms=1000, top_k=2)
+    result, tier = renderer.render(img, bboxes, names, scores)
+    assert tier == "full" == renderer.last_tier
+    assert np.array_equal(result, labels.add_multiple_labels(boxes_only, names, bboxes))
+    assert renderer.estimates_ms["label"] > 0
+
+    # Labels too slow for all three, cheap enough for the top two
+    renderer._costs.update(box=0.0, label=0.4)
+    result, tier = renderer.render(img, bboxes, names, scores)
+    assert tier == "top_k"
+    expected = labels.add_multiple_labels(boxes_only, ["b", "c"], bboxes[1:])
+    assert np.array_equal(result, expected)
+
+    renderer._costs.update(box=0.0, label=10.0)
+    assert renderer.render(img, bboxes, names, scores)[1] == "boxes"
+
+    renderer._costs.update(box=10.0, label=10.0)
+    result, tier = renderer.render(img, bboxes, names, scores)
+    assert tier == "minimal"
+    assert np.array_equal(
+        result, rectangle.draw_multiple_rectangles(img, bboxes, thickness=1)
+    )
+    # Thin strokes are timed apart from the style's boxes
+    assert renderer.estimates_ms["box"] == 10000.0
+    assert renderer.estimates_ms["thin_box"] > 0
+
+
+def test_budgeted_renderer_retries_labels():
+    """One slow label frame does not lock the renderer out of label tiers."""
+    img = np.zeros((120, 160, 3), dtype=np.uint8)
+    bboxes = [[x, 40, x + 5, 80] for x in range(0, 160, 8)]
+    names = [str(i) for i in range(len(bboxes))]
+    renderer = budget.BudgetedRenderer(budget_ms=5, top_k=5)
+    renderer.render(img, bboxes)
+    renderer._costs["label"] = 0.002
+
+    tiers = [renderer.render(img, bboxes, names)[1] for _ in range(50)]
+    assert tiers[0] in ("boxes", "minimal")
+    assert {"full", "top_k"} & set(tiers)
+    assert renderer.estimates_ms["label"] < 2.0
+
+
+def test_budgeted_renderer_invalid():
+    """Bad settings and mismatched inputs are rejected."""
+    with pytest.raises(ValueError, match="top_k"):
+        budget.BudgetedRenderer(top_k=0)
+    with pytest.raises(ValueError, match="smoothing"):
+        budget.BudgetedRenderer(smoothing=0)
+    renderer = budget.BudgetedRenderer()
+    with pytest.raises(ValueError, match="scores"):
+        renderer.render(
+            np.zeros((50, 50, 3), np.uint8), [[0, 0, 10, 10]], scores=[1, 2]
+        )
+
+
+def test_filter_detections_nms():
+    """Suppression keeps the best box per overlap group, per class by default."""
+    bboxes = [[10, 10, 50, 50], [12, 12, 52, 52], [11, 11, 51, 51], [60, 60, 90, 90]]
+    scores = [0.6, 0.9, 0.8, 0.3]
+    class_ids = [0, 0, 1, 0]
+    keep = filtering.filter_detections(bboxes, scores, class_ids, iou_threshold=0.5)
+    assert keep.tolist() == [1, 2, 3]
+    keep = filtering.filter_detections(
+        bboxes, scores, class_ids, iou_threshold=0.5, class_agnostic=True
+    )
+    assert keep.tolist() == [1, 3]
+    # Without scores, earlier boxes win
+    assert filtering.filter_detections(bboxes, iou_threshold=0.5).tolist() == [0, 3]
+    # COCO boxes give the same result as their VOC equivalents
+    coco = [[x1, y1, x2 - x1, y2 - y1] for x1, y1, x2, y2 in bboxes]
+    keep = filtering.filter_detections(
+        coco, scores, iou_threshold=0.5, bbox_format="coco"
+    )
+    assert keep.tolist() == [1, 3]
+
+
+def test_filter_detections_steps_and_errors():
+    """Thresholds, class lists and top-K combine; missing inputs are rejected."""
+    bboxes = [[i * 10, 0, i * 10 + 5, 5] for i in range(6)]
+    scores = [0.1, 0.9, 0.5, 0.7, 0.3, 0.8]
+    class_ids = [0, 1, 2, 1, 0, 3]
+    detection_filter = filtering.DetectionFilter(
+        score_threshold=0.2, exclude_classes=[3], top_k=2
+    )
+    keep = detection_filter.indices(bboxes, scores, class_ids)
+    assert keep.tolist() == [1, 3]
+    keep = filtering.filter_detections(bboxes, scores, class_ids, classes=[0, 2])
+    assert keep.tolist() == [0, 2, 4]
+
+    with pytest.raises(ValueError, match="scores"):
+        filtering.filter_detections(bboxes, score_threshold=0.5)
+    with pytest.raises(ValueError, match="class_ids"):
+        filtering.filter_detections(bboxes, scores, classes=[0])
+    with pytest.raises(ValueError, match="Number of scores"):
+        filtering.filter_detections(bboxes, scores[:2])
+    with pytest.raises(ValueError, match="top_k"):
+        filtering.DetectionFilter(top_k=0)
+    with pytest.raises(ValueError, match="iou_threshold"):
+        filtering.DetectionFilter(iou_threshold=1.5)
+
+
+def test_nms_sweep_matches_greedy(monkeypatch):
+    """The chunked sweep keeps exactly what pairwise greedy NMS keeps."""
+    monkeypatch.setattr(filtering, "_SWEEP_CHUNK", 7)
+    rng = np.random.default_rng(0)
+    corners = rng.random((300, 2)) * 200
+    boxes = np.hstack([corners, corners + rng.random((300, 2)) * 40 + 5])
+
+    ious = filtering._iou(boxes[:, np.newaxis], boxes[np.newaxis])
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if not suppressed[i]:
+            suppressed[i + 1 :] |= ious[i, i + 1 :] > 0.3
+    assert np.array_equal(filtering._nms(boxes, 0.3), np.flatnonzero(~suppressed))
+
+
+def test_batch_functions_detection_filter(sample_image):
+    """A filter passed to the batch functions draws only the kept boxes."""
+    bboxes = [[10, 10, 50, 50], [12, 12, 52, 52], [60, 60, 90, 90]]
+    names = ["a", "b", "c"]
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+    scores = [0.5, 0.9, 0.7]
+    detection_filter = filtering.DetectionFilter(iou_threshold=0.5)
+
+    result = rectangle.draw_multiple_rectangles(
+        sample_image, bboxes, colors, detection_filter=detection_filter, scores=scores
+    )
+    expected = rectangle.draw_multiple_rectangles(sample_image, bboxes[1:], colors[1:])
+    assert np.array_equal(result, expected)
+
+    result = labels.add_multiple_labels(
+        sample_image, names, bboxes, detection_filter=detection_filter, scores=scores
+    )
+    expected = labels.add_multiple_labels(sample_image, names[1:], bboxes[1:])
+    assert np.array_equal(result, expected)
+
+
+def test_detection_filter_gets_converted_boxes(sample_image, monkeypatch):
+    """The batch functions filter the boxes they already validated and converted."""
+    coco = [[10, 10, 40, 40], [12, 12, 40, 40], [60, 60, 30, 30]]
+    seen = []
+    indices = filtering.DetectionFilter.indices
+
+    def spy(self, bboxes, *args, **kwargs):
+        seen.append((bboxes, args, kwargs))
+        return indices(self, bboxes, *args, **kwargs)
+
+    monkeypatch.setattr(filtering.DetectionFilter, "indices", spy)
+    keep = filtering.DetectionFilter(iou_threshold=0.5)
+    rectangle.draw_multiple_rectangles(
+        sample_image, coco, bbox_format="coco", detection_filter=keep
+    )
+    labels.add_multiple_labels(
+        sample_image, ["a"] * 3, coco, bbox_format="coco", detection_filter=keep
+    )
+    detections.draw_detections(
+        sample_image, coco, bbox_format="coco", detection_filter=keep
+    )
+    assert len(seen) == 3
+    for bboxes, args, kwargs in seen:
+        assert bboxes.tolist() == [[10, 10, 50, 50], [12, 12, 52, 52], [60, 60, 90, 90]]
+        assert "coco" not in (*args, *kwargs.values())
+
+
+def test_add_label_multiline(sample_image):
+    """Lines stack on one background sized from the per-line metrics."""
+    style = styles.LabelStyle()
+    label = "person\n0.91"
+    result = labels.add_label(sample_image, label, [10, 60, 90, 95], style=style)
+
+    top_width, top_ascent, top_descent = style.metrics("person")
+    bottom_width, bottom_ascent, bottom_descent = style.metrics("0.91")
+    bg_width = max(top_width, bottom_width) + 2 * style.padding
+    bg_height = (
+        top_ascent + top_descent + bottom_ascent + bottom_descent + 3 * style.padding
+    )
+    expected = sample_image.copy()
+    bg_y1 = 60 - bg_height
+    cv2.rectangle(expected, (10, bg_y1), (10 + bg_width, 60), style.text_bg_color, -1)
+    baseline = bg_y1 + style.padding + top_ascent
+    cv2.putText(expected, "person", (15, baseline), layout.font, 1, (0, 0, 0), 2)
+    baseline += top_descent + style.padding + bottom_ascent
+    cv2.putText(expected, "0.91", (15, baseline), layout.font, 1, (0, 0, 0), 2)
+    assert np.array_equal(result, expected)
+
+    # The batch function places multi-line labels the same way
+    batch = labels.add_multiple_labels(
+        sample_image, [label, "a"], [[10, 60, 90, 95], [50, 0, 90, 40]], style=style
+    )
+    single = labels.add_label(result, "a", [50, 0, 90, 40], style=style)
+    assert np.array_equal(batch, single)
+
+
+def test_multiline_label_metrics_cached_per_line(sample_image):
+    """A repeated line is measured once, whatever the lines around it."""
+    _get_ink_metrics.cache_clear()
+    labels.add_label(sample_image, "car\n0.50", [10, 60, 90, 95])
+    labels.add_label(sample_image, "car\n0.75", [10, 60, 90, 95])
+    info = _get_ink_metrics.cache_info()
+    assert info.misses == 3
+    assert info.hits >= 1
+
+
+@pytest.mark.parametrize(
+    ("channels", "dtype"),
+    [(1, np.uint8), (4, np.uint8), (1, np.uint16), (3, np.uint16), (4, np.uint16)],
+)
+def test_draw_on_gray_bgra_and_16_bit_frames(channels, dtype):
+    """Frames are drawn in their own layout, as if converted from BGR after."""
+    bboxes = [[10, 40, 60, 90], [50, 50, 95, 95]]
+    colors = [(0, 0, 255), (255, 128, 0)]
+    kps = np.array([[[20, 20], [40, 30]]])
+
+    def annotate(img):
+        img = rectangle.draw_multiple_rectangles(img, bboxes, colors)
+        img = rectangle.draw_multiple_rectangles(img, bboxes, is_opaque=True)
+        img = labels.add_multiple_labels(img, ["car\n0.9", "bus"], bboxes)
+        img = flags.add_T_label(img, "T", [60, 85, 90, 99])
+        return keypoints.draw_multiple_keypoints(img, kps, skeleton=[(0, 1)])
+
+    bgr = annotate(np.zeros((100, 100, 3), dtype=np.uint8))
+    if channels == 1:
+        expected = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        img = np.zeros((100, 100), dtype=dtype)
+    elif channels == 4:
+        expected = cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA)
+        img = np.zeros((100, 100, 4), dtype=dtype)
+        img[..., 3] = np.iinfo(dtype).max  # opaque, like the converted frame
+    else:
+        expected = bgr
+        img = np.zeros((100, 100, 3), dtype=dtype)
+    scale = 257 if dtype == np.uint16 else 1
+    expected = expected.astype(np.int64) * scale
+
+    result = annotate(img)
+    assert result.shape == img.shape
+    assert result.dtype == dtype
+    # Luma and alpha blends may round one 8-bit step apart
+    assert np.abs(result.astype(np.int64) - expected).max() <= scale
+
+
+def test_frame_color_adaptation():
+    """BGR colors become luma, gain an opaque alpha and scale to 16 bits."""
+    assert _frame_color((255, 0, 0), np.zeros((2, 2), np.uint8)) == (29,)
+    assert _frame_color((255, 0, 0), np.zeros((2, 2, 4), np.uint8)) == (255, 0, 0, 255)
+    assert _frame_color((0, 255, 0), np.zeros((2, 2, 3), np.uint16)) == (0, 65535, 0)
+    with pytest.raises(ValueError, match="channels"):
+        _frame_color((0, 0, 0), np.zeros((2, 2, 2), np.uint8))
+
+
+def test_annotate_in_place_view_with_offset():
+    """Parent-frame boxes are drawn into a window of a larger buffer."""
+    panorama = np.zeros((100, 300, 3), dtype=np.uint8)
+    view = panorama[:, 100:200]
+    bboxes = [[110, 40, 160, 90], [10, 40, 60, 90], [230, 40, 280, 90]]
+    colors = [(0, 0, 255), (0, 255, 0), (255, 0, 0)]
+    render.annotate_in_place(
+        view, bboxes, ["in", "left", "right"], colors, offset=(100, 0)
+    )
+
+    expected = np.zeros_like(panorama)
+    render.annotate_in_place(expected, bboxes[:1], ["in"], colors[:1])
+    assert np.shares_memory(view, panorama)
+    assert np.array_equal(panorama, expected)
+
+    # COCO boxes shift too; YOLO boxes are relative to the view, so no offset
+    coco = np.zeros_like(panorama)
+    render.annotate_in_place(
+        coco[:, 100:200], [[110, 40, 50, 50]], bbox_format="coco", offset=(100, 0)
+    )
+    direct = np.zeros_like(panorama)
+    render.annotate_in_place(direct, [[110, 40, 160, 90]])
+    assert np.array_equal(coco, direct)
+    with pytest.raises(ValueError, match="YOLO"):
+        render.annotate_in_place(
+            view, [[0.5, 0.5, 0.2, 0.2]], bbox_format="yolo", offset=(100, 0)
+        )
+
+
+@pytest.mark.parametrize(
+    "make_view",
+    [
+        lambda parent: parent[:, ::2],  # strided columns
+        lambda parent: parent[::-1],  # flipped rows
+        lambda parent: parent[5:95, 10:110],  # strided rows
+    ],
+    ids=["columns", "flipped", "rows"],
+)
+def test_draw_into_strided_views(make_view):
+    """Strided views are annotated through the view and copied from as inputs."""
+    bboxes = [[10, 20, 40, 60], [30, 30, 80, 70]]
+    names = ["a", "b"]
+    parent = np.zeros((100, 200, 3), dtype=np.uint8)
+    view = make_view(parent)
+    expected = np.ascontiguousarray(view)
+    render.annotate_in_place(expected, bboxes, names)
+    render.annotate_in_place(view, bboxes, names)
+    assert np.array_equal(view, expected)
+    assert parent.any()
+
+    source = make_view(
+        np.random.default_rng(0).integers(0, 256, (100, 200, 3), np.uint8)
+    )
+    contiguous = np.ascontiguousarray(source)
+    assert np.array_equal(
+        rectangle.draw_multiple_rectangles(source, bboxes, is_opaque=True),
+        rectangle.draw_multiple_rectangles(contiguous, bboxes, is_opaque=True),
+    )
+    assert np.array_equal(
+        labels.add_multiple_labels(source, names, bboxes),
+        labels.add_multiple_labels(contiguous, names, bboxes),
+    )
+    masks_ = np.zeros((1, *source.shape[:2]), dtype=bool)
+    masks_[0, 10:50, 10:50] = True
+    assert np.array_equal(
+        masks.draw_multiple_masks(source, masks_),
+        masks.draw_multiple_masks(contiguous, masks_),
+    )
+
+
+@pytest.mark.parametrize("label_position", ["top", "inside", "T", "flag"])
+def test_draw_detections_matches_separate_calls(label_position):
+    """One fused call draws what the box and label calls draw one after another."""
+    img = np.zeros((200, 200, 3), dtype=np.uint8)
+    bboxes = [[20, 100, 80, 150], [90, 5, 190, 60], [-10, 120, 30, 250]]
+    names = ["car", "bus\n0.7", "cut"]
+    colors = [(0, 0, 255), (0, 255, 0), (255, 0, 0)]
+    boxes = rectangle.draw_multiple_rectangles(img, bboxes, colors)
+    if label_position in ("top", "inside"):
+        top = label_position == "top"
+        expected = labels.add_multiple_labels(boxes, names, bboxes, top=top)
+    elif label_position == "T":
+        expected = flags.add_multiple_T_labels(boxes, names, bboxes)
+    else:
+        expected = flags.draw_multiple_flags_with_labels(boxes, names, bboxes)
+
+    result = detections.draw_detections(
+        img, bboxes, names, colors, label_position=label_position
+    )
+    assert np.array_equal(result, expected)
+    assert not img.any()
+
+
+def test_draw_detections_options():
+    """Boxes without labels, filters and styles work; bad positions are rejected."""
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    bboxes = np.array([[10, 40, 50, 90], [12, 42, 52, 92], [60, 40, 95, 90]])
+    assert np.array_equal(
+        detections.draw_detections(img, bboxes, is_opaque=True),
+        rectangle.draw_multiple_rectangles(img, bboxes, is_opaque=True),
+    )
+
+    keep = filtering.DetectionFilter(iou_threshold=0.5)
+    style = styles.LabelStyle(size=0.5, thickness=1)
+    result = detections.draw_detections(
+        img,
+        bboxes,
+        ["a", "b", "c"],
+        label_style=style,
+        detection_filter=keep,
+        scores=[0.2, 0.9, 0.5],
+    )
+    expected = labels.add_multiple_labels(
+        rectangle.draw_multiple_rectangles(img, bboxes[1:]),
+        ["b", "c"],
+        bboxes[1:],
+        style=style,
+    )
+    assert np.array_equal(result, expected)
+
+    with pytest.raises(ValueError, match="label_position"):
+        detections.draw_detections(img, bboxes, label_position="bottom")
+    with pytest.raises(ValueError, match="FlagStyle"):
+        detections.draw_detections(
+            img, bboxes, ["a", "b", "c"], label_position="flag", label_style=style
+        )
+
+
+def test_layout_cache_skips_layout(sample_image, monkeypatch):
+    """Re-drawing the same labels on the same boxes reuses the cached layout."""
+    names = ["car", "person\n0.91"]
+    bboxes = [[10, 60, 50, 95], [55, 70, 95, 99]]
+    first = flags.add_multiple_T_labels(sample_image, names, bboxes)
+
+    def fail(*args):
+        raise AssertionError("layout recomputed")
+
+    monkeypatch.setitem(layout._LAYOUTS, "T", fail)
+    assert np.array_equal(
+        flags.add_multiple_T_labels(sample_image, names, bboxes), first
+    )
+    # Another style, or boxes clipped differently, is another layout
+    with pytest.raises(AssertionError, match="recomputed"):
+        flags.add_multiple_T_labels(sample_image, names, bboxes, draw_bg=False)
+    with pytest.raises(AssertionError, match="recomputed"):
+        flags.add_multiple_T_labels(sample_image[:80], names, bboxes)
+
+
+def test_layout_cache_follows_t_line_length(sample_image, monkeypatch):
+    """Changing T_LINE_LENGTH lays the labels out again instead of reusing them."""
+    assert flags.T_LINE_LENGTH == layout.T_LINE_LENGTH == 50
+    bboxes = [[30, 70, 70, 95]]
+    first = flags.add_multiple_T_labels(sample_image, ["a"], bboxes)
+    monkeypatch.setattr(layout, "T_LINE_LENGTH", 20)
+    shorter = flags.add_multiple_T_labels(sample_image, ["a"], bboxes)
+    assert not np.array_equal(shorter, first)
+    assert np.array_equal(shorter, flags.add_T_label(sample_image, "a", bboxes[0]))
+
+
+def test_layout_arrays():
+    """The layout stage places poles and backgrounds without drawing."""
+    style = styles.FlagStyle()
+    width, ascent, descent = style.metrics("dog")
+    result = layout._layout(
+        "flag", ["dog", "dog"], [[20, 100, 60, 180], [20, 10, 60, 50]], style
+    )
+    # The first flag rises 50px above its box, the second falls back
+    assert result.has_pole.tolist() == [True, False]
+    assert result.fallback.tolist() == [False, True]
+    assert result.poles[0].tolist() == [40, 52, 40, 120]
+    assert result.backgrounds[0].tolist() == [
+        40,
+        50,
+        40 + width + 2 * style.padding,
+        50 + ascent + descent + 2 * style.padding,
+    ]
+    assert result.origins[0].tolist() == [45, 55 + ascent]
+    assert result.origins[1].tolist() == [25, 15 + ascent]
+
+
+def _draw_display_list(img, display):
+    """Draw a display list with cv2, as a client-side renderer would."""
+    img = img.copy()
+    for primitive in display["primitives"]:
+        color = tuple(bytes.fromhex(primitive["color"][1:]))[::-1]
+        if primitive["type"] == "rect":
+            corners = (
+                (primitive["x1"], primitive["y1"]),
+                (
+                    primitive["x2"],
+                    primitive["y2"],
+                ),
+            )
+            cv2.rectangle(img, *corners, color, primitive["thickness"])
+        elif primitive["type"] == "polyline":
+            points = np.array(primitive["points"], dtype=np.int32)
+            cv2.polylines(img, [points], False, color, primitive["thickness"])
+        else:
+            origin = (primitive["x"], primitive["y"])
+            size, thickness = primitive["size"], primitive["thickness"]
+            cv2.putText(
+                img, primitive["text"], origin, layout.font, size, color, thickness
+            )
+    return img
+
+
+@pytest.mark.parametrize("label_position", ["top", "inside", "T", "flag"])
+def test_display_list_matches_drawing(label_position):
+    """The display list holds exactly the primitives draw_detections draws."""
+    img = np.zeros((120, 160, 3), dtype=np.uint8)
+    bboxes = [[10, 70, 60, 110], [80, 5, 150, 60]]
+    names = ["car", "person\n0.91"]
+    colors = [(0, 0, 255), (0, 255, 0)]
+    kwargs = {"label_position": label_position, "label_size": 0.5}
+    kwargs["label_thickness"] = 1
+    display = export.display_list(img.shape, bboxes, names, colors, **kwargs)
+    assert (display["width"], display["height"]) == (160, 120)
+    assert np.array_equal(
+        _draw_display_list(img, display),
+        detections.draw_detections(img, bboxes, names, colors, **kwargs),
+    )
+
+
+def test_encode_display_list(sample_image):
+    """Display lists round-trip through JSON and binary, and render to SVG."""
+    display = export.display_list(
+        sample_image.shape,
+        [[10, 40, 50, 90], [60, 40, 95, 90]],
+        ["a & b", "c"],
+        is_opaque=True,
+        label_position="flag",
+    )
+    for fmt in ("json", "binary"):
+        encoded = export.encode_display_list(display, fmt)
+        assert export.decode_display_list(encoded) == display
+    binary = export.encode_display_list(display, "binary")
+    assert len(binary) < len(export.encode_display_list(display, "json"))
+
+    svg = export.encode_display_list(display, "svg")
+    assert svg.startswith("<svg") and 'opacity="0.5"' in svg
+    assert ">a &amp; b</text>" in svg
+
+    with pytest.raises(ValueError, match="format"):
+        export.encode_display_list(display, "png")
+    with pytest.raises(ValueError, match="display list"):
+        export.decode_display_list(binary[:-3])
+    with pytest.raises(ValueError, match="display list"):
+        export.decode_display_list("[1, 2]")
+
+
+@pytest.mark.parametrize("label_position", ["top", "T", "flag"])
+def test_overlay_layer_composites_like_drawing(label_position):
+    """Compositing the layer gives the pixels draw_detections draws."""
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    bboxes = [[10, 70, 60, 110], [80, 5, 150, 60]]
+    names = ["car", "person\n0.91"]
+    colors = [(0, 0, 255), (0, 255, 0)]
+    layer = overlay.OverlayLayer(img.shape)
+    layer.draw(bboxes, names, colors, label_position)
+    expected = detections.draw_detections(
+        img, bboxes, names, colors, label_position=label_position
+    )
+    assert np.array_equal(layer.composite(img), expected)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    assert np.array_equal(
+        layer.composite(gray),
+        detections.draw_detections(
+            gray, bboxes, names, colors, label_position=label_position
+        ),
+    )
+    # Single-channel frames with a trailing axis blend through their 2-D view
+    composited = layer.composite(gray[..., np.newaxis])
+    assert composited.shape == (120, 160, 1)
+    assert np.array_equal(composited[..., 0], layer.composite(gray))
+    # A crop of the frame gets the matching part of the annotations
+    crop = img[20:100, 30:120]
+    assert np.array_equal(layer.composite(crop, (30, 20)), expected[20:100, 30:120])
+
+
+def test_overlay_layer_bounds_and_clear():
+    """Only the inked region is recorded, blended and cleared."""
+    img = np.full((100, 200, 3), 50, dtype=np.uint8)
+    layer = overlay.OverlayLayer(img.shape)
+    assert layer.bounds is None
+    assert np.array_equal(layer.composite(img), img)
+
+    style = styles.BoxStyle(is_opaque=True, alpha=0.5)
+    layer.draw([[120, 40, 160, 80]], box_style=style)
+    assert layer.bounds == (120, 40, 161, 81)
+    assert not layer.layer[:, :120].any()
+    result = layer.composite(img)
+    expected = rectangle.draw_rectangle(img, [120, 40, 160, 80], is_opaque=True)
+    assert np.abs(result.astype(int) - expected).max() <= 1
+
+    layer.draw([[10, 10, 30, 30]])
+    assert layer.bounds == (10, 10, 161, 81)
+    layer.clear()
+    assert layer.bounds is None
+    assert not layer.layer.any()
+
+    with pytest.raises(ValueError, match="8-bit or 16-bit"):
+        layer.composite(img.astype(np.float32))
+
+
+def test_mosaic_cells_match_drawing():
+    """Each cell holds its resized frame annotated with scaled boxes."""
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (100, 200, 3), dtype=np.uint8) for _ in range(3)]
+    bboxes = [[[20, 40, 100, 90]], None, [[120, 60, 180, 98], [0, 0, 40, 40]]]
+    names = [["car"], None, ["dog", "cat"]]
+    style = styles.LabelStyle(size=0.4, thickness=1)
+    grid = mosaic.Mosaic(2, 2, (50, 100), background=(0, 0, 255), label_style=style)
+    result = grid.build(frames, bboxes, names)
+    assert result.shape == (100, 200, 3)
+
+    small = cv2.resize(frames[0], (100, 50), interpolation=cv2.INTER_AREA)
+    expected = detections.draw_detections(
+        small, [[10, 20, 50, 45]], ["car"], label_style=style
+    )
+    assert np.array_equal(result[:50, :100], expected)
+    assert np.array_equal(
+        result[:50, 100:],
+        cv2.resize(frames[1], (100, 50), interpolation=cv2.INTER_AREA),
+    )
+    assert (result[50:, 100:] == (0, 0, 255)).all()
+
+    # Filling the cells on threads gives the same grid
+    with mosaic.Mosaic(
+        2, 2, (50, 100), background=(0, 0, 255), label_style=style, max_workers=2
+    ) as threaded:
+        assert np.array_equal(threaded.build(frames, bboxes, names), result)
+
+
+def test_mosaic_update_letterboxes_and_validates():
+    """Frames keep their aspect ratio inside the cell, with background bars."""
+    grid = mosaic.Mosaic(1, 2, (50, 100), background=(255, 255, 255))
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    cell = grid.update(1, frame, [[0, 0, 50, 50]], bbox_color=[(0, 255, 0)])
+    assert (cell[:, :25] == 255).all() and (cell[:, 75:] == 255).all()
+    expected = rectangle.draw_rectangle(
+        np.zeros((50, 50, 3), dtype=np.uint8), [0, 0, 25, 25], (0, 255, 0)
+    )
+    assert np.array_equal(cell[:, 25:75], expected)
+    assert (grid.cell(0) == 255).all()
+
+    with pytest.raises(ValueError, match="outside"):
+        grid.update(2, frame)
+    with pytest.raises(ValueError, match="channels"):
+        grid.update(0, frame[..., 0])
+    with pytest.raises(ValueError, match="fit"):
+        grid.build([frame] * 3)
+    with pytest.raises(ValueError, match="positive"):
+        mosaic.Mosaic(0, 2, (50, 100))
+
+
+class _DLPackTensor:
+    """A CPU tensor exposing only the DLPack protocol, like a torch tensor."""
+
+    def __init__(self, array):
+        self.array = array
+
+    def __dlpack__(self, **kwargs):
+        return self.array.__dlpack__(**kwargs)
+
+    def __dlpack_device__(self):
+        return self.array.__dlpack_device__()
+
+
+class _ArrayTensor:
+    """A tensor exposing only ``__array__``."""
+
+    def __init__(self, array):
+        self.array = array
+
+    def __array__(self, dtype=None, copy=None):
+        return self.array
+
+
+def test_tensors_are_read_without_copies():
+    """DLPack and __array__ tensors share memory with the arrays read from them."""
+    boxes = np.array([[10, 10, 50, 50], [30, 40, 90, 80]], dtype=np.float32)
+    assert np.shares_memory(_as_array(_DLPackTensor(boxes)), boxes)
+    assert np.shares_memory(_as_array(_ArrayTensor(boxes)), boxes)
+    nested = boxes.tolist()
+    assert _as_array(nested) is nested
+
+    class GpuTensor:
+        def __dlpack__(self, **kwargs):
+            raise BufferError("device memory")
+
+        def __dlpack_device__(self):
+            return (2, 0)
+
+    with pytest.raises(ValueError, match="CPU"):
+        rectangle.draw_multiple_rectangles(np.zeros((100, 100, 3)), GpuTensor())
+
+
+@pytest.mark.parametrize("tensor", [_DLPackTensor, _ArrayTensor])
+def test_batch_functions_accept_tensors(sample_image, tensor):
+    """Tensors of boxes, scores and class IDs draw like the equivalent lists."""
+    boxes = np.array([[10, 10, 50, 50], [30, 40, 90, 80]], dtype=np.float32)
+    scores = np.array([0.9, 0.2])
+    class_ids = np.array([1, 2])
+    names = ["a", "b"]
+    nested = boxes.tolist()
+    keep = filtering.DetectionFilter(score_threshold=0.5)
+
+    assert np.array_equal(
+        rectangle.draw_multiple_rectangles(sample_image, tensor(boxes)),
+        rectangle.draw_multiple_rectangles(sample_image, nested),
+    )
+    for draw in (
+        labels.add_multiple_labels,
+        flags.add_multiple_T_labels,
+        flags.draw_multiple_flags_with_labels,
+    ):
+        assert np.array_equal(
+            draw(sample_image, names, tensor(boxes)),
+            draw(sample_image, names, nested),
+        )
+    assert np.array_equal(
+        detections.draw_detections(
+            sample_image,
+            tensor(boxes),
+            names,
+            detection_filter=keep,
+            scores=tensor(scores),
+            class_ids=tensor(class_ids),
+        ),
+        detections.draw_detections(sample_image, nested[:1], names[:1]),
+    )
+    pal = palette.Palette.distinct(3)
+    assert np.array_equal(pal.colors(tensor(class_ids)), pal.colors(class_ids))
+
+
+def test_annotated_crops_match_full_frame_drawing():
+    """Each crop equals the same region of the frame with only its detection."""
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (200, 300, 3), dtype=np.uint8)
+    bboxes = np.array([[60, 60, 120, 150], [200, 50, 299, 199], [5, 80, 40, 110]])
+    names = ["car", "person", "dog"]
+    keep = filtering.DetectionFilter(score_threshold=0.5)
+
+    result = crops.annotated_crops(
+        img, bboxes, names, pad=40, detection_filter=keep, scores=[0.9, 0.1, 0.8]
+    )
+    assert [crop.shape for crop in result] == [(171, 141, 3), (111, 81, 3)]
+    for crop, box, name in zip(result, bboxes[[0, 2]], ["car", "dog"], strict=True):
+        expected = detections.draw_detections(img, [box], [name])
+        x1, y1 = max(box[0] - 40, 0), max(box[1] - 40, 0)
+        height, width = crop.shape[:2]
+        assert np.array_equal(crop, expected[y1 : y1 + height, x1 : x1 + width])
+
+
+def test_annotated_crops_resize_into_out():
+    """Crops are letterboxed into the preallocated slots, annotated at scale."""
+    img = np.zeros((200, 300, 3), dtype=np.uint8)
+    out = np.full((3, 40, 40, 3), 7, dtype=np.uint8)
+    result = crops.annotated_crops(
+        img,
+        [[10, 10, 109, 49], [150, 100, 189, 139]],
+        pad=0,
+        out=out,
+        bbox_color=[(0, 255, 0), (0, 0, 255)],
+    )
+    assert result.base is out and len(result) == 2
+    # A 100x40 crop becomes 40x16, centered between black bars
+    assert (out[0, :12] == 0).all() and (out[0, 28:] == 0).all()
+    assert (out[0, 12:28, 20, 1] == 255).any() and out[0, 20, 20, 1] == 0
+    assert (out[1, :, 20, 2] == 255).any() and out[1, 20, 20, 2] == 0
+    assert (out[2] == 7).all()
+
+    with pytest.raises(ValueError, match="slots"):
+        crops.annotated_crops(img, [[0, 0, 5, 5]] * 4, out=out)
+    with pytest.raises(ValueError, match="channels"):
+        crops.annotated_crops(img, [[0, 0, 5, 5]], out=out[..., 0])
+    with pytest.raises(ValueError, match="pad"):
+        crops.annotated_crops(img, [[0, 0, 5, 5]], pad=-1)
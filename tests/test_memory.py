@@ -0,0 +1,266 @@
+"""Memory-allocation regression tests.
+
+Each public function is run under :mod:`tracemalloc` and its peak allocation
+is reported in frames, the size of the input image. A refactor that adds a
+full-frame copy raises the peak by one frame and fails the bound below.
+NumPy reports its buffers to tracemalloc, and so do the arrays OpenCV
+returns, so both count.
+"""
+
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+import pytest
+
+import bbox_visualizer as bbv
+
+HEIGHT, WIDTH = 720, 1280
+NUM_OBJECTS = 50
+
+
+@pytest.fixture(scope="module")
+def frame():
+    """Create a 720p frame, large enough to dominate per-object allocations."""
+    return np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def _boxes(count: int) -> list[list[int]]:
+    """Return ``count`` boxes spread over the frame, all with room for labels."""
+    rng = np.random.default_rng(0)
+    x1 = rng.integers(0, WIDTH - 200, count)
+    y1 = rng.integers(100, HEIGHT - 200, count)
+    return [
+        [int(x), int(y), int(x) + 150, int(y) + 120]
+        for x, y in zip(x1, y1, strict=True)
+    ]
+
+
+def _labels(count: int) -> list[str]:
+    """Return ``count`` distinct labels."""
+    return [f"object {i}" for i in range(count)]
+
+
+def _rle(mask: np.ndarray) -> dict:
+    """Encode a boolean mask as an uncompressed COCO RLE."""
+    flat = mask.ravel(order="F")
+    # Runs alternate background/foreground and start with background
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate([[0], changes, [flat.size]])
+    counts = np.diff(bounds).tolist()
+    if flat[0]:
+        counts.insert(0, 0)
+    return {"size": list(mask.shape), "counts": counts}
+
+
+def peak_frames(frame: np.ndarray, func: Callable[[], object]) -> float:
+    """Return the peak memory allocated by ``func()``, in frames.
+
+    ``func`` runs once beforehand so that caches, such as the label metrics,
+    are warm and only the steady-state allocations of a call are measured.
+    """
+    func()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak - baseline) / frame.nbytes
+
+
+# (name, call, maximum frames allocated at peak)
+BBOXES = _boxes(NUM_OBJECTS)
+LABELS = _labels(NUM_OBJECTS)
+OBBS = [[x1 + 75, y1 + 60, 120, 60, 30] for x1, y1, _, _ in BBOXES]
+KEYPOINTS = np.random.default_rng(1).random((NUM_OBJECTS, 17, 2)) * [WIDTH, HEIGHT]
+CANVAS = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+OVERLAY = bbv.OverlayLayer(CANVAS.shape)
+OVERLAY.draw(BBOXES, LABELS)
+MOSAIC = bbv.Mosaic(2, 2, (HEIGHT // 2, WIDTH // 2))
+THUMBNAILS = np.empty((NUM_OBJECTS, 128, 128, 3), dtype=np.uint8)
+MASKS = np.zeros((10, HEIGHT, WIDTH), dtype=bool)
+for _index, (_x1, _y1, _x2, _y2) in enumerate(BBOXES[:10]):
+    MASKS[_index, _y1:_y2, _x1:_x2] = True
+RLES = [_rle(mask) for mask in MASKS]
+TRAILS = bbv.TrackTrails(history=30)
+for _step in range(30):
+    TRAILS.update(range(NUM_OBJECTS), np.array(BBOXES) + _step, (HEIGHT, WIDTH))
+RENDERER = bbv.BudgetedRenderer(budget_ms=1e6)
+
+CASES = [
+    # The returned copy is the only frame-sized buffer
+    ("draw_rectangle", lambda img: bbv.draw_rectangle(img, BBOXES[0]), 1.1),
+    (
+        "draw_multiple_rectangles",
+        lambda img: bbv.draw_multiple_rectangles(img, BBOXES),
+        1.1,
+    ),
+    ("add_label", lambda img: bbv.add_label(img, "label", BBOXES[0]), 1.1),
+    (
+        "add_multiple_labels",
+        lambda img: bbv.add_multiple_labels(img, LABELS, BBOXES),
+        1.1,
+    ),
+    ("add_T_label", lambda img: bbv.add_T_label(img, "label", BBOXES[0]), 1.1),
+    (
+        "add_multiple_T_labels",
+        lambda img: bbv.add_multiple_T_labels(img, LABELS, BBOXES),
+        1.1,
+    ),
+    (
+        "draw_flag_with_label",
+        lambda img: bbv.draw_flag_with_label(img, "label", BBOXES[0]),
+        1.1,
+    ),
+    (
+        "draw_multiple_flags_with_labels",
+        lambda img: bbv.draw_multiple_flags_with_labels(img, LABELS, BBOXES),
+        1.1,
+    ),
+    ("draw_box", lambda img: bbv.draw_box(img, BBOXES[0]), 1.1),
+    (
+        "draw_detections",
+        lambda img: bbv.draw_detections(img, BBOXES, LABELS),
+        1.1,
+    ),
+    (
+        "BudgetedRenderer.render",
+        lambda img: RENDERER.render(img, BBOXES, LABELS),
+        1.1,
+    ),
+    ("draw_multiple_boxes", lambda img: bbv.draw_multiple_boxes(img, BBOXES), 1.1),
+    (
+        "draw_multiple_oriented_boxes",
+        lambda img: bbv.draw_multiple_oriented_boxes(img, OBBS),
+        1.1,
+    ),
+    (
+        "add_multiple_oriented_labels",
+        lambda img: bbv.add_multiple_oriented_labels(img, LABELS, OBBS),
+        1.1,
+    ),
+    (
+        "draw_multiple_keypoints",
+        lambda img: bbv.draw_multiple_keypoints(img, KEYPOINTS),
+        1.1,
+    ),
+    # Opaque boxes blend a full-frame overlay, or only the boxes' region
+    (
+        "draw_rectangle opaque",
+        lambda img: bbv.draw_rectangle(img, BBOXES[0], is_opaque=True),
+        2.1,
+    ),
+    (
+        "draw_multiple_rectangles opaque",
+        lambda img: bbv.draw_multiple_rectangles(img, BBOXES, is_opaque=True),
+        2.1,
+    ),
+    # The copy, a 16-bit owner map (2/3 frame) and about 30 bytes per masked
+    # pixel; the 10 masks cover a fifth of the frame
+    ("draw_rle_masks", lambda img: bbv.draw_rle_masks(img, RLES), 3.5),
+    # The copy, and a color layer and opacity map over the trails' region,
+    # here most of the frame
+    ("TrackTrails.draw", lambda img: TRAILS.draw(img), 2.5),
+    # The crops themselves: 50 padded boxes add up to 1.3 frames
+    (
+        "annotated_crops",
+        lambda img: bbv.annotated_crops(img, BBOXES, LABELS),
+        1.5,
+    ),
+    # Per-pixel int64 and float64 intermediates cost 8/3 frames each
+    ("draw_multiple_masks", lambda img: bbv.draw_multiple_masks(img, MASKS), 7.0),
+    ("draw_density", lambda img: bbv.draw_density(img, BBOXES), 7.0),
+    (
+        "draw_density centers",
+        lambda img: bbv.draw_density(img, BBOXES, mode="centers"),
+        7.0,
+    ),
+    # Drawing in place or into a reused buffer allocates no frame at all
+    (
+        "annotate_in_place",
+        lambda img: bbv.annotate_in_place(CANVAS, BBOXES, LABELS),
+        0.1,
+    ),
+    (
+        "Mosaic.build",
+        lambda img: MOSAIC.build([img] * 4, [BBOXES] * 4, [LABELS] * 4),
+        0.1,
+    ),
+    (
+        "annotated_crops out",
+        lambda img: bbv.annotated_crops(img, BBOXES, LABELS, out=THUMBNAILS),
+        0.1,
+    ),
+    # Compositing allocates temporaries for one strip of rows at a time
+    (
+        "OverlayLayer.composite_in_place",
+        lambda img: OVERLAY.composite_in_place(CANVAS),
+        0.2,
+    ),
+    ("render_to_jpeg", lambda img: bbv.render_to_jpeg(img, BBOXES, LABELS), 0.5),
+    ("render_to_png", lambda img: bbv.render_to_png(img, BBOXES, LABELS), 0.5),
+]
+
+
+@pytest.mark.parametrize(
+    ("call", "max_frames"),
+    [pytest.param(call, limit, id=name) for name, call, limit in CASES],
+)
+def test_peak_allocation(frame, call, max_frames):
+    """No public function allocates more frame-sized buffers than it needs."""
+    frames = peak_frames(frame, lambda: call(frame))
+    assert frames <= max_frames, (
+        f"peak allocation {frames:.2f} frames exceeds {max_frames} frames"
+    )
+
+
+@pytest.fixture(scope="module")
+def pools():
+    """Start one thread pool and one shared-memory process pool for the module."""
+    with (
+        bbv.RenderPool(max_workers=2) as render_pool,
+        bbv.SharedRenderPool((HEIGHT, WIDTH, 3), num_slots=2, max_workers=1) as shared,
+    ):
+        yield render_pool, shared
+
+
+def _submit_shared(pool: bbv.SharedRenderPool, img: np.ndarray) -> None:
+    """Annotate ``img`` in a shared slot and hand the slot back."""
+    pool.release(pool.submit(img, BBOXES, LABELS).result())
+
+
+@pytest.mark.parametrize(
+    ("call", "max_frames"),
+    [
+        # Workers draw into their own scratch frames; only the JPEG comes back
+        pytest.param(
+            lambda pools, img: pools[0].render_to_jpeg(img, BBOXES, LABELS).result(),
+            0.5,
+            id="RenderPool.render_to_jpeg",
+        ),
+        # The frame is copied into shared memory, never into a new buffer
+        pytest.param(
+            lambda pools, img: _submit_shared(pools[1], img),
+            0.1,
+            id="SharedRenderPool.submit",
+        ),
+    ],
+)
+def test_pool_peak_allocation(frame, pools, call, max_frames):
+    """Pools allocate no frame-sized buffers on the calling thread."""
+    frames = peak_frames(frame, lambda: call(pools, frame))
+    assert frames <= max_frames, (
+        f"peak allocation {frames:.2f} frames exceeds {max_frames} frames"
+    )
+
+
+@pytest.mark.parametrize("func", [bbv.add_multiple_labels, bbv.add_multiple_T_labels])
+def test_batch_labels_allocation_independent_of_count(frame, func):
+    """Batch label functions copy the frame once, however many labels they draw."""
+    few_labels, few_boxes = _labels(5), _boxes(5)
+    many_labels, many_boxes = _labels(500), _boxes(500)
+    few = peak_frames(frame, lambda: func(frame, few_labels, few_boxes))
+    many = peak_frames(frame, lambda: func(frame, many_labels, many_boxes))
+    assert many - few < 0.1, f"{few:.2f} frames for 5 labels, {many:.2f} for 500"
@@ -0,0 +1,73 @@
+"""Thread-safety stress tests.
+
+Many threads draw at once, sharing the label metrics cache, while each keeps
+its own layout cache and scratch frame. Every result must equal the one drawn
+on a single thread. On free-threaded builds the threads truly run in
+parallel; with the GIL they still interleave between cv2 calls, which release
+it.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import bbox_visualizer as bbv
+from bbox_visualizer.core import layout
+
+NUM_THREADS = 8
+ROUNDS = 10
+
+
+def _scene(seed: int) -> tuple[list[list[int]], list[str]]:
+    """Return boxes and labels that share lines with the other scenes."""
+    rng = np.random.default_rng(seed)
+    x1 = rng.integers(0, 400, 10)
+    y1 = rng.integers(0, 250, 10)
+    bboxes = [
+        [int(x), int(y), int(x) + 60, int(y) + 40] for x, y in zip(x1, y1, strict=True)
+    ]
+    labels = [f"class {i % 3}\n{(seed * i) % 100:02d}" for i in range(10)]
+    return bboxes, labels
+
+
+def _draw(frame: np.ndarray, seed: int) -> list[np.ndarray]:
+    """Draw one scene with every label function."""
+    bboxes, labels = _scene(seed)
+    return [
+        bbv.add_multiple_labels(frame, labels, bboxes),
+        bbv.add_multiple_T_labels(frame, labels, bboxes),
+        bbv.draw_multiple_flags_with_labels(frame, labels, bboxes),
+        bbv.draw_detections(frame, bboxes, labels),
+        bbv.render_to_png(frame, bboxes, labels),
+    ]
+
+
+def test_concurrent_drawing_matches_sequential():
+    """Drawing from many threads at once gives the single-threaded results."""
+    frame = np.zeros((300, 480, 3), dtype=np.uint8)
+    seeds = range(NUM_THREADS)
+    expected = {seed: _draw(frame, seed) for seed in seeds}
+    start = threading.Barrier(NUM_THREADS)
+
+    def hammer(seed: int) -> None:
+        start.wait()
+        for round_ in range(ROUNDS):
+            # Alternate scenes so threads hit and miss the caches together
+            scene = (seed + round_) % NUM_THREADS
+            for result, reference in zip(
+                _draw(frame, scene), expected[scene], strict=True
+            ):
+                assert np.array_equal(result, reference)
+
+    with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+        for future in [executor.submit(hammer, seed) for seed in seeds]:
+            future.result()
+
+
+def test_cached_layouts_are_read_only():
+    """A layout shared by later cache hits cannot be changed in place."""
+    style = bbv.LabelStyle()
+    result = layout._layout("label", ["a"], [[10, 40, 50, 90]], style)
+    assert result is layout._layout("label", ["a"], [[10, 40, 50, 90]], style)
+    assert not any(array.flags.writeable for array in result)